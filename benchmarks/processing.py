@@ -0,0 +1,340 @@
+"""
+Measures the time and peak memory of each processing phase, against synthetic schemas and documents:
+
+- parse: loading the document (as JSON, or as YAML for the "yaml" scenario)
+- compile: constructing the jschon schema
+- compile (structural): compiling the schema for processing without validation
+- evaluate: evaluating the document against the schema
+- sort keys: mapping document nodes to sort keys, from the evaluation result
+- sort keys (structural): mapping document nodes to sort keys, by walking the document and the compiled schema
+- traverse: sorting the document's objects, given their sort keys
+- serialize: dumping the sorted document (as JSON, or as YAML for the "yaml" scenario)
+
+Timings are the best of --repeat runs; peak memory is measured in a separate run, since tracing allocations
+slows everything down.
+
+Usage: python benchmarks/processing.py [--size N] [--repeat N] [--scenario NAME ...]
+                                       [--save PATH] [--compare PATH] [--threshold PERCENT]
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+
+import jschon
+
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaSorter
+from jschon_tools._main import _create_root_schema
+from jschon_tools._main import _get_sort_keys_for_json_doc
+from jschon_tools._structural import compile_schema
+from jschon_tools._structural import get_sort_keys_for_json_doc
+from jschon_tools._structural import resolve_schema_location
+from jschon_tools._yaml import create_yaml_processor
+from jschon_tools._yaml import YamlIndent
+
+
+_SCHEMA_DRAFT = "https://json-schema.org/draft/2020-12/schema"
+
+# phase -> {"time": seconds, "peak_memory": bytes}
+_PhaseResults = Dict[str, Dict[str, float]]
+
+
+class _Scenario(NamedTuple):
+    schema_data: Dict[str, Any]
+    doc_text: str
+    is_yaml: bool = False
+
+
+def _reversed_object(properties: Mapping[str, Any]) -> Dict[str, Any]:
+    # documents declare properties in reverse of the schema's order, so that sorting reorders all of them
+    return dict(reversed(list(properties.items())))
+
+
+def _generate_nested(size: int) -> _Scenario:
+    depth = max(size // 20, 1)
+    schema: Dict[str, Any] = {"type": "object", "properties": {"id": {"type": "integer"}}}
+    doc: Dict[str, Any] = {"id": depth}
+    for level in range(depth):
+        schema = {
+            "type": "object",
+            "properties": {"id": {"type": "integer"}, "label": {"type": "string"}, "child": schema},
+        }
+        doc = _reversed_object({"id": level, "label": f"level {level}", "child": doc})
+    return _Scenario({"$schema": _SCHEMA_DRAFT, **schema}, json.dumps(doc))
+
+
+def _generate_wide(size: int) -> _Scenario:
+    schema = {
+        "$schema": _SCHEMA_DRAFT,
+        "type": "object",
+        "properties": {f"p{idx}": {"type": "integer"} for idx in range(size)},
+    }
+    doc = {f"p{idx}": idx for idx in reversed(range(size))}
+    return _Scenario(schema, json.dumps(doc))
+
+
+_ITEM_PROPERTY_NAMES = ('id', 'name', 'kind', 'created', 'updated', 'owner', 'size', 'enabled', 'score', 'notes')
+
+
+def _generate_item(idx: int) -> Dict[str, Any]:
+    return _reversed_object({name: f'{name} {idx}' for name in _ITEM_PROPERTY_NAMES})
+
+
+def _generate_array(size: int) -> _Scenario:
+    schema = {
+        "$schema": _SCHEMA_DRAFT,
+        "type": "array",
+        "items": {"type": "object", "properties": {name: {"type": "string"} for name in _ITEM_PROPERTY_NAMES}},
+    }
+    doc = [_generate_item(idx) for idx in range(size)]
+    return _Scenario(schema, json.dumps(doc))
+
+
+def _generate_refs(size: int) -> _Scenario:
+    schema = {
+        "$schema": _SCHEMA_DRAFT,
+        "type": "array",
+        "items": {"$ref": "#/$defs/shape"},
+        "$defs": {
+            "point": {"type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}},
+            "range": {
+                "type": "object",
+                "properties": {"start": {"$ref": "#/$defs/point"}, "end": {"$ref": "#/$defs/point"}},
+            },
+            "shape": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "origin": {"$ref": "#/$defs/point"},
+                    "bounds": {"$ref": "#/$defs/range"},
+                    "points": {"type": "array", "items": {"$ref": "#/$defs/point"}},
+                },
+            },
+        },
+    }
+
+    def _point(idx: int) -> Dict[str, Any]:
+        return {"y": idx, "x": idx}
+
+    doc = [
+        {
+            "points": [_point(idx), _point(idx + 1)],
+            "bounds": {"end": _point(idx + 1), "start": _point(idx)},
+            "origin": _point(idx),
+            "name": f"shape {idx}",
+        }
+        for idx in range(size)
+    ]
+    return _Scenario(schema, json.dumps(doc))
+
+
+def _generate_composition(size: int) -> _Scenario:
+    kinds = ('circle', 'square', 'polygon')
+    schema = {
+        "$schema": _SCHEMA_DRAFT,
+        "type": "array",
+        "items": {
+            "allOf": [
+                {"properties": {"id": {"type": "integer"}, "kind": {"enum": list(kinds)}}},
+                {"properties": {"tags": {"type": "array", "items": {"type": "string"}}}},
+            ],
+            "oneOf": [
+                {"properties": {"kind": {"const": "circle"}, "radius": {"type": "number"}}},
+                {"properties": {"kind": {"const": "square"}, "side": {"type": "number"}}},
+                {"properties": {"kind": {"const": "polygon"}, "sides": {"type": "integer"}}},
+            ],
+        },
+    }
+    extra_properties = {'circle': 'radius', 'square': 'side', 'polygon': 'sides'}
+    doc = []
+    for idx in range(size):
+        kind = kinds[idx % len(kinds)]
+        doc.append({extra_properties[kind]: idx, "tags": ["a", "b"], "kind": kind, "id": idx})
+    return _Scenario(schema, json.dumps(doc))
+
+
+def _generate_yaml(size: int) -> _Scenario:
+    schema = _generate_array(size).schema_data
+    lines = ['# a list of items', '---']
+    for idx in range(size):
+        lines.append(f'# item {idx}')
+        for line_idx, (name, value) in enumerate(_generate_item(idx).items()):
+            lines.append(f'{"- " if line_idx == 0 else "  "}{name}: {value}  # {name}')
+    return _Scenario(schema, '\n'.join(lines) + '\n', is_yaml=True)
+
+
+_SCENARIOS: Dict[str, Callable[[int], _Scenario]] = {
+    'nested': _generate_nested,
+    'wide': _generate_wide,
+    'array': _generate_array,
+    'refs': _generate_refs,
+    'composition': _generate_composition,
+    'yaml': _generate_yaml,
+}
+
+
+class _PresortedSorter(SchemaSorter):
+    """
+    A sorter given its document's sort keys up front, so that only traversing the document is measured.
+    """
+
+    def __init__(self, root_schema: jschon.JSONSchema, doc_sort_keys: Mapping[jschon.JSONPointer, int]):
+        super().__init__(root_schema)
+        self._doc_sort_keys = doc_sort_keys
+
+    def _get_doc_sort_keys(
+        self, doc_data: Any, *, validate: bool, stats: Optional[ProcessingStats]
+    ) -> Mapping[jschon.JSONPointer, int]:
+        return self._doc_sort_keys
+
+
+def _measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'time': min(timings), 'peak_memory': peak_memory}
+
+
+def _run_scenario(scenario: _Scenario, repeat: int) -> _PhaseResults:
+    yaml = create_yaml_processor(indent=YamlIndent(2, 2, 0))
+
+    def _parse() -> Any:
+        return yaml.load(scenario.doc_text) if scenario.is_yaml else json.loads(scenario.doc_text)
+
+    def _serialize(doc_data: Any) -> str:
+        if scenario.is_yaml:
+            f = io.StringIO()
+            yaml.dump(doc_data, f)
+            return f.getvalue()
+        return json.dumps(doc_data, indent=4)
+
+    # each phase is measured on the outputs of the preceding phases
+    doc_data = _parse()
+    root_schema = _create_root_schema(scenario.schema_data)
+    compiled_schema = compile_schema(root_schema)
+    root_result = root_schema.evaluate(jschon.JSON(doc_data))
+    if not root_result.valid:
+        raise ValueError('Generated document failed schema validation')
+    doc_sort_keys = _get_sort_keys_for_json_doc(root_result=root_result, schema_sort_keys_cache={})
+    presorted_sorter = _PresortedSorter(root_schema, doc_sort_keys)
+    sorted_doc_data = presorted_sorter.sort(doc_data)
+
+    phases: Dict[str, Callable[[], object]] = {
+        'parse': _parse,
+        'compile': lambda: _create_root_schema(scenario.schema_data),
+        'compile (structural)': lambda: compile_schema(root_schema),
+        'evaluate': lambda: root_schema.evaluate(jschon.JSON(doc_data)),
+        'sort keys': lambda: _get_sort_keys_for_json_doc(root_result=root_result, schema_sort_keys_cache={}),
+        'sort keys (structural)': lambda: get_sort_keys_for_json_doc(
+            compiled_schema=compiled_schema,
+            doc_data=doc_data,
+            resolve_if_schema=lambda location: resolve_schema_location(location, root_schema),
+        ),
+        'traverse': lambda: presorted_sorter.sort(doc_data),
+        'serialize': lambda: _serialize(sorted_doc_data),
+    }
+    return {phase: _measure(func, repeat) for phase, func in phases.items()}
+
+
+def _format_change(value: float, baseline_value: Optional[float]) -> str:
+    if not baseline_value:
+        return ''
+    return f'{(value / baseline_value - 1) * 100:+6.1f}%'
+
+
+def _print_results(
+    results: Dict[str, _PhaseResults], baseline_results: Optional[Dict[str, _PhaseResults]], threshold: float
+) -> List[str]:
+    """
+    @return: the regressions (phases slower than the baseline by more than the threshold percentage)
+    """
+    regressions = []
+    print(f'{"scenario":<12} {"phase":<24} {"time":>10} {"change":>8} {"peak memory":>12} {"change":>8}')
+    for scenario_name, phase_results in results.items():
+        for phase, result in phase_results.items():
+            baseline = (baseline_results or {}).get(scenario_name, {}).get(phase, {})
+            time_change = _format_change(result['time'], baseline.get('time'))
+            memory_change = _format_change(result['peak_memory'], baseline.get('peak_memory'))
+            print(
+                f'{scenario_name:<12} {phase:<24} {result["time"] * 1000:8.2f}ms {time_change:>8}'
+                f' {result["peak_memory"] / 1024:9.1f}KiB {memory_change:>8}'
+            )
+            if 'time' in baseline and result['time'] > baseline['time'] * (1 + threshold / 100):
+                regressions.append(f'{scenario_name}: {phase}')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000, metavar='N', help='number of items per scenario')
+    parser.add_argument('--repeat', type=int, default=5, metavar='N', help='number of runs per phase')
+    parser.add_argument(
+        '--scenario', choices=list(_SCENARIOS), action='append', dest='scenarios', help='scenario to run (default: all)'
+    )
+    parser.add_argument('--save', metavar='PATH', help='save the results as a baseline for later comparison')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results against a saved baseline')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=20,
+        metavar='PERCENT',
+        help='exit with a non-zero code if a phase is slower than the baseline by more than this (default: 20)',
+    )
+    args = parser.parse_args()
+
+    baseline_results = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['size'] != args.size:
+            parser.error(f'baseline was measured with --size {baseline["size"]}')
+        baseline_results = baseline['results']
+
+    results = {}
+    for scenario_name in args.scenarios or _SCENARIOS:
+        scenario = _SCENARIOS[scenario_name](args.size)
+        results[scenario_name] = _run_scenario(scenario, args.repeat)
+
+    regressions = _print_results(results, baseline_results, args.threshold)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(
+                {
+                    'python': platform.python_version(),
+                    'jschon': jschon.__version__,
+                    'size': args.size,
+                    'results': results,
+                },
+                f,
+                indent=2,
+            )
+
+    if regressions:
+        sys.exit(f'Slower than the baseline by more than {args.threshold:g}%: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
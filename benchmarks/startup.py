@@ -0,0 +1,45 @@
+"""
+Measures the CLI's fixed startup overhead, which dominates when processing a few small files
+(e.g. in editor-on-save and pre-commit hooks).
+
+Usage: python benchmarks/startup.py [--repeat N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+from typing import Tuple
+
+
+_SCENARIOS: List[Tuple[str, List[str]]] = [
+    ('python (baseline)', [sys.executable, '-c', 'pass']),
+    ('import jschon_tools.cli', [sys.executable, '-c', 'import jschon_tools.cli']),
+    ('jschon-sort --help', [sys.executable, '-c', 'from jschon_tools.cli import sort_main; sort_main()', '--help']),
+    ('import jschon_tools (API)', [sys.executable, '-c', 'from jschon_tools import SchemaSorter']),
+]
+
+
+def _measure(args: List[str], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20, metavar='N', help='number of runs per scenario')
+    args = parser.parse_args()
+
+    for name, scenario_args in _SCENARIOS:
+        timings = _measure(scenario_args, args.repeat)
+        print(f'{name:<30} min {min(timings) * 1000:7.1f}ms  median {statistics.median(timings) * 1000:7.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
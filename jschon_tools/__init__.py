@@ -1,5 +1,41 @@
-from ._main import process_json_doc
+from typing import Any
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from ._main import aprocess_json_doc
+    from ._main import is_sorted
+    from ._main import process_json_doc
+    from ._main import process_json_stream
+    from ._main import SchemaSorter
+    from ._schema_cache import get_schema_cache
+    from ._schema_cache import SchemaCache
+    from ._stats import ProcessingStats
 
 __all__ = [
+    'aprocess_json_doc',
+    'get_schema_cache',
+    'is_sorted',
     'process_json_doc',
+    'process_json_stream',
+    'ProcessingStats',
+    'SchemaCache',
+    'SchemaSorter',
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # the API (and jschon along with it) is imported on first use, so that the CLI can start without it
+    if name == 'ProcessingStats':
+        from ._stats import ProcessingStats
+
+        return ProcessingStats
+    if name in ('get_schema_cache', 'SchemaCache'):
+        from . import _schema_cache
+
+        return getattr(_schema_cache, name)
+    if name in __all__:
+        from . import _main
+
+        return getattr(_main, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,209 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterable
+from typing import AsyncIterator
+from typing import Dict
+from typing import Iterable
+from typing import Mapping
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import Union
+
+from jschon.json import JSONCompatible
+
+from ._stats import ProcessingStats
+from ._stats import StatsHook
+
+
+if TYPE_CHECKING:
+    from ._main import SchemaSorter
+
+
+# sorters constructed by process executors' workers, by schema key
+_worker_sorters: Dict[str, 'SchemaSorter'] = {}
+
+
+def _process_in_worker(
+    schema_key: str,
+    schema_data: Mapping[str, JSONCompatible],
+    cache_dir: Optional[str],
+    doc_data: JSONCompatible,
+    *,
+    sort: bool,
+    remove_additional_props: bool,
+    validate: bool,
+    collect_stats: bool,
+) -> Tuple[JSONCompatible, Optional[ProcessingStats]]:
+    from ._main import SchemaSorter
+
+    if (sorter := _worker_sorters.get(schema_key)) is None:
+        sorter = _worker_sorters[schema_key] = SchemaSorter(schema_data, cache_dir=cache_dir)
+    doc_stats = ProcessingStats() if collect_stats else None
+    # the document is a copy (pickled from the caller's process), so it's processed in place; its stats are
+    # reported by the caller
+    processed_doc_data = sorter._process_doc(
+        doc_data,
+        sort=sort,
+        remove_additional_props=remove_additional_props,
+        validate=validate,
+        in_place=True,
+        jobs=1,
+        removed=None,
+        doc_stats=doc_stats,
+    )
+    return processed_doc_data, doc_stats
+
+
+async def process_async(
+    sorter: 'SchemaSorter',
+    doc_data: JSONCompatible,
+    *,
+    sort: bool,
+    remove_additional_props: bool,
+    validate: bool,
+    in_place: bool,
+    stats: Optional[ProcessingStats],
+    stats_hook: Optional[StatsHook] = None,
+    executor: Optional[Executor],
+) -> JSONCompatible:
+    """
+    Processes a document in an executor (see `SchemaSorter.aprocess`).
+
+    @param stats_hook: if set, overrides the sorter's stats hook
+    """
+    loop = asyncio.get_running_loop()
+    doc_stats = sorter._create_doc_stats(stats, stats_hook=stats_hook)
+    if isinstance(executor, ProcessPoolExecutor):
+        if sorter._schema_data is None:
+            raise ValueError('Processing in a process executor requires the schema data')
+        processed_doc_data, doc_stats = await loop.run_in_executor(
+            executor,
+            functools.partial(
+                _process_in_worker,
+                sorter._get_schema_key(),
+                sorter._schema_data,
+                sorter._cache_dir,
+                doc_data,
+                sort=sort,
+                remove_additional_props=remove_additional_props,
+                validate=validate,
+                collect_stats=doc_stats is not None,
+            ),
+        )
+        sorter._report_doc_stats(doc_stats, None, stats_hook=stats_hook)
+    else:
+
+        def _process_doc() -> JSONCompatible:
+            processed_doc_data = sorter._process_doc(
+                doc_data,
+                sort=sort,
+                remove_additional_props=remove_additional_props,
+                validate=validate,
+                in_place=in_place,
+                jobs=1,
+                removed=None,
+                doc_stats=doc_stats,
+            )
+            sorter._report_doc_stats(doc_stats, None, stats_hook=stats_hook)
+            return processed_doc_data
+
+        processed_doc_data = await loop.run_in_executor(executor, _process_doc)
+    # the document's stats are collected separately and merged here (rather than by the executor's thread),
+    # so that documents processed concurrently don't update the stats at once
+    if stats is not None and doc_stats is not None:
+        stats.merge(doc_stats)
+    return processed_doc_data
+
+
+async def _iter_async(
+    docs: Union[Iterable[JSONCompatible], AsyncIterable[JSONCompatible]],
+) -> AsyncIterator[JSONCompatible]:
+    if isinstance(docs, AsyncIterable):
+        async for doc_data in docs:
+            yield doc_data
+    else:
+        for doc_data in docs:
+            yield doc_data
+
+
+async def process_many(
+    sorter: 'SchemaSorter',
+    docs: Union[Iterable[JSONCompatible], AsyncIterable[JSONCompatible]],
+    *,
+    concurrency: int,
+    ordered: bool,
+    sort: bool,
+    remove_additional_props: bool,
+    validate: bool,
+    in_place: bool,
+    stats: Optional[ProcessingStats],
+    executor: Optional[Executor],
+) -> AsyncIterator[JSONCompatible]:
+    """
+    Processes documents concurrently in an executor (see `SchemaSorter.process_many`).
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+
+    if not isinstance(executor, ProcessPoolExecutor):
+        # the schema is constructed (or loaded) once, before the executor's threads process documents with it
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, functools.partial(sorter._prepare, validate=validate))
+
+    docs_iter = _iter_async(docs).__aiter__()
+    docs_exhausted = False
+    # documents being processed, by their index
+    pending: Dict['asyncio.Future[JSONCompatible]', int] = {}
+    # documents processed ahead of those before them, by their index (when ordered)
+    processed: Dict[int, JSONCompatible] = {}
+    next_idx = 0
+    next_yield_idx = 0
+    try:
+        while True:
+            # Documents are only read while fewer than `concurrency` are being processed or held for ordering,
+            # so that a large (or unbounded) stream isn't read ahead of its processing
+            while not docs_exhausted and len(pending) + len(processed) < concurrency:
+                try:
+                    doc_data = await docs_iter.__anext__()
+                except StopAsyncIteration:
+                    docs_exhausted = True
+                    break
+                task: 'asyncio.Future[JSONCompatible]' = asyncio.ensure_future(
+                    process_async(
+                        sorter,
+                        doc_data,
+                        sort=sort,
+                        remove_additional_props=remove_additional_props,
+                        validate=validate,
+                        in_place=in_place,
+                        stats=stats,
+                        executor=executor,
+                    )
+                )
+                pending[task] = next_idx
+                next_idx += 1
+            if not pending:
+                return
+
+            done: Set['asyncio.Future[JSONCompatible]']
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=pending.__getitem__):
+                idx = pending.pop(task)
+                if not ordered:
+                    yield task.result()
+                    continue
+                processed[idx] = task.result()
+                while next_yield_idx in processed:
+                    yield processed.pop(next_yield_idx)
+                    next_yield_idx += 1
+    finally:
+        # e.g. if a document failed, or the caller stopped iterating
+        for task in pending:
+            task.cancel()
+            # tasks which already completed aren't cancelled, and their exceptions are retrieved (and discarded),
+            # so that they aren't reported as never retrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from jschon.json import JSONCompatible
+
+    from ._structural import CompiledSchema
+
+
+# bump when the format of cache entries changes
+_FORMAT_VERSION = 2
+_DEFAULT_MAX_SIZE = 32 * 1024 * 1024
+_ENTRY_SUFFIX = '.json'
+
+
+def get_default_cache_dir() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'jschon-sort')
+
+
+@functools.lru_cache(maxsize=None)
+def _get_versions() -> Tuple[str, ...]:
+    import importlib.metadata  # slow to import, and not needed when nothing's cached
+
+    versions = [str(_FORMAT_VERSION)]
+    for distribution_name in ('jschon-sort', 'jschon'):
+        try:
+            versions.append(importlib.metadata.version(distribution_name))
+        except importlib.metadata.PackageNotFoundError:  # pragma: no cover
+            versions.append('unknown')
+    return tuple(versions)
+
+
+def get_schema_key(schema_data: Mapping[str, JSONCompatible], *extra: JSONCompatible) -> str:
+    """
+    Gets a cache key for the schema's content (and any extra parameters), along with the versions of jschon-sort
+    and jschon (so that upgrading either doesn't reuse stale entries).
+    """
+    # the order of properties is significant, since it's what documents are sorted by
+    content = json.dumps([_get_versions(), schema_data, *extra], separators=(',', ':'))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class _CacheDir:
+    """
+    A directory of JSON cache entries.
+
+    Once the entries' total size exceeds the maximum size, the least recently used entries are evicted.
+    Failing to read or write an entry is not an error; it's treated as missing.
+    """
+
+    def __init__(self, cache_dir: str, *, max_size: int = _DEFAULT_MAX_SIZE) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def _get_entry_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name + _ENTRY_SUFFIX)
+
+    def _read_entry(self, name: str) -> Any:
+        entry_path = self._get_entry_path(name)
+        try:
+            with open(entry_path) as f:
+                data = json.load(f)
+            os.utime(entry_path)  # marks the entry as recently used
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def _write_entry(self, name: str, data: Any) -> None:
+        content = json.dumps(data, separators=(',', ':'))
+        tmp_file_name = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # written by way of a temporary file, so that concurrent readers never see a partial entry;
+            # it's synced before replacing the entry, so that a crash can't leave an entry truncated
+            # (and a truncated entry is treated as missing anyway)
+            with tempfile.NamedTemporaryFile('w', dir=self.cache_dir, prefix='.', delete=False) as tmp_file:
+                tmp_file_name = tmp_file.name
+                tmp_file.write(content)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_file_name, self._get_entry_path(name))
+            self._evict()
+        except OSError:
+            if tmp_file_name is not None and os.path.exists(tmp_file_name):
+                os.unlink(tmp_file_name)
+
+    def _evict(self) -> None:
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(_ENTRY_SUFFIX) and dir_entry.is_file():
+                    stat = dir_entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, dir_entry.path))
+                    total_size += stat.st_size
+
+        # least recently used last
+        entries.sort(reverse=True)
+        while entries and total_size > self.max_size:
+            _, size, path = entries.pop()
+            try:
+                os.unlink(path)
+            except FileNotFoundError:  # pragma: no cover
+                pass  # evicted concurrently
+            total_size -= size
+
+
+class CompiledSchemaCache(_CacheDir):
+    """
+    An on-disk cache of compiled schemas, keyed by `get_schema_key`.
+    """
+
+    def load(self, key: str) -> Optional[CompiledSchema]:
+        from ._structural import CompiledSchema
+
+        if (data := self._read_entry(key)) is None:
+            return None
+        try:
+            return CompiledSchema.from_json(data)
+        except (ValueError, LookupError, TypeError):
+            return None
+
+    def store(self, key: str, compiled_schema: CompiledSchema) -> None:
+        self._write_entry(key, compiled_schema.to_json())
+
+
+def _get_file_fingerprint(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+
+class RunCache(_CacheDir):
+    """
+    Records the files that a run left in canonical form (i.e. processed, or already canonical), so that later runs
+    with the same schema and settings can skip them without so much as reading them.
+
+    Files are recognized as unchanged by their modification time, size and inode.
+    """
+
+    def __init__(self, cache_dir: str, key: str, *, max_size: int = _DEFAULT_MAX_SIZE) -> None:
+        """
+        @param key: identifies the schema and settings (see `get_schema_key`)
+        """
+        super().__init__(cache_dir, max_size=max_size)
+        self._name = f'run-{key}'
+        self._fingerprints = self._read_fingerprints()
+        # the files added by this run, which are merged into the entry as saved by then (see `save`)
+        self._added_fingerprints: Dict[str, List[int]] = {}
+
+    def _read_fingerprints(self) -> Dict[str, List[int]]:
+        data = self._read_entry(self._name)
+        return data if isinstance(data, dict) else {}
+
+    def is_unchanged(self, path: str) -> bool:
+        fingerprint = self._fingerprints.get(os.path.realpath(path))
+        return fingerprint is not None and fingerprint == _get_file_fingerprint(path)
+
+    def add(self, path: str) -> None:
+        if (fingerprint := _get_file_fingerprint(path)) is not None:
+            real_path = os.path.realpath(path)
+            self._fingerprints[real_path] = self._added_fingerprints[real_path] = fingerprint
+
+    def save(self) -> None:
+        """
+        Merges the files added by this run into the saved entry, so that runs which save concurrently (e.g. on
+        different files) keep each other's files rather than the last one to save overwriting the rest.
+        Files which no longer exist (e.g. were deleted or renamed) are dropped, so that the entry doesn't keep growing.
+        """
+        if not self._added_fingerprints:
+            return
+        # re-read right before the entry is (atomically) replaced, to narrow the window for concurrent saves
+        fingerprints = {**self._read_fingerprints(), **self._added_fingerprints}
+        self._fingerprints = {path: fp for path, fp in fingerprints.items() if os.path.exists(path)}
+        self._write_entry(self._name, self._fingerprints)
+        self._added_fingerprints = {}
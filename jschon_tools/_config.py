@@ -0,0 +1,170 @@
+import fnmatch
+import glob
+import os
+import sys
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+
+CONFIG_FILE_NAME = '.jschon-sort.toml'
+_PYPROJECT_FILE_NAME = 'pyproject.toml'
+# the table of the configuration within pyproject.toml
+_PYPROJECT_TABLE = ('tool', 'jschon-sort')
+
+
+def _load_toml(path: str) -> Dict[str, Any]:
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:  # pragma: no cover
+        import tomli as tomllib
+
+    with open(path, 'rb') as f:
+        return tomllib.load(f)
+
+
+def _get_pyproject_config(data: Mapping[str, Any]) -> Optional[Any]:
+    table: Any = data
+    for key in _PYPROJECT_TABLE:
+        if not isinstance(table, Mapping) or (table := table.get(key)) is None:
+            return None
+    return table
+
+
+def find_config(directory: str) -> Optional[str]:
+    """
+    Finds the configuration file which applies to the directory: a .jschon-sort.toml, or a pyproject.toml
+    with a [tool.jschon-sort] table, within the directory or the closest of its parents.
+    """
+    directory = os.path.abspath(directory)
+    while True:
+        if os.path.isfile(config_path := os.path.join(directory, CONFIG_FILE_NAME)):
+            return config_path
+        if os.path.isfile(pyproject_path := os.path.join(directory, _PYPROJECT_FILE_NAME)):
+            if _get_pyproject_config(_load_toml(pyproject_path)) is not None:
+                return pyproject_path
+        if (parent := os.path.dirname(directory)) == directory:
+            return None
+        directory = parent
+
+
+def _split_path(path: str) -> List[str]:
+    return os.path.abspath(path).split(os.sep)
+
+
+def _match_path(components: Sequence[str], pattern_components: Sequence[str]) -> bool:
+    """
+    Matches a path against a glob pattern (both split into components), as recursive `glob.glob` would find it,
+    i.e. "**" matches any number of directories, and wildcards don't match hidden files and directories.
+    """
+    if not pattern_components:
+        return not components
+    pattern_component, *rest_pattern_components = pattern_components
+    if pattern_component == '**':
+        for idx in range(len(components) + 1):
+            if _match_path(components[idx:], rest_pattern_components):
+                return True
+            if idx < len(components) and components[idx].startswith('.'):
+                return False
+        return False
+    if not components or (components[0].startswith('.') and not pattern_component.startswith('.')):
+        return False
+    return fnmatch.fnmatch(components[0], pattern_component) and _match_path(components[1:], rest_pattern_components)
+
+
+class SchemaConfig:
+    """
+    Associates documents with schemas by glob patterns (relative to the configuration file's directory), e.g.::
+
+        [schemas]  # [tool.jschon-sort.schemas] in pyproject.toml
+        "configs/**/*.yaml" = "schemas/config.json"
+        "data/*.json" = "schemas/data.json"
+
+    A document is associated with the schema of the first pattern that matches it.
+    """
+
+    def __init__(self, base_dir: str, schemas: Sequence[Tuple[str, str]]) -> None:
+        """
+        @param base_dir: directory to which the patterns and schema paths are relative
+        @param schemas: glob patterns, and the paths of the schemas of the documents they match
+        """
+        self.base_dir = base_dir
+        self.schemas = schemas
+
+    @classmethod
+    def load(cls, path: str) -> 'SchemaConfig':
+        """
+        @raise ValueError: if the configuration is invalid
+        """
+        try:
+            data = _load_toml(path)
+        except ValueError as e:  # i.e. TOMLDecodeError
+            raise ValueError(f'{path}: {e}') from e
+        if os.path.basename(path) == _PYPROJECT_FILE_NAME:
+            data = _get_pyproject_config(data) or {}
+        schemas = data.get('schemas') if isinstance(data, Mapping) else None
+        if (
+            not isinstance(schemas, Mapping)
+            or not schemas
+            or not all(isinstance(schema_path, str) for schema_path in schemas.values())
+        ):
+            raise ValueError(f'{path}: "schemas" must map glob patterns to schema paths')
+        return cls(os.path.dirname(path), list(schemas.items()))
+
+    def group_paths(self, paths: Optional[Sequence[str]] = None) -> Tuple[Dict[str, List[str]], List[str]]:
+        """
+        Groups documents by their schemas.
+
+        @param paths: paths of the documents to group; if not set, the documents matching the patterns are found
+        @return: the documents' paths by the paths of their schemas (in the order the schemas are configured),
+                 and the paths of the documents which no pattern matches
+        """
+        base_dir = os.path.relpath(self.base_dir) if self.base_dir else os.curdir
+        schema_paths: Dict[str, List[str]] = {
+            os.path.normpath(os.path.join(base_dir, schema_path)): [] for _, schema_path in self.schemas
+        }
+        unmatched_paths: List[str] = []
+        if paths is None:
+            # the documents' paths, and the schemas of the documents that patterns match, by absolute path
+            doc_schema_paths: Dict[str, Tuple[str, str]] = {}
+            for pattern, schema_path in self.schemas:
+                schema_path = os.path.normpath(os.path.join(base_dir, schema_path))
+                for doc_path in sorted(glob.glob(os.path.join(base_dir, pattern), recursive=True)):
+                    doc_path = os.path.normpath(doc_path)
+                    # e.g. "**/*.json" may match the schemas themselves
+                    if os.path.isfile(doc_path) and doc_path not in schema_paths:
+                        doc_schema_paths.setdefault(os.path.abspath(doc_path), (doc_path, schema_path))
+            for doc_path, schema_path in doc_schema_paths.values():
+                schema_paths[schema_path].append(doc_path)
+        else:
+            # the given paths are matched against the patterns, rather than the patterns being globbed
+            # (which would walk the whole tree, e.g. for "**/*.json")
+            pattern_schema_paths = [
+                (_split_path(os.path.join(base_dir, pattern)), os.path.normpath(os.path.join(base_dir, schema_path)))
+                for pattern, schema_path in self.schemas
+            ]
+            abs_schema_paths = {os.path.abspath(schema_path) for schema_path in schema_paths}
+            for doc_path in paths:
+                doc_path_components = _split_path(doc_path)
+                matched_schema_path = next(
+                    (
+                        schema_path
+                        for pattern_components, schema_path in pattern_schema_paths
+                        if _match_path(doc_path_components, pattern_components)
+                    ),
+                    None,
+                )
+                if (
+                    matched_schema_path is not None
+                    and os.path.isfile(doc_path)
+                    and os.path.abspath(doc_path) not in abs_schema_paths
+                ):
+                    schema_paths[matched_schema_path].append(doc_path)
+                else:
+                    unmatched_paths.append(doc_path)
+
+        return {schema_path: doc_paths for schema_path, doc_paths in schema_paths.items() if doc_paths}, unmatched_paths
@@ -0,0 +1,311 @@
+import copy
+from typing import cast
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import Union
+
+import jschon.exceptions
+from jschon.json import JSONCompatible
+from jschon.jsonpatch import PatchOp
+
+from ._parallel import _get_child_schemas
+from ._parallel import _SplitNode
+from ._parallel import validate_shape
+from ._stats import ProcessingStats
+from ._stats import time_phase
+
+
+if TYPE_CHECKING:
+    from ._main import SchemaSorter
+
+
+def _get_item_key(node: JSONCompatible, token: str) -> Optional[Union[str, int]]:
+    """
+    @return: the key of the object's property (or the index of the array's item) that a JSON pointer token
+             refers to, or None if there's none
+    """
+    if isinstance(node, dict):
+        return token if token in node else None
+    if isinstance(node, list) and (token == '0' or token.isdigit() and token[0] != '0') and int(token) < len(node):
+        return int(token)
+    return None
+
+
+def _shift_indices(
+    paths: Dict[jschon.JSONPointer, None], array_path: jschon.JSONPointer, index: int, delta: int
+) -> Dict[jschon.JSONPointer, None]:
+    """
+    Updates locations within an array's items for an item inserted (delta 1) or removed (delta -1) at the index;
+    those within a removed item are dropped.
+    """
+    depth = len(array_path)
+    shifted_paths: Dict[jschon.JSONPointer, None] = {}
+    for path in paths:
+        if len(path) > depth and path[:depth] == array_path and path[depth].isdigit():
+            if (item_index := int(path[depth])) == index and delta < 0:
+                continue
+            if item_index >= index:
+                path = jschon.JSONPointer(path[:depth], [str(item_index + delta)], path[depth + 1 :])
+        shifted_paths[path] = None
+    return shifted_paths
+
+
+class IncrementalProcessor:
+    """
+    Re-processes the parts of a processed document that have since changed, each against the subschema it maps to,
+    leaving the rest of the document as it is (see `SchemaSorter.process_changed`).
+    """
+
+    def __init__(
+        self,
+        sorter: 'SchemaSorter',
+        doc_data: JSONCompatible,
+        *,
+        sort: bool,
+        remove_additional_props: bool,
+        validate: bool,
+        in_place: bool,
+        stats: Optional[ProcessingStats],
+    ) -> None:
+        self.sorter = sorter
+        self.doc_data = doc_data
+        self.sort = sort
+        self.remove_additional_props = remove_additional_props
+        self.validate = validate
+        self.in_place = in_place
+        self.stats = stats
+        # locations of the values that changed (or were added), and of the objects and arrays that properties
+        # (or items) were removed from
+        self.changed_paths: Dict[jschon.JSONPointer, None] = {}
+        self.container_paths: Dict[jschon.JSONPointer, None] = {}
+        # unless in place, the objects and arrays copied so that they can be modified, by id
+        self._copies: Dict[int, JSONCompatible] = {}
+
+    def _copy_path(self, path: jschon.JSONPointer) -> None:
+        """
+        Unless in place, copies the objects and arrays along the path (from the root to the node at the path)
+        which aren't copies already, so that they can be modified without modifying the document.
+        Copying stops where the path can't be followed.
+        """
+        if self.in_place:
+            return
+        parent: JSONCompatible = None
+        node = self.doc_data
+        for depth in range(len(path) + 1):
+            if depth:
+                if (key := _get_item_key(node, path[depth - 1])) is None:
+                    return
+                parent = node
+                node = node[key]  # type: ignore[index]
+            if not isinstance(node, (dict, list)):
+                return
+            if id(node) not in self._copies:
+                # to maintain YAML round-trip data, the node's type (and its comments) are copied along with it
+                node = copy.copy(node)
+                self._copies[id(node)] = node
+                if depth:
+                    parent[key] = node  # type: ignore[index]
+                else:
+                    self.doc_data = node
+
+    def apply_patch(self, patch: Iterable[Mapping[str, JSONCompatible]]) -> None:
+        """
+        Applies a JSON Patch, recording the locations it changes.
+
+        @raise ValueError: if the patch is invalid, or can't be applied
+        """
+        with time_phase(self.stats, 'traverse'):
+            try:
+                for operation in patch:
+                    self._apply_operation(operation)
+            except (
+                jschon.exceptions.JSONPatchError,
+                jschon.exceptions.JSONPointerError,
+                KeyError,
+                TypeError,
+                ValueError,
+            ) as e:
+                raise ValueError(f'Failed to apply JSON Patch: {e!r}') from e
+
+    def _apply_operation(self, operation: Mapping[str, JSONCompatible]) -> None:
+        op = operation['op']
+        path = jschon.JSONPointer(cast(str, operation['path']))
+        if op == 'test':
+            jschon.JSONPatchOperation(op=PatchOp.TEST, path=path, value=operation['value']).apply(self.doc_data)
+        elif op == 'remove':
+            self._remove(path)
+        elif op == 'move':
+            from_ = jschon.JSONPointer(cast(str, operation['from']))
+            value = from_.evaluate(self.doc_data)
+            self._remove(from_)
+            self._add(path, value, replace=False)
+        elif op == 'copy':
+            self._add(path, jschon.JSONPointer(cast(str, operation['from'])).evaluate(self.doc_data), replace=False)
+        elif op in ('add', 'replace'):
+            self._add(path, operation['value'], replace=op == 'replace')
+        else:
+            raise ValueError(f'Unknown operation {op!r}')
+
+    def _get_parent(self, path: jschon.JSONPointer) -> JSONCompatible:
+        """
+        Gets the object or array containing the location (copying it, along with its ancestors, unless in place).
+
+        @return: the parent, or None for the root
+        """
+        if not path:
+            return None
+        self._copy_path(path[:-1])
+        parent = path[:-1].evaluate(self.doc_data)
+        if not isinstance(parent, (dict, list)):
+            raise jschon.exceptions.JSONPatchError(f'Expecting an array or object at {path[:-1]}')
+        return parent
+
+    def _remove(self, path: jschon.JSONPointer) -> None:
+        parent = self._get_parent(path)
+        self.doc_data = jschon.JSONPatchOperation(op=PatchOp.REMOVE, path=path).apply(self.doc_data)
+        if not path:
+            self.changed_paths = {path: None}
+        elif isinstance(parent, list):
+            self.changed_paths = _shift_indices(self.changed_paths, path[:-1], int(path[-1]), -1)
+            self.container_paths = _shift_indices(self.container_paths, path[:-1], int(path[-1]), -1)
+            self.container_paths[path[:-1]] = None
+        else:
+            self.container_paths[path[:-1]] = None
+
+    def _add(self, path: jschon.JSONPointer, value: JSONCompatible, *, replace: bool) -> None:
+        parent = self._get_parent(path)
+        op = PatchOp.REPLACE if replace else PatchOp.ADD
+        index = len(parent) if isinstance(parent, list) and path[-1] == '-' else None
+        self.doc_data = jschon.JSONPatchOperation(op=op, path=path, value=value).apply(self.doc_data)
+        if isinstance(parent, list) and not replace:
+            if index is None:
+                index = int(path[-1])
+            else:
+                path = path[:-1] / str(index)
+            self.changed_paths = _shift_indices(self.changed_paths, path[:-1], index, 1)
+            self.container_paths = _shift_indices(self.container_paths, path[:-1], index, 1)
+        self.changed_paths[path] = None
+
+    def _locate(self, path: jschon.JSONPointer) -> Optional[Tuple[int, str, JSONCompatible, Optional[_SplitNode]]]:
+        """
+        Follows the path from the root, through the objects and arrays whose values the schema maps
+        to subschemas statically (see `split_doc`).
+
+        @return: the depth it was followed to (short of the path's length, if it reaches an object or array
+                 which the schema doesn't map statically), the subschema of the node reached (relative to the
+                 sorter's schema) and the node, along with its split node if it's mapped statically;
+                 None if there's no node at the path
+        """
+        node = self.doc_data
+        schema = self.sorter.root_schema
+        relpath = ''
+        for depth in range(len(path) + 1):
+            split_node = None
+            if isinstance(node, (dict, list)) and (child_schemas_info := _get_child_schemas(schema, node)) is not None:
+                child_schemas, shape_schema_data, sort_keys = child_schemas_info
+                split_node = _SplitNode(node, schema, shape_schema_data, sort_keys)
+            if depth == len(path) or (split_node is None and isinstance(node, (dict, list))):
+                return depth, relpath, node, split_node
+            if (key := _get_item_key(node, path[depth])) is None:
+                return None
+            child_relpath, schema = child_schemas[
+                key if isinstance(key, int) else list(cast(Dict[str, JSONCompatible], node)).index(key)
+            ]
+            relpath += child_relpath
+            node = node[key]  # type: ignore[index]
+        raise AssertionError  # pragma: no cover
+
+    def _process_value(self, path: jschon.JSONPointer, relpath: str) -> None:
+        """
+        Processes the value at the path whole, against its subschema.
+        """
+        if (sorter := self.sorter._subschema_sorters.get(relpath)) is None:
+            sorter = self.sorter._subschema_sorters[relpath] = self.sorter.get_subschema_sorter(relpath)
+        if path:
+            self._copy_path(path[:-1])
+        processed_value = sorter._process_doc(
+            path.evaluate(self.doc_data),
+            sort=self.sort,
+            remove_additional_props=self.remove_additional_props,
+            validate=self.validate,
+            in_place=self.in_place,
+            jobs=1,
+            removed=None,
+            doc_stats=self.stats,
+        )
+        if not path:
+            self.doc_data = processed_value
+        else:
+            parent = path[:-1].evaluate(self.doc_data)
+            parent[_get_item_key(parent, path[-1])] = processed_value
+
+    def _process_container(self, path: jschon.JSONPointer, split_node: _SplitNode) -> None:
+        """
+        Processes an object's keys (or an array's length) alone: an object's properties are re-sorted,
+        and if validating, the object is validated against its schema's keywords other than its values' subschemas.
+        """
+        if self.validate:
+            validate_shape(split_node, self.sorter._shape_schemas, self.stats)
+        if self.stats is not None:
+            self.stats.doc_nodes_visited += 1
+        if not self.sort or not isinstance(split_node.node, dict):
+            return
+        with time_phase(self.stats, 'traverse'):
+            keys = list(split_node.node)
+            sort_keys = dict(zip(keys, split_node.sort_keys))
+            sorted_keys = sorted(keys, key=lambda k: (sort_keys[k], k))
+            if sorted_keys == keys:
+                return
+            self._copy_path(path)
+            node = path.evaluate(self.doc_data)
+            properties = [(k, node[k]) for k in sorted_keys]
+            node.clear()
+            node.update(properties)
+
+    def process(self) -> JSONCompatible:
+        """
+        Processes the changed values (each whole, against its subschema) and their parents' keys.
+
+        @return: the processed document
+        """
+        with time_phase(self.stats, 'compile'):
+            self.sorter._ensure_compiled()
+        # properties (or items) may have been added to the parents of changed values
+        for path in self.changed_paths:
+            if path:
+                self.container_paths[path[:-1]] = None
+
+        # values to process whole by their locations, along with their subschemas
+        value_paths: Dict[jschon.JSONPointer, str] = {}
+        split_nodes: List[Tuple[jschon.JSONPointer, _SplitNode]] = []
+        with time_phase(self.stats, 'traverse'):
+            for path in self.changed_paths:
+                if (location := self._locate(path)) is not None:
+                    depth, relpath, _, _ = location
+                    value_paths[path[:depth]] = relpath
+            for path in self.container_paths:
+                if (location := self._locate(path)) is None:
+                    continue
+                depth, relpath, _, split_node = location
+                if depth < len(path) or split_node is None:
+                    value_paths[path[:depth]] = relpath
+                else:
+                    split_nodes.append((path, split_node))
+
+        # values within others processed whole are processed along with them
+        value_paths = {
+            path: relpath
+            for path, relpath in value_paths.items()
+            if not any(path[:depth] in value_paths for depth in range(len(path)))
+        }
+        for path, relpath in value_paths.items():
+            self._process_value(path, relpath)
+        for path, split_node in split_nodes:
+            if not any(path[:depth] in value_paths for depth in range(len(path) + 1)):
+                self._process_container(path, split_node)
+        return self.doc_data
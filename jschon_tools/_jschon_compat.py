@@ -0,0 +1,73 @@
+import functools
+import inspect
+from typing import Any
+from typing import cast
+from typing import Dict
+from typing import Mapping
+
+import jschon
+from jschon.json import JSONCompatible
+
+
+# The jschon catalog keeps schemas in separate caches (so that e.g. schemas with the same URI can coexist), and
+# a schema's references are looked up in the cache it was constructed in; so the schemas looked up on behalf of
+# a schema are looked up in its cache. jschon 0.10 renamed the cache's identifier from "session" to "cacheid",
+# both as the schema's attribute and as the catalog's (and the schema constructor's) parameter.
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cache_id_name() -> str:
+    return 'cacheid' if 'cacheid' in inspect.signature(jschon.Catalog.get_schema).parameters else 'session'
+
+
+def _get_cache_id_kwargs(schema: jschon.JSONSchema) -> Dict[str, Any]:
+    """
+    @return: keyword arguments identifying the catalog cache that the schema is in
+    """
+    cache_id_name = _get_cache_id_name()
+    return {cache_id_name: getattr(schema, cache_id_name)}
+
+
+def get_schema_for(schema: jschon.JSONSchema, uri: jschon.URI) -> jschon.JSONSchema:
+    """
+    Looks up (or loads) a schema by its URI, as the schema's references are.
+
+    @raise jschon.exceptions.CatalogError: if there's no schema by the URI
+    """
+    return schema.catalog.get_schema(uri, **_get_cache_id_kwargs(schema))
+
+
+def get_document_root(schema: jschon.JSONSchema) -> jschon.JSONSchema:
+    """
+    Gets the schema at the root of the schema's document (as `JSONSchema.document_rootschema` does, since jschon 0.11).
+    """
+    while (parent_schema := schema.parentschema) is not None:
+        schema = parent_schema
+    return schema
+
+
+def create_schema_for(schema: jschon.JSONSchema, value: Mapping[str, JSONCompatible]) -> jschon.JSONSchema:
+    """
+    Constructs a schema alongside another (i.e. with its metaschema, and in its catalog cache), e.g. a variant of it.
+    """
+    return jschon.JSONSchema(
+        value,
+        catalog=schema.catalog,
+        metaschema_uri=cast(jschon.URI, schema.metaschema_uri),
+        **_get_cache_id_kwargs(schema),
+    )
+
+
+def remove_document(root_schema: jschon.JSONSchema) -> None:
+    """
+    Removes a schema document (i.e. its root schema, and its subschemas with an "$id") from its catalog cache.
+    """
+    # jschon has no API for listing the schemas in a cache, so its private one (of schemas by URI, by cache id) is
+    # read; this was checked against jschon 0.9.0 through 0.11.1, and schemas are just kept if it has changed since
+    cache_id_name = _get_cache_id_name()
+    cache_id = getattr(root_schema, cache_id_name)
+    cached_schemas = getattr(root_schema.catalog, '_schema_cache', {}).get(cache_id, {})
+    for uri, schema in list(cached_schemas.items()):
+        # a schema with the same URI which has since replaced it is kept
+        if get_document_root(schema) is root_schema:
+            root_schema.catalog.del_schema(uri, **{cache_id_name: cache_id})
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import math
+import re
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from jschon.json import JSONCompatible
+
+
+JSON_BACKENDS = ('json', 'orjson')
+
+# maps digits to b'0', and everything else to b' '
+_DIGITS_TABLE = bytes(ord('0') if b in b'0123456789' else ord(' ') for b in range(256))
+# orjson formats floats of 1e16 and above (and nonzero ones below 1e-4) unlike repr, e.g. 1e16 rather than 1e+16;
+# as dumped with indent, values (unlike strings' contents) are followed by a newline or the end of the document
+_NON_REPR_FLOATS = (re.compile(rb'e-?[0-9]+,?(?:\n|\Z)'), re.compile(rb'0\.0000[0-9]*,?(?:\n|\Z)'))
+# characters which the standard library escapes (with ensure_ascii), and orjson doesn't
+_NON_ASCII = re.compile('[^\x00-\x7e]+')
+
+
+class _NonFiniteFloat(float):
+    """
+    NaN or infinity; orjson (which would dump them as null) refuses to dump float subclasses.
+    """
+
+
+def _parse_float(s: str) -> float:
+    value = float(s)
+    return value if math.isfinite(value) else _NonFiniteFloat(value)
+
+
+def _reindent(text: str, indent: int) -> str:
+    """
+    Changes the indent of JSON dumped with an indent of 2.
+    """
+    # lines start with 2 spaces per level (strings can't span lines), and are re-indented from the deepest level,
+    # with NUL characters (which strings can't contain either) until all levels are re-indented
+    depth = 0
+    while f'\n{"  " * (depth + 1)}' in text:
+        depth += 1
+    for level in range(depth, 0, -1):
+        text = text.replace(f'\n{"  " * level}', f'\n{chr(0) * (indent * level)}')
+    return text.replace(chr(0), ' ')
+
+
+class JsonBackend:
+    """
+    Loads and dumps JSON documents with the standard library.
+    """
+
+    def load(self, path: str) -> JSONCompatible:
+        doc_data: JSONCompatible
+        with open(path) as f:
+            doc_data = json.load(f)
+
+        return doc_data
+
+    def dumps(self, doc_data: JSONCompatible, *, indent: int) -> str:
+        return json.dumps(doc_data, indent=indent)
+
+
+class _OrjsonBackend(JsonBackend):
+    """
+    Loads and dumps JSON documents with orjson, writing the same output as the standard library.
+
+    Documents which orjson would load or dump differently (e.g. with NaN, or integers beyond 64 bits)
+    are loaded or dumped by the standard library instead.
+    """
+
+    def load(self, path: str) -> JSONCompatible:
+        import orjson
+
+        doc_data: JSONCompatible
+        with open(path, 'rb') as f:
+            data = f.read()
+        # orjson loads integers beyond 64 bits as floats, so documents with such (or any similarly long digit runs)
+        # are loaded by the standard library
+        if b'0' * 19 not in data.translate(_DIGITS_TABLE):
+            try:
+                doc_data = orjson.loads(data)
+                return doc_data
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN, which the standard library accepts, or invalid JSON, which it reports
+
+        with open(path) as f:
+            doc_data = json.load(f, parse_float=_parse_float, parse_constant=_NonFiniteFloat)
+
+        return doc_data
+
+    def dumps(self, doc_data: JSONCompatible, *, indent: int) -> str:
+        import orjson
+
+        try:
+            dumped = orjson.dumps(doc_data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:  # e.g. integers beyond 64 bits, or non-finite floats
+            return super().dumps(doc_data, indent=indent)
+        if any(regex.search(dumped) for regex in _NON_REPR_FLOATS):
+            return super().dumps(doc_data, indent=indent)
+
+        text = dumped.decode()
+        if not dumped.isascii() or '\x7f' in text:
+            text = _NON_ASCII.sub(lambda m: json.encoder.encode_basestring_ascii(m.group())[1:-1], text)
+        if indent != 2:
+            text = _reindent(text, indent)
+        return text
+
+
+def get_json_backend(name: str) -> JsonBackend:
+    """
+    @param name: one of JSON_BACKENDS
+    @raise ValueError: if the backend's library is not installed
+    """
+    if name == 'orjson':
+        if importlib.util.find_spec('orjson') is None:
+            raise ValueError('orjson is not installed')
+        return _OrjsonBackend()
+    return JsonBackend()
@@ -1,141 +1,989 @@
-import math
+import functools
+from concurrent.futures import Executor
+from typing import AsyncIterable
+from typing import AsyncIterator
 from typing import cast
+from typing import Container
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Mapping
+from typing import Optional
 from typing import Sequence
 from typing import Tuple
+from typing import Union
 
+import jschon.exceptions
 import jschon.jsonschema
 from jschon.json import JSONCompatible
 
+from ._cache import CompiledSchemaCache
+from ._cache import get_schema_key
+from ._stats import ProcessingStats
+from ._stats import StatsHook
+from ._stats import time_phase
+from ._structural import compile_schema
+from ._structural import CompiledSchema
+from ._structural import END_SORT_KEY
+from ._structural import get_child_sort_key
+from ._structural import get_sort_keys_for_json_doc
+from ._structural import resolve_schema_location
 
-_END_SORT_KEY = (math.inf,)
 
+# maximal number of memoized property orders (see _get_property_order)
+_PROPERTY_ORDERS_CACHE_SIZE = 4096
 
-def _get_sort_keys_for_json_nodes(root_node: jschon.JSON) -> Mapping[jschon.JSONPointer, Tuple[int, ...]]:
+
+class _SchemaSortKeys:
     """
-    Gets a mapping from JSON nodes (as JSON pointers) to sort keys (as tuples of integers) that match their position
-    within the JSON.
+    Sort keys (as packed integers, see get_child_sort_key) of JSON nodes (as JSON pointers) that match their
+    position within the JSON.
+
+    Sort keys are computed on demand, only for the requested nodes and their ancestors, so that nodes which
+    are never evaluated (e.g. large "enum" or "examples" values, unused "$defs") are never visited.
     """
-    mapping = {}
-    root_depth = len(root_node.path)
 
-    def _recurse(node: jschon.JSON, node_sort_key: Tuple[int, ...]) -> None:
-        relative_path = node.path[root_depth:]
-        mapping[relative_path] = node_sort_key
+    def __init__(self, root_node: jschon.JSON) -> None:
+        self._entries: Dict[jschon.JSONPointer, Tuple[int, jschon.JSON]] = {
+            jschon.JSONPointer(): (0, root_node),
+        }
+        self._child_indices: Dict[jschon.JSONPointer, Mapping[str, int]] = {}
 
-        if node.type == "object":
-            object_data = cast(Mapping[str, jschon.JSON], node.data)
-            for idx, v in enumerate(object_data.values()):
-                new_loc = (*node_sort_key, idx)
-                _recurse(v, new_loc)
-        elif node.type == "array":
-            array_data = cast(Sequence[jschon.JSON], node.data)
-            for idx, v in enumerate(array_data):
-                new_loc = (*node_sort_key, idx)
-                _recurse(v, new_loc)
+    def _get_entry(self, relpath: jschon.JSONPointer) -> Tuple[int, jschon.JSON]:
+        if (entry := self._entries.get(relpath)) is not None:
+            return entry
 
-    _recurse(root_node, ())
+        parent_relpath = relpath[:-1]
+        parent_sort_key, parent_node = self._get_entry(parent_relpath)
+        key = relpath[-1]
+        if parent_node.type == "object":
+            object_data = cast(Mapping[str, jschon.JSON], parent_node.data)
+            if (child_indices := self._child_indices.get(parent_relpath)) is None:
+                child_indices = {k: idx for idx, k in enumerate(object_data)}
+                self._child_indices[parent_relpath] = child_indices
+            idx = child_indices[key]
+            node = object_data[key]
+        else:
+            array_data = cast(Sequence[jschon.JSON], parent_node.data)
+            idx = int(key)
+            node = array_data[idx]
 
-    return mapping
+        entry = get_child_sort_key(parent_sort_key, len(parent_relpath), idx), node
+        self._entries[relpath] = entry
+        return entry
 
+    def __getitem__(self, relpath: jschon.JSONPointer) -> int:
+        return self._get_entry(relpath)[0]
 
-def _get_sort_keys_for_json_doc(
-    *, root_result: jschon.jsonschema.Result
-) -> Mapping[jschon.JSONPointer, Tuple[int, ...]]:
-    schema_sort_keys_cache: Dict[jschon.URI, Mapping[jschon.JSONPointer, Tuple[int, ...]]] = {}
-
-    def _get_sort_keys_for_schema(schema: jschon.JSONSchema) -> Mapping[jschon.JSONPointer, Tuple[int, ...]]:
-        canonical_uri = schema.canonical_uri
-        if canonical_uri is None:  # pragma: no cover
-            raise ValueError('Schema must have a canonical URI')
-        if sort_keys := schema_sort_keys_cache.get(canonical_uri):
-            return sort_keys
-        sort_keys = _get_sort_keys_for_json_nodes(schema)
-        schema_sort_keys_cache[canonical_uri] = sort_keys
+    def __len__(self) -> int:
+        """
+        Gets the number of schema nodes whose sort keys were computed.
+        """
+        return len(self._entries)
+
+
+_SchemaSortKeysCache = Dict[jschon.URI, _SchemaSortKeys]
+
+
+def _get_sort_keys_for_schema(
+    schema: jschon.JSONSchema, schema_sort_keys_cache: _SchemaSortKeysCache, stats: Optional[ProcessingStats] = None
+) -> _SchemaSortKeys:
+    canonical_uri = schema.canonical_uri
+    if canonical_uri is None:  # pragma: no cover
+        raise ValueError('Schema must have a canonical URI')
+    if sort_keys := schema_sort_keys_cache.get(canonical_uri):
+        if stats is not None:
+            stats.sort_keys_cache_hits += 1
         return sort_keys
+    if stats is not None:
+        stats.sort_keys_cache_misses += 1
+    sort_keys = _SchemaSortKeys(schema)
+    schema_sort_keys_cache[canonical_uri] = sort_keys
+    return sort_keys
+
 
-    doc_sort_keys: Dict[jschon.JSONPointer, Tuple[int, ...]] = {}
+def _get_sort_keys_for_json_doc(
+    *,
+    root_result: jschon.jsonschema.Result,
+    schema_sort_keys_cache: _SchemaSortKeysCache,
+    stats: Optional[ProcessingStats] = None,
+) -> Mapping[jschon.JSONPointer, int]:
+    """
+    Gets a mapping from document nodes (as JSON pointers) to the sort keys of the schema nodes that evaluated them.
+
+    @param root_result: result of evaluating the document against the root schema
+    @param schema_sort_keys_cache: sort keys of schemas, by canonical URI; populated as schemas are encountered
+    @param stats: if set, populated with the number of result nodes traversed, schema nodes keyed and cache lookups
+    """
+    doc_sort_keys: Dict[jschon.JSONPointer, int] = {}
 
-    def _traverse_result(result: jschon.jsonschema.Result) -> None:
-        schema_sort_keys = _get_sort_keys_for_schema(result.schema)
+    keyed_before = _count_schema_nodes_keyed(schema_sort_keys_cache) if stats is not None else 0
+
+    # the result tree is traversed in pre-order, keeping the children iterators on a stack (rather than recursing),
+    # so that deeply nested documents don't exceed the recursion limit
+    children_stack: List[Iterator[jschon.jsonschema.Result]] = [iter((root_result,))]
+    while children_stack:
+        if (result := next(children_stack[-1], None)) is None:
+            children_stack.pop()
+            continue
+        if stats is not None:
+            stats.result_nodes += 1
+        schema_sort_keys = _get_sort_keys_for_schema(result.schema, schema_sort_keys_cache, stats)
         doc_sort_keys.setdefault(result.instance.path, schema_sort_keys[result.relpath])
-        for child in result.children.values():
-            _traverse_result(child)
+        children_stack.append(iter(result.children.values()))
 
-    _traverse_result(root_result)
+    if stats is not None:
+        stats.schema_nodes_keyed += _count_schema_nodes_keyed(schema_sort_keys_cache) - keyed_before
 
     return doc_sort_keys
 
 
-def _get_root_result(doc_json: jschon.JSON, schema_data: Mapping[str, JSONCompatible]) -> jschon.jsonschema.Result:
+def _count_schema_nodes_keyed(schema_sort_keys_cache: _SchemaSortKeysCache) -> int:
+    return sum(len(sort_keys) for sort_keys in schema_sort_keys_cache.values())
+
+
+# objects with the same keys mapping to the same schema nodes (e.g. the items of an array of objects) are ordered
+# alike, so the orders of the most recently seen are memoized (a bounded number, since each is keyed by its keys)
+@functools.lru_cache(maxsize=_PROPERTY_ORDERS_CACHE_SIZE)
+def _get_property_order(
+    keys: Tuple[str, ...], sort_keys: Tuple[int, ...], *, sort: bool, remove_additional_props: bool
+) -> Optional[Tuple[int, ...]]:
+    """
+    Gets the order of an object's properties once processed.
+
+    @param keys: the object's keys
+    @param sort_keys: the sort keys of the object's properties (END_SORT_KEY for those not mapping to the schema)
+    @return: indices of the properties to keep, in order, or None if the object is unchanged
+    """
+    # Keys which don't map to the schema (e.g. undefined properties when additionalProperties is
+    # missing, defaulting to true) are assumed to come last (end_sort_key).
+    # As a tie breaker for multiple such undefined properties, we use the key's name.
+    # TODO: update jschon to add additional properties to res.children when appropriate
+    order = [idx for idx, sk in enumerate(sort_keys) if sk != END_SORT_KEY or not remove_additional_props]
+    if sort:
+        order.sort(key=lambda idx: (sort_keys[idx], keys[idx]))
+    if order == list(range(len(keys))):
+        return None
+    return tuple(order)
+
+
+def _iter_children(
+    node: Union[Dict[str, JSONCompatible], List[JSONCompatible]],
+) -> Iterator[Tuple[Union[str, int], JSONCompatible]]:
+    """
+    Iterates an object's properties or an array's indices, with their values.
+    """
+    return iter(node.items()) if isinstance(node, dict) else enumerate(node)
+
+
+def _ensure_catalog() -> None:
+    """
+    Creates jschon's default catalog (for the 2020-12 draft), unless already created (e.g. by the application).
+    """
+    try:
+        jschon.Catalog.get_catalog()
+    except jschon.exceptions.CatalogError:
+        jschon.create_catalog('2020-12')
+
+
+def _create_root_schema(schema_data: Mapping[str, JSONCompatible]) -> jschon.JSONSchema:
+    _ensure_catalog()
     try:
-        root_schema = jschon.JSONSchema(schema_data)
+        return jschon.JSONSchema(schema_data)
     except jschon.CatalogError:
         # jschon only supports newer jsonschema drafts
         schema_data = dict(schema_data)
         schema_data['$schema'] = "https://json-schema.org/draft/2020-12/schema"
-        root_schema = jschon.JSONSchema(schema_data)
+        return jschon.JSONSchema(schema_data)
+
+
+def _get_root_result(doc_json: jschon.JSON, root_schema: jschon.JSONSchema) -> jschon.jsonschema.Result:
     res = root_schema.evaluate(doc_json)
     if not res.valid:
         raise ValueError('Document failed schema validation')
     return res
 
 
+class SchemaSorter:
+    """
+    A JSON Schema compiled for processing documents.
+
+    The schema is constructed once (and its sort keys are cached as they are computed), so a single instance
+    can be used to efficiently process many documents against the same schema.
+    """
+
+    def __init__(
+        self,
+        schema_data: Union[Mapping[str, JSONCompatible], jschon.JSONSchema],
+        *,
+        cache_dir: Optional[str] = None,
+        stats_hook: Optional[StatsHook] = None,
+    ) -> None:
+        """
+        @param schema_data: the schema, or an already constructed jschon schema (or subschema)
+        @param cache_dir: directory in which to persist the schema compiled for processing documents without
+                          validation, so that other processes can reuse it without constructing the schema
+                          (only applicable if schema_data isn't a jschon schema)
+        @param stats_hook: if set, called with each document's processing stats once it's processed (or checked),
+                           e.g. to forward them to a metrics system
+        """
+        self._schema_data: Optional[Mapping[str, JSONCompatible]] = None
+        self._root_schema: Optional[jschon.JSONSchema] = None
+        if isinstance(schema_data, jschon.jsonschema.JSONSchema):
+            self._root_schema = schema_data
+        else:
+            self._schema_data = schema_data
+        self._schema_sort_keys_cache: _SchemaSortKeysCache = {}
+        self._compiled_schema: Optional[CompiledSchema] = None
+        self._cache_dir = cache_dir
+        self._compiled_schema_cache = CompiledSchemaCache(cache_dir) if cache_dir is not None else None
+        self._stats_hook = stats_hook
+        self._schema_key: Optional[str] = None
+        # schemas for validating the skeletons of documents processed in parallel, by canonical URI
+        self._shape_schemas: Dict[jschon.URI, jschon.JSONSchema] = {}
+        # sorters for the subschemas of the parts of documents processed incrementally, by location
+        self._subschema_sorters: Dict[str, 'SchemaSorter'] = {}
+
+    @property
+    def root_schema(self) -> jschon.JSONSchema:
+        return self._ensure_compiled()
+
+    def _ensure_compiled(self) -> jschon.JSONSchema:
+        """
+        Constructs the jschon schema (which compiles its keywords and resolves its references), unless it has been.
+
+        The schema is constructed on demand, since it's not needed if the compiled schema is loaded from the cache.
+        """
+        if self._root_schema is None:
+            self._root_schema = _create_root_schema(cast(Mapping[str, JSONCompatible], self._schema_data))
+        return self._root_schema
+
+    def get_subschema_sorter(self, relpath: str) -> 'SchemaSorter':
+        """
+        Gets a sorter for processing documents against a subschema of this sorter's schema.
+
+        @param relpath: JSON pointer to the subschema, relative to this sorter's schema (e.g. "/items")
+        """
+        try:
+            subschema = jschon.JSONPointer(relpath).evaluate(self.root_schema)
+        except jschon.exceptions.JSONPointerError as e:
+            raise ValueError(f'Schema has no subschema at {relpath!r}') from e
+        if not isinstance(subschema, jschon.jsonschema.JSONSchema):
+            raise ValueError(f'Schema has no subschema at {relpath!r}')
+        subschema_sorter = SchemaSorter(subschema, stats_hook=self._stats_hook)
+        subschema_sorter._schema_sort_keys_cache = self._schema_sort_keys_cache
+        return subschema_sorter
+
+    def _get_schema_key(self) -> str:
+        if self._schema_key is None:
+            self._schema_key = get_schema_key(cast(Mapping[str, JSONCompatible], self._schema_data))
+        return self._schema_key
+
+    def _compile_schema(self, stats: Optional[ProcessingStats]) -> CompiledSchema:
+        compiled_schema = compile_schema(self.root_schema)
+        if stats is not None:
+            stats.schema_nodes_keyed += len(compiled_schema.nodes)
+        return compiled_schema
+
+    def _get_compiled_schema(self, stats: Optional[ProcessingStats]) -> CompiledSchema:
+        if self._compiled_schema is None:
+            if self._compiled_schema_cache is None or self._schema_data is None:
+                self._compiled_schema = self._compile_schema(stats)
+            else:
+                cache_key = self._get_schema_key()
+                self._compiled_schema = self._compiled_schema_cache.load(cache_key)
+                if self._compiled_schema is None:
+                    self._compiled_schema = self._compile_schema(stats)
+                    self._compiled_schema_cache.store(cache_key, self._compiled_schema)
+        return self._compiled_schema
+
+    def _prepare(self, *, validate: bool) -> None:
+        """
+        Constructs the schema (or, if not validating, compiles it) ahead of processing documents.
+        """
+        if validate:
+            self._ensure_compiled()
+        else:
+            self._get_compiled_schema(None)
+
+    def _get_doc_sort_keys(
+        self, doc_data: JSONCompatible, *, validate: bool, stats: Optional[ProcessingStats]
+    ) -> Mapping[jschon.JSONPointer, int]:
+        # the jschon representation of the document (and its evaluation result) is released upon return
+        if validate:
+            with time_phase(stats, 'compile'):
+                root_schema = self.root_schema
+            with time_phase(stats, 'evaluate'):
+                root_result = _get_root_result(jschon.JSON(doc_data), root_schema)
+            with time_phase(stats, 'sort_keys'):
+                return _get_sort_keys_for_json_doc(
+                    root_result=root_result, schema_sort_keys_cache=self._schema_sort_keys_cache, stats=stats
+                )
+        else:
+            with time_phase(stats, 'compile'):
+                compiled_schema = self._get_compiled_schema(stats)
+            with time_phase(stats, 'sort_keys'):
+                return get_sort_keys_for_json_doc(
+                    compiled_schema=compiled_schema,
+                    doc_data=doc_data,
+                    resolve_if_schema=lambda location: resolve_schema_location(location, self.root_schema),
+                )
+
+    def _create_doc_stats(
+        self, stats: Optional[ProcessingStats], *, stats_hook: Optional[StatsHook] = None
+    ) -> Optional[ProcessingStats]:
+        # A document's stats are collected separately, so that the hook gets only its own. Cached sorters are shared,
+        # so rather than such a sorter having a stats hook, the functions processing documents with one pass their
+        # hook, overriding the sorter's (as does `_report_doc_stats`)
+        stats_hook = stats_hook or self._stats_hook
+        return ProcessingStats() if stats is not None or stats_hook is not None else None
+
+    def _report_doc_stats(
+        self,
+        doc_stats: Optional[ProcessingStats],
+        stats: Optional[ProcessingStats],
+        *,
+        stats_hook: Optional[StatsHook] = None,
+    ) -> None:
+        if doc_stats is None:
+            return
+        doc_stats.documents += 1
+        if stats is not None:
+            stats.merge(doc_stats)
+        if (stats_hook := stats_hook or self._stats_hook) is not None:
+            stats_hook(doc_stats)
+
+    def process(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+        jobs: int = 1,
+        removed: Optional[List[jschon.JSONPointer]] = None,
+    ) -> JSONCompatible:
+        """
+        @param doc_data: the document to process; it is not modified unless in_place is set
+        @param sort: whether to sort object properties to match the schema's order
+        @param remove_additional_props: whether to remove object properties not defined in the schema
+        @param validate: whether to validate the document against the schema; if not set, the schema nodes
+                         that document nodes map to are found by walking the document and the schema together,
+                         which is faster but skips keywords which depend on evaluation (e.g. unevaluatedProperties)
+        @param in_place: whether to reorder (and prune) the document's objects in place rather than copying them;
+                         this avoids holding two copies of large documents in memory
+        @param stats: if set, the document's processing timings and counters are added to it
+        @param jobs: if greater than 1, the document's subtrees (e.g. its top-level properties, or the items of
+                     its top-level arrays) are processed in parallel by as many processes, where the schema maps
+                     them to subschemas statically (see `split_doc`); otherwise, the document is processed whole
+        @param removed: if set, the locations of the properties removed (when remove_additional_props is set)
+                        are appended to it; the document is then processed whole, regardless of jobs
+        @return: processed copy, or the document itself if in_place is set
+        @raise ValueError: if jobs is greater than 1 but the sorter was constructed from a jschon schema
+                           (which worker processes can't construct)
+        """
+        doc_stats = self._create_doc_stats(stats)
+        processed_doc_data = self._process_doc(
+            doc_data,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=in_place,
+            jobs=jobs,
+            removed=removed,
+            doc_stats=doc_stats,
+        )
+        self._report_doc_stats(doc_stats, stats)
+        return processed_doc_data
+
+    def _process_doc(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        sort: bool,
+        remove_additional_props: bool,
+        validate: bool,
+        in_place: bool,
+        jobs: int,
+        removed: Optional[List[jschon.JSONPointer]],
+        doc_stats: Optional[ProcessingStats],
+    ) -> JSONCompatible:
+        """
+        Processes a document (or a part of one), adding to its stats without reporting them.
+
+        See `process` for the parameters.
+        """
+        if jobs > 1 and removed is None:
+            from ._parallel import process_split_doc
+            from ._parallel import split_doc
+
+            if self._schema_data is None:
+                raise ValueError('Processing in parallel requires the schema data')
+            if (doc_split := split_doc(self.root_schema, doc_data)) is not None:
+                return process_split_doc(
+                    *doc_split,
+                    schema_data=self._schema_data,
+                    cache_dir=self._cache_dir,
+                    jobs=jobs,
+                    sort=sort,
+                    remove_additional_props=remove_additional_props,
+                    validate=validate,
+                    in_place=in_place,
+                    shape_schemas=self._shape_schemas,
+                    stats=doc_stats,
+                )
+
+        if remove_additional_props and not sort:
+            return self._prune(doc_data, validate=validate, in_place=in_place, removed=removed, stats=doc_stats)
+
+        doc_sort_keys = self._get_doc_sort_keys(doc_data, validate=validate, stats=doc_stats)
+        # locations of removed properties, including those within the values of others removed
+        # (since objects are processed after their values)
+        doc_removed: List[jschon.JSONPointer] = []
+
+        def _process_container(
+            node: JSONCompatible, path: jschon.JSONPointer, processed_values: List[JSONCompatible]
+        ) -> JSONCompatible:
+            """
+            @param node: the object or array being processed
+            @param path: the node's location within the document
+            @param processed_values: the node's processed values, in order
+            @return: processed copy (or the node itself, when in place)
+            """
+            if isinstance(node, dict):
+                keys = tuple(node)
+                sort_keys = tuple(doc_sort_keys.get(path / k, END_SORT_KEY) for k in keys)
+                order = _get_property_order(keys, sort_keys, sort=sort, remove_additional_props=remove_additional_props)
+
+                properties: Iterable[Tuple[str, JSONCompatible]]
+                if order is None:
+                    if in_place:
+                        return node
+                    properties = zip(keys, processed_values)
+                else:
+                    if doc_stats is not None:
+                        doc_stats.keys_removed += len(keys) - len(order)
+                    if removed is not None and len(order) < len(keys):
+                        kept_indices = set(order)
+                        doc_removed.extend(path / k for idx, k in enumerate(keys) if idx not in kept_indices)
+                    properties = [(keys[idx], processed_values[idx]) for idx in order]
+                    if in_place:
+                        node.clear()
+                        node.update(properties)
+                        return node
+
+                # to maintain YAML round-trip data, copy node and re-populate
+                node_copy = node.copy()
+                node_copy.clear()
+                node_copy.update(properties)
+
+                return node_copy
+
+            if in_place:
+                return node
+
+            return processed_values
+
+        def _traverse_doc() -> JSONCompatible:
+            if doc_stats is not None:
+                doc_stats.doc_nodes_visited += 1
+            if not isinstance(doc_data, (dict, list)):
+                return doc_data
+
+            # Objects and arrays are processed after their values (i.e. in post-order), keeping the ones being
+            # traversed on a stack (rather than recursing), so that deeply nested documents don't exceed
+            # the recursion limit. Each of their stack entries holds the node, its path, an iterator over
+            # its children and its values processed so far.
+            stack: List[
+                Tuple[
+                    JSONCompatible,
+                    jschon.JSONPointer,
+                    Iterator[Tuple[Union[str, int], JSONCompatible]],
+                    List[JSONCompatible],
+                ]
+            ] = []
+            node: JSONCompatible = doc_data
+            path = jschon.JSONPointer()
+            children_iter = _iter_children(doc_data)
+            processed_values: List[JSONCompatible] = []
+            while True:
+                for key, child in children_iter:
+                    if doc_stats is not None:
+                        doc_stats.doc_nodes_visited += 1
+                    if isinstance(child, (dict, list)):
+                        # descend into the child, resuming this node's children once it's processed
+                        stack.append((node, path, children_iter, processed_values))
+                        node = child
+                        path = path / str(key)
+                        children_iter = _iter_children(child)
+                        processed_values = []
+                        break
+                    processed_values.append(child)
+                else:
+                    processed_node = _process_container(node, path, processed_values)
+                    if not stack:
+                        return processed_node
+                    node, path, children_iter, processed_values = stack.pop()
+                    processed_values.append(processed_node)
+
+        with time_phase(doc_stats, 'traverse'):
+            processed_doc_data = _traverse_doc()
+        if removed is not None:
+            removed_paths = set(doc_removed)
+            removed.extend(
+                path for path in doc_removed if not any(path[:depth] in removed_paths for depth in range(1, len(path)))
+            )
+        return processed_doc_data
+
+    def _prune(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        validate: bool,
+        in_place: bool,
+        removed: Optional[List[jschon.JSONPointer]],
+        stats: Optional[ProcessingStats],
+    ) -> JSONCompatible:
+        """
+        Removes additional properties without sorting, which only needs the locations that the schema declares
+        (rather than the sort keys of the schema nodes they map to).
+        """
+        from ._prune import get_evaluated_paths
+        from ._prune import prune_doc
+
+        declared_paths: Container[jschon.JSONPointer]
+        if validate:
+            with time_phase(stats, 'compile'):
+                root_schema = self.root_schema
+            with time_phase(stats, 'evaluate'):
+                root_result = _get_root_result(jschon.JSON(doc_data), root_schema)
+            with time_phase(stats, 'sort_keys'):
+                declared_paths = get_evaluated_paths(root_result, stats)
+        else:
+            # walking the compiled schema yields sort keys without deriving them, so only their locations are used
+            declared_paths = self._get_doc_sort_keys(doc_data, validate=False, stats=stats).keys()
+        with time_phase(stats, 'traverse'):
+            return prune_doc(doc_data, declared_paths, in_place=in_place, removed=removed, stats=stats)
+
+    def check(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+        validate: bool = True,
+        stats: Optional[ProcessingStats] = None,
+    ) -> Optional[jschon.JSONPointer]:
+        """
+        Checks whether processing the document would change it, without processing it.
+
+        See `process` for the parameters.
+
+        @return: location of the first object (in document order) that processing would change, or None
+        """
+        doc_stats = self._create_doc_stats(stats)
+        unprocessed_path = self._check_doc(
+            doc_data, sort=sort, remove_additional_props=remove_additional_props, validate=validate, doc_stats=doc_stats
+        )
+        self._report_doc_stats(doc_stats, stats)
+        return unprocessed_path
+
+    def _check_doc(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        sort: bool,
+        remove_additional_props: bool,
+        validate: bool,
+        doc_stats: Optional[ProcessingStats],
+    ) -> Optional[jschon.JSONPointer]:
+        """
+        Checks a document, adding to its stats without reporting them.
+
+        See `check` for the parameters.
+        """
+        doc_sort_keys = self._get_doc_sort_keys(doc_data, validate=validate, stats=doc_stats)
+
+        def _check_doc() -> Optional[jschon.JSONPointer]:
+            # the document is checked in pre-order, keeping the children iterators on a stack (rather than
+            # recursing), so that deeply nested documents don't exceed the recursion limit
+            children_stack: List[Iterator[Tuple[JSONCompatible, jschon.JSONPointer]]] = [
+                iter(((doc_data, jschon.JSONPointer()),))
+            ]
+            while children_stack:
+                if (child := next(children_stack[-1], None)) is None:
+                    children_stack.pop()
+                    continue
+                node, path = child
+                if doc_stats is not None:
+                    doc_stats.doc_nodes_visited += 1
+                if isinstance(node, Dict):
+                    v_paths: List[jschon.JSONPointer] = []
+                    prev_key_sort_key: Optional[Tuple[int, str]] = None
+                    k: str
+                    for k in node:
+                        v_path = path / k
+                        v_paths.append(v_path)
+                        sk = doc_sort_keys.get(v_path, END_SORT_KEY)
+                        if remove_additional_props and sk == END_SORT_KEY:
+                            return path
+                        if sort:
+                            key_sort_key = sk, k
+                            if prev_key_sort_key is not None and key_sort_key < prev_key_sort_key:
+                                return path
+                            prev_key_sort_key = key_sort_key
+
+                    children_stack.append(zip(node.values(), v_paths))
+
+                elif isinstance(node, list):
+                    children_stack.append(zip(node, [path / str(idx) for idx in range(len(node))]))
+
+            return None
+
+        with time_phase(doc_stats, 'traverse'):
+            return _check_doc()
+
+    def is_sorted(
+        self, doc_data: JSONCompatible, *, validate: bool = True, stats: Optional[ProcessingStats] = None
+    ) -> bool:
+        """
+        Returns whether the document's object properties are already sorted to match the schema's order.
+        """
+        return self.check(doc_data, sort=True, validate=validate, stats=stats) is None
+
+    def process_changed(
+        self,
+        doc_data: JSONCompatible,
+        changed_paths: Iterable[Union[str, jschon.JSONPointer]],
+        *,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+    ) -> JSONCompatible:
+        """
+        Re-processes only the parts of a processed document that have since changed (e.g. in an editor).
+
+        Each changed value is processed whole against the subschema it maps to, which is found by following
+        "properties", "prefixItems" and "items" from the schema (as in `split_doc`), and its parent's keys are
+        re-sorted (and, if validating, validated). Where the mapping isn't static (e.g. under "allOf" or "$ref",
+        or in an object with properties not defined in "properties"), the closest ancestor it's static for is
+        processed whole instead. The rest of the document is left as it is, so processing takes time proportional
+        to the size of the change (and of its ancestors' keys) rather than of the document.
+
+        See `process` for the other parameters.
+
+        @param doc_data: the document, which was processed (with the same options) before it was changed;
+                         it is not modified unless in_place is set (otherwise, only the objects and arrays along
+                         the changed locations are copied, and the rest of the processed copy is shared with it)
+        @param changed_paths: locations of the values which were changed, added or removed
+        @raise ValueError: if a location isn't a valid JSON pointer
+        """
+        from ._incremental import IncrementalProcessor
+
+        doc_stats = self._create_doc_stats(stats)
+        processor = IncrementalProcessor(
+            self,
+            doc_data,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=in_place,
+            stats=doc_stats,
+        )
+        for path in changed_paths:
+            try:
+                processor.changed_paths[jschon.JSONPointer(path)] = None
+            except jschon.exceptions.JSONPointerError as e:
+                raise ValueError(f'Invalid JSON pointer {path!r}') from e
+        processed_doc_data = processor.process()
+        self._report_doc_stats(doc_stats, stats)
+        return processed_doc_data
+
+    def process_patch(
+        self,
+        doc_data: JSONCompatible,
+        patch: Iterable[Mapping[str, JSONCompatible]],
+        *,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+    ) -> JSONCompatible:
+        """
+        Applies a JSON Patch (RFC 6902) to a processed document, and re-processes only the parts of it
+        that the patch changed (see `process_changed`).
+
+        See `process` for the other parameters.
+
+        @param doc_data: the document, as processed (with the same options) before the patch; it is not modified
+                         unless in_place is set, in which case the patch is applied to it
+        @param patch: the patch's operations, e.g. [{"op": "replace", "path": "/range/end", "value": 20}]
+        @raise ValueError: if the patch can't be applied (when in place, the document may be left partially patched)
+        """
+        from ._incremental import IncrementalProcessor
+
+        doc_stats = self._create_doc_stats(stats)
+        processor = IncrementalProcessor(
+            self,
+            doc_data,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=in_place,
+            stats=doc_stats,
+        )
+        processor.apply_patch(patch)
+        processed_doc_data = processor.process()
+        self._report_doc_stats(doc_stats, stats)
+        return processed_doc_data
+
+    def process_stream(
+        self,
+        docs: Iterable[JSONCompatible],
+        *,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+    ) -> Iterator[JSONCompatible]:
+        """
+        Processes a stream of documents (e.g. the records of a JSON Lines file) one at a time.
+
+        See `process` for the parameters.
+        """
+        for doc_data in docs:
+            yield self.process(
+                doc_data,
+                sort=sort,
+                remove_additional_props=remove_additional_props,
+                validate=validate,
+                in_place=in_place,
+                stats=stats,
+            )
+
+    async def aprocess(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+        executor: Optional[Executor] = None,
+    ) -> JSONCompatible:
+        """
+        Processes a document in an executor, so that the event loop isn't blocked while it's processed.
+
+        See `process` for the other parameters.
+
+        @param executor: executor in which to process the document (the event loop's default executor if not set);
+                         in a process executor, each worker process constructs the schema once, and documents are
+                         copied to and from it (so in_place has no effect)
+        @raise ValueError: if the executor is a process executor but the sorter was constructed from a jschon
+                           schema (which worker processes can't construct)
+        """
+        from ._async import process_async
+
+        return await process_async(
+            self,
+            doc_data,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=in_place,
+            stats=stats,
+            executor=executor,
+        )
+
+    def process_many(
+        self,
+        docs: Union[Iterable[JSONCompatible], AsyncIterable[JSONCompatible]],
+        *,
+        concurrency: int = 1,
+        ordered: bool = True,
+        sort: bool = False,
+        remove_additional_props: bool = False,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+        executor: Optional[Executor] = None,
+    ) -> AsyncIterator[JSONCompatible]:
+        """
+        Processes documents concurrently in an executor (see `aprocess`), yielding them as they're processed.
+
+        Documents are read from `docs` only as processing slots free up, so that at most `concurrency` are
+        being processed (or, if ordered, held back until those before them are processed) at a time.
+
+        See `aprocess` for the other parameters.
+
+        @param docs: the documents, e.g. a list, or an async iterable of documents as they're received
+        @param concurrency: maximal number of documents being processed at a time
+        @param ordered: whether to yield documents in their order, rather than as soon as each is processed
+        @raise ValueError: if concurrency is less than 1
+        """
+        from ._async import process_many
+
+        return process_many(
+            self,
+            docs,
+            concurrency=concurrency,
+            ordered=ordered,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=in_place,
+            stats=stats,
+            executor=executor,
+        )
+
+    def sort(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+    ) -> JSONCompatible:
+        """
+        Returns a copy of the document (or the document itself, if in_place is set) with object properties sorted
+        to match the schema's order.
+        """
+        return self.process(doc_data, sort=True, validate=validate, in_place=in_place, stats=stats)
+
+    def remove_additional_props(
+        self,
+        doc_data: JSONCompatible,
+        *,
+        validate: bool = True,
+        in_place: bool = False,
+        stats: Optional[ProcessingStats] = None,
+        removed: Optional[List[jschon.JSONPointer]] = None,
+    ) -> JSONCompatible:
+        """
+        Returns a copy of the document (or the document itself, if in_place is set) without object properties
+        not defined in the schema.
+
+        @param removed: if set, the locations of the removed properties are appended to it
+        """
+        return self.process(
+            doc_data,
+            remove_additional_props=True,
+            validate=validate,
+            in_place=in_place,
+            stats=stats,
+            removed=removed,
+        )
+
+
+def _get_cached_sorter(schema_data: Mapping[str, JSONCompatible]) -> SchemaSorter:
+    from ._schema_cache import get_schema_cache
+
+    return get_schema_cache().get_sorter(schema_data)
+
+
 def process_json_doc(
     *,
     doc_data: JSONCompatible,
     schema_data: Mapping[str, JSONCompatible],
     sort: bool = False,
     remove_additional_props: bool = False,
+    validate: bool = True,
+    in_place: bool = False,
+    stats: Optional[ProcessingStats] = None,
+    stats_hook: Optional[StatsHook] = None,
+    jobs: int = 1,
 ) -> JSONCompatible:
-    doc_json = jschon.JSON(doc_data)
-    root_result = _get_root_result(doc_json, schema_data=schema_data)
-    doc_sort_keys = _get_sort_keys_for_json_doc(root_result=root_result)
-
-    def _traverse_node(node: JSONCompatible, json_node: jschon.JSON) -> JSONCompatible:
-        """
-        @param node: the node being traversed (the data)
-        @param json_node: the node being traversed (jschon's representation)
-        @return: sorted copy
-        """
-        if isinstance(node, Dict):
-            object_data = cast(Mapping[str, jschon.JSON], json_node.data)
-            key_sort_keys: Dict[str, Tuple[Tuple[float, ...], str]] = {}
-
-            properties: List[Tuple[str, JSONCompatible]] = []
-
-            k: str
-            v: JSONCompatible
-            v_json: jschon.JSON
-            for (k, v), v_json in zip(node.items(), object_data.values()):
-                v = _traverse_node(v, v_json)
-                # Keys which don't map to the schema (e.g. undefined properties when additionalProperties is missing,
-                # defaulting to true) are assumed to come last (end_sort_key).
-                # As a tie breaker for multiple such undefined properties, we use the key's name.
-                # TODO: update jschon to add additional properties to res.children when appropriate
-                sk = doc_sort_keys.get(v_json.path, _END_SORT_KEY)
-                if sk is not _END_SORT_KEY or not remove_additional_props:
-                    key_sort_keys[k] = sk, k
-                    properties.append((k, v))
-
-            if sort:
-                properties.sort(key=lambda pair: key_sort_keys[pair[0]])
-
-            # to maintain YAML round-trip data, copy node and re-populate
-            node_copy = node.copy()
-            node_copy.clear()
-            node_copy.update(properties)
-
-            return node_copy
-
-        elif isinstance(node, list):
-            list_data = cast(Sequence[jschon.JSON], json_node.data)
-            return [_traverse_node(node[idx], v_json) for idx, v_json in enumerate(list_data)]
-
-        return node
-
-    # we recurse down both the "JSON" and the actual document, and mutate only the actual document
-    # which is the primitive type that we can serialize back to JSON/YAML easily
-    return _traverse_node(doc_data, doc_json)
+    sorter = _get_cached_sorter(schema_data)
+    doc_stats = sorter._create_doc_stats(stats, stats_hook=stats_hook)
+    processed_doc_data = sorter._process_doc(
+        doc_data,
+        sort=sort,
+        remove_additional_props=remove_additional_props,
+        validate=validate,
+        in_place=in_place,
+        jobs=jobs,
+        removed=None,
+        doc_stats=doc_stats,
+    )
+    sorter._report_doc_stats(doc_stats, stats, stats_hook=stats_hook)
+    return processed_doc_data
+
+
+async def aprocess_json_doc(
+    *,
+    doc_data: JSONCompatible,
+    schema_data: Mapping[str, JSONCompatible],
+    sort: bool = False,
+    remove_additional_props: bool = False,
+    validate: bool = True,
+    in_place: bool = False,
+    stats: Optional[ProcessingStats] = None,
+    stats_hook: Optional[StatsHook] = None,
+    executor: Optional[Executor] = None,
+) -> JSONCompatible:
+    from ._async import process_async
+
+    return await process_async(
+        _get_cached_sorter(schema_data),
+        doc_data,
+        sort=sort,
+        remove_additional_props=remove_additional_props,
+        validate=validate,
+        in_place=in_place,
+        stats=stats,
+        stats_hook=stats_hook,
+        executor=executor,
+    )
+
+
+def is_sorted(
+    *,
+    doc_data: JSONCompatible,
+    schema_data: Mapping[str, JSONCompatible],
+    validate: bool = True,
+    stats: Optional[ProcessingStats] = None,
+    stats_hook: Optional[StatsHook] = None,
+) -> bool:
+    sorter = _get_cached_sorter(schema_data)
+    doc_stats = sorter._create_doc_stats(stats, stats_hook=stats_hook)
+    unprocessed_path = sorter._check_doc(
+        doc_data, sort=True, remove_additional_props=False, validate=validate, doc_stats=doc_stats
+    )
+    sorter._report_doc_stats(doc_stats, stats, stats_hook=stats_hook)
+    return unprocessed_path is None
+
+
+def process_json_stream(
+    *,
+    docs: Iterable[JSONCompatible],
+    schema_data: Mapping[str, JSONCompatible],
+    sort: bool = False,
+    remove_additional_props: bool = False,
+    validate: bool = True,
+    in_place: bool = False,
+    stats: Optional[ProcessingStats] = None,
+    stats_hook: Optional[StatsHook] = None,
+) -> Iterator[JSONCompatible]:
+    sorter = _get_cached_sorter(schema_data)
+    for doc_data in docs:
+        doc_stats = sorter._create_doc_stats(stats, stats_hook=stats_hook)
+        processed_doc_data = sorter._process_doc(
+            doc_data,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=in_place,
+            jobs=1,
+            removed=None,
+            doc_stats=doc_stats,
+        )
+        sorter._report_doc_stats(doc_stats, stats, stats_hook=stats_hook)
+        yield processed_doc_data
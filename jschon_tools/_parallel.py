@@ -0,0 +1,322 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import cast
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import Union
+
+import jschon.jsonschema
+from jschon.json import JSONCompatible
+
+from ._jschon_compat import create_schema_for
+from ._stats import ProcessingStats
+from ._stats import time_phase
+from ._structural import get_child_sort_key
+
+
+if TYPE_CHECKING:
+    from ._main import SchemaSorter
+
+
+# keywords which don't depend on an object's property values (or an array's items), so they can be evaluated
+# against a skeleton of the object (or array) while its values are processed separately
+_SHAPE_KEYWORDS = frozenset(
+    (
+        'title',
+        'description',
+        'default',
+        'examples',
+        'deprecated',
+        'readOnly',
+        'writeOnly',
+        'type',
+        'required',
+        'dependentRequired',
+        'minProperties',
+        'maxProperties',
+        'minItems',
+        'maxItems',
+        'additionalProperties',  # only if boolean, since all properties must be defined in "properties"
+    )
+)
+# keywords which map an object's properties (or an array's items) to subschemas statically
+_SPLIT_KEYWORDS = frozenset(('properties', 'prefixItems', 'items'))
+
+# subschema (as a JSON pointer relative to the sorter's schema) and value of a subtree to process separately
+_Subtree = Tuple[str, JSONCompatible]
+
+
+class _SplitNode:
+    """
+    An object or array whose values are processed separately, each against the subschema it maps to.
+    """
+
+    __slots__ = ('node', 'schema', 'shape_schema_data', 'sort_keys', 'children')
+
+    def __init__(
+        self,
+        node: Union[Dict[str, JSONCompatible], List[JSONCompatible]],
+        schema: jschon.JSONSchema,
+        shape_schema_data: Dict[str, JSONCompatible],
+        sort_keys: List[int],
+    ) -> None:
+        """
+        @param shape_schema_data: the schema's keywords, with the values' subschemas replaced by true
+        @param sort_keys: sort keys of an object's properties, in order
+        """
+        self.node = node
+        self.schema = schema
+        self.shape_schema_data = shape_schema_data
+        self.sort_keys = sort_keys
+        # for each value, either its own split node, or its index among the subtrees
+        self.children: List[Union['_SplitNode', int]] = []
+
+
+def _get_child_schemas(
+    schema: jschon.JSONSchema, node: Union[Dict[str, JSONCompatible], List[JSONCompatible]]
+) -> Optional[Tuple[List[Tuple[str, jschon.JSONSchema]], Dict[str, JSONCompatible], List[int]]]:
+    """
+    Gets the subschemas that the schema maps the node's values to, if they're determined by the schema alone.
+
+    @return: for each value, the subschema's location (relative to the schema) and the subschema, along with
+             the shape schema data and the sort keys (see _SplitNode), or None
+    """
+    if schema.type == 'boolean':
+        return None
+    keywords = {key: keyword for key, keyword in schema.keywords.items() if not keyword.static}
+    if any(key not in _SHAPE_KEYWORDS and key not in _SPLIT_KEYWORDS for key in keywords):
+        return None
+    if (keyword := keywords.get('additionalProperties')) is not None and keyword.json.type != 'boolean':
+        return None
+
+    # in earlier drafts, "items" may be an array of subschemas
+    if (keyword := keywords.get('items')) is not None and not isinstance(keyword.json, jschon.JSONSchema):
+        return None  # pragma: no cover
+
+    shape_schema_data: Dict[str, JSONCompatible] = {
+        key: keyword.json.value for key, keyword in keywords.items() if key in _SHAPE_KEYWORDS
+    }
+    properties = cast(
+        Mapping[str, jschon.JSONSchema], keywords['properties'].json.data if 'properties' in keywords else {}
+    )
+    prefix_items = cast(
+        Sequence[jschon.JSONSchema], keywords['prefixItems'].json.data if 'prefixItems' in keywords else []
+    )
+    items = cast(Optional[jschon.JSONSchema], keywords['items'].json if 'items' in keywords else None)
+    if 'properties' in keywords:
+        shape_schema_data['properties'] = {name: True for name in properties}
+    if 'prefixItems' in keywords:
+        shape_schema_data['prefixItems'] = [True] * len(prefix_items)
+    if items is not None:
+        shape_schema_data['items'] = True
+
+    child_schemas: List[Tuple[str, jschon.JSONSchema]] = []
+    sort_keys: List[int] = []
+    if isinstance(node, dict):
+        # (even if empty, an object isn't split without "properties", whose position its sort keys are relative to)
+        if 'properties' not in keywords or any(k not in properties for k in node):
+            return None
+        # sort keys are positions within the schema, as in _SchemaSortKeys
+        key_indices = {key: idx for idx, key in enumerate(cast(Mapping[str, jschon.JSON], schema.data))}
+        properties_sort_key = get_child_sort_key(0, 0, key_indices['properties'])
+        property_indices = {name: idx for idx, name in enumerate(properties)}
+        for k in node:
+            child_schemas.append((str(jschon.JSONPointer('/properties') / k), properties[k]))
+            sort_keys.append(get_child_sort_key(properties_sort_key, 1, property_indices[k]))
+    else:
+        if len(node) > len(prefix_items) and items is None:
+            return None
+        for idx in range(len(node)):
+            if idx < len(prefix_items):
+                child_schemas.append((f'/prefixItems/{idx}', prefix_items[idx]))
+            else:
+                child_schemas.append(('/items', cast(jschon.JSONSchema, items)))
+    return child_schemas, shape_schema_data, sort_keys
+
+
+def split_doc(
+    root_schema: jschon.JSONSchema, doc_data: JSONCompatible, *, max_depth: int = 2
+) -> Optional[Tuple[_SplitNode, List[_Subtree]]]:
+    """
+    Splits a document into subtrees which can be processed separately (e.g. by other processes), each against
+    its own subschema.
+
+    An object (or array) is split into its values when the schema maps each of them to a subschema statically,
+    i.e. through "properties" (or "prefixItems" and "items"), and the schema's other keywords don't depend on
+    the values (e.g. "type" or "required"). Any other keyword (e.g. "allOf", "$ref" or "patternProperties"),
+    or a property not defined in "properties", leaves the object to be processed whole.
+
+    @param max_depth: number of levels to split, e.g. 2 for the top-level properties and their values' items
+    @return: the document's split root and the subtrees, or None if the document can't be split
+    """
+
+    def _split(schema: jschon.JSONSchema, relpath: str, node: JSONCompatible, depth: int) -> Optional[_SplitNode]:
+        if not isinstance(node, (dict, list)) or not node:
+            return None
+        if (child_schemas_info := _get_child_schemas(schema, node)) is None:
+            return None
+        child_schemas, shape_schema_data, sort_keys = child_schemas_info
+        split_node = _SplitNode(node, schema, shape_schema_data, sort_keys)
+        values = node.values() if isinstance(node, dict) else node
+        for value, (child_relpath, child_schema) in zip(values, child_schemas):
+            child_split_node = None
+            if depth + 1 < max_depth:
+                child_split_node = _split(child_schema, relpath + child_relpath, value, depth + 1)
+            if child_split_node is not None:
+                split_node.children.append(child_split_node)
+            else:
+                split_node.children.append(len(subtrees))
+                subtrees.append((relpath + child_relpath, value))
+        return split_node
+
+    subtrees: List[_Subtree] = []
+    if (root_split_node := _split(root_schema, '', doc_data, 0)) is None:
+        return None
+    return root_split_node, subtrees
+
+
+def _get_split_nodes(root_split_node: _SplitNode) -> List[_SplitNode]:
+    split_nodes = [root_split_node]
+    for split_node in split_nodes:
+        split_nodes.extend(child for child in split_node.children if isinstance(child, _SplitNode))
+    return split_nodes
+
+
+def validate_shape(
+    split_node: _SplitNode, shape_schemas: Dict[jschon.URI, jschon.JSONSchema], stats: Optional[ProcessingStats]
+) -> None:
+    """
+    Validates a split node against its schema's keywords other than its values' subschemas, i.e. its keys
+    (or length) alone.
+
+    @param shape_schemas: see `process_split_doc`
+    @raise ValueError: if the node is invalid
+    """
+    canonical_uri = cast(jschon.URI, split_node.schema.canonical_uri)
+    if (shape_schema := shape_schemas.get(canonical_uri)) is None:
+        with time_phase(stats, 'compile'):
+            shape_schema = shape_schemas[canonical_uri] = create_schema_for(
+                split_node.schema, split_node.shape_schema_data
+            )
+    node = split_node.node
+    skeleton: JSONCompatible = dict.fromkeys(node) if isinstance(node, dict) else [None] * len(node)
+    with time_phase(stats, 'evaluate'):
+        if not shape_schema.evaluate(jschon.JSON(skeleton)).valid:
+            raise ValueError('Document failed schema validation')
+
+
+_subtree_sorter: Optional['SchemaSorter'] = None
+_subtree_options: Dict[str, Any] = {}
+_subschema_sorters: Dict[str, 'SchemaSorter'] = {}
+
+
+def _init_worker(
+    schema_data: Mapping[str, JSONCompatible], cache_dir: Optional[str], options: Mapping[str, Any]
+) -> None:
+    from ._main import SchemaSorter
+
+    global _subtree_sorter, _subtree_options
+    _subtree_sorter = SchemaSorter(schema_data, cache_dir=cache_dir)
+    _subtree_options = dict(options)
+    _subschema_sorters.clear()
+
+
+def _process_subtree(subtree: _Subtree) -> Tuple[JSONCompatible, Optional[ProcessingStats]]:
+    assert _subtree_sorter is not None
+    relpath, value = subtree
+    if (sorter := _subschema_sorters.get(relpath)) is None:
+        sorter = _subschema_sorters[relpath] = _subtree_sorter.get_subschema_sorter(relpath)
+    stats = ProcessingStats() if _subtree_options['stats'] else None
+    processed_value = sorter.process(
+        value,
+        sort=_subtree_options['sort'],
+        remove_additional_props=_subtree_options['remove_additional_props'],
+        validate=_subtree_options['validate'],
+        in_place=True,
+        stats=stats,
+    )
+    if stats is not None:
+        stats.documents = 0  # the subtrees are parts of a single document
+    return processed_value, stats
+
+
+def process_split_doc(
+    root_split_node: _SplitNode,
+    subtrees: List[_Subtree],
+    *,
+    schema_data: Mapping[str, JSONCompatible],
+    cache_dir: Optional[str],
+    jobs: int,
+    sort: bool,
+    remove_additional_props: bool,
+    validate: bool,
+    in_place: bool,
+    shape_schemas: Dict[jschon.URI, jschon.JSONSchema],
+    stats: Optional[ProcessingStats],
+) -> JSONCompatible:
+    """
+    Processes a split document (see `split_doc`), with its subtrees processed in parallel by worker processes,
+    and reassembles it.
+
+    @param schema_data: the schema, which the worker processes construct (or load from cache_dir) themselves
+    @param shape_schemas: schemas for validating split nodes' skeletons, by their schema's canonical URI;
+                          populated as they're constructed
+    """
+    split_nodes = _get_split_nodes(root_split_node)
+    if validate:
+        # the subschemas are validated against the subtrees by the workers, and the split nodes' other keywords
+        # against their skeletons (which the subtrees are left out of)
+        for split_node in split_nodes:
+            validate_shape(split_node, shape_schemas, stats)
+
+    options = {
+        'sort': sort,
+        'remove_additional_props': remove_additional_props,
+        'validate': validate,
+        'stats': stats is not None,
+    }
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(subtrees)), initializer=_init_worker, initargs=(schema_data, cache_dir, options)
+    ) as executor:
+        chunksize = max(1, len(subtrees) // (jobs * 4))
+        processed_subtrees: List[JSONCompatible] = []
+        for processed_value, subtree_stats in executor.map(_process_subtree, subtrees, chunksize=chunksize):
+            processed_subtrees.append(processed_value)
+            if stats is not None and subtree_stats is not None:
+                stats.merge(subtree_stats)
+
+    # the split nodes are reassembled from the innermost, so that values are processed before their parents
+    processed_nodes: Dict[int, JSONCompatible] = {}
+    with time_phase(stats, 'traverse'):
+        for split_node in reversed(split_nodes):
+            processed_values = [
+                processed_nodes[id(child)] if isinstance(child, _SplitNode) else processed_subtrees[child]
+                for child in split_node.children
+            ]
+            node = split_node.node
+            processed_node: JSONCompatible
+            if isinstance(node, dict):
+                # all properties are defined in the schema, so none are removed
+                properties = list(zip(node, processed_values))
+                if sort:
+                    sort_keys = dict(zip(node, split_node.sort_keys))
+                    properties.sort(key=lambda pair: (sort_keys[pair[0]], pair[0]))
+                # to maintain YAML round-trip data, copy node and re-populate
+                processed_node = node if in_place else node.copy()
+                processed_node.clear()
+                processed_node.update(properties)
+            elif in_place:
+                node[:] = processed_values
+                processed_node = node
+            else:
+                processed_node = processed_values
+            processed_nodes[id(split_node)] = processed_node
+            if stats is not None:
+                stats.doc_nodes_visited += 1
+
+    return processed_nodes[id(root_split_node)]
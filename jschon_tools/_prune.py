@@ -0,0 +1,109 @@
+from typing import Container
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+import jschon.jsonschema
+from jschon.json import JSONCompatible
+
+from ._main import _iter_children
+from ._stats import ProcessingStats
+
+
+def get_evaluated_paths(
+    root_result: jschon.jsonschema.Result, stats: Optional[ProcessingStats] = None
+) -> Set[jschon.JSONPointer]:
+    """
+    Gets the locations of the document nodes that schema nodes evaluated, i.e. those which the schema declares.
+
+    Unlike `_get_sort_keys_for_json_doc`, the schema nodes' sort keys aren't derived.
+
+    @param root_result: result of evaluating the document against the root schema
+    @param stats: if set, populated with the number of result nodes traversed
+    """
+    evaluated_paths: Set[jschon.JSONPointer] = set()
+    # the result tree is traversed keeping the children iterators on a stack (rather than recursing),
+    # so that deeply nested documents don't exceed the recursion limit
+    children_stack: List[Iterator[jschon.jsonschema.Result]] = [iter((root_result,))]
+    while children_stack:
+        if (result := next(children_stack[-1], None)) is None:
+            children_stack.pop()
+            continue
+        if stats is not None:
+            stats.result_nodes += 1
+        evaluated_paths.add(result.instance.path)
+        children_stack.append(iter(result.children.values()))
+    return evaluated_paths
+
+
+_Container = Union[Dict[str, JSONCompatible], List[JSONCompatible]]
+
+
+def prune_doc(
+    doc_data: JSONCompatible,
+    declared_paths: Container[jschon.JSONPointer],
+    *,
+    in_place: bool,
+    removed: Optional[List[jschon.JSONPointer]] = None,
+    stats: Optional[ProcessingStats] = None,
+) -> JSONCompatible:
+    """
+    Removes object properties which the schema doesn't declare, in a single walk of the document.
+
+    Objects are pruned before their values are walked (i.e. in pre-order), so the values of removed properties
+    are never walked. When copying, an object or array is copied before its values, which then replace
+    the originals within the copy as they're copied in turn.
+
+    @param doc_data: the document to prune; it is not modified unless in_place is set
+    @param declared_paths: locations of the document nodes which the schema declares
+    @param in_place: whether to prune the document's objects in place rather than copying them
+    @param removed: if set, the locations of the removed properties are appended to it
+                    (an object's before those of the objects within it)
+    @param stats: if set, populated with the number of document nodes traversed and properties removed
+    @return: pruned copy, or the document itself if in_place is set
+    """
+
+    def _prune_container(node: _Container, path: jschon.JSONPointer) -> _Container:
+        pruned_node = node if in_place else node.copy()
+        if isinstance(pruned_node, dict):
+            removed_keys = [k for k in pruned_node if path / k not in declared_paths]
+            for k in removed_keys:
+                del pruned_node[k]
+            if stats is not None:
+                stats.keys_removed += len(removed_keys)
+            if removed is not None:
+                removed.extend(path / k for k in removed_keys)
+        return pruned_node
+
+    if stats is not None:
+        stats.doc_nodes_visited += 1
+    if not isinstance(doc_data, (dict, list)):
+        return doc_data
+
+    pruned_doc_data = _prune_container(doc_data, jschon.JSONPointer())
+    # the containers being walked are kept on a stack (rather than recursing), so that deeply nested documents
+    # don't exceed the recursion limit
+    stack: List[Tuple[_Container, jschon.JSONPointer, Iterator[Tuple[Union[str, int], JSONCompatible]]]] = [
+        (pruned_doc_data, jschon.JSONPointer(), _iter_children(pruned_doc_data))
+    ]
+    while stack:
+        node, path, children_iter = stack[-1]
+        for key, child in children_iter:
+            if stats is not None:
+                stats.doc_nodes_visited += 1
+            if isinstance(child, (dict, list)):
+                child_path = path / str(key)
+                pruned_child = _prune_container(child, child_path)
+                if pruned_child is not child:
+                    # replacing a value doesn't change the keys being iterated
+                    node[key] = pruned_child  # type: ignore[index]
+                stack.append((pruned_child, child_path, _iter_children(pruned_child)))
+                break
+        else:
+            stack.pop()
+
+    return pruned_doc_data
@@ -0,0 +1,129 @@
+import collections
+import copy
+import json
+import threading
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+import jschon
+from jschon.json import JSONCompatible
+
+from ._cache import get_schema_key
+from ._jschon_compat import remove_document
+from ._main import SchemaSorter
+
+
+# approximate memory used by a schema (constructed, compiled, and with the sort keys of the documents processed
+# against it computed), per byte of the schema's JSON, as measured with tracemalloc
+_BYTES_PER_SCHEMA_BYTE = 150
+
+
+def _remove_from_catalog(sorter: SchemaSorter) -> None:
+    """
+    Removes the sorter's schemas (i.e. the root schema, its subschemas with an "$id",
+    and the schemas for validating documents processed in parallel) from the jschon catalog.
+    """
+    root_schemas: List[jschon.JSONSchema] = list(sorter._shape_schemas.values())
+    if sorter._root_schema is not None:
+        root_schemas.append(sorter._root_schema)
+    for root_schema in root_schemas:
+        remove_document(root_schema)
+
+
+class SchemaCache:
+    """
+    A bounded cache of sorters (along with their constructed schemas, compiled schemas and sort keys)
+    by schema content, which evicts the least recently used.
+
+    Evicted schemas are also removed from the jschon catalog, which otherwise keeps every constructed schema
+    (including those without an "$id") referenced.
+
+    Sorters keep their own copies of schemas, so a schema object may be modified once it's been passed
+    (and is then looked up by its new content).
+
+    The cache is safe to use from multiple threads.
+    """
+
+    def __init__(self, *, max_entries: Optional[int] = 128, max_bytes: Optional[int] = None) -> None:
+        """
+        @param max_entries: maximal number of schemas to keep, if set
+        @param max_bytes: maximal approximate memory (in bytes) used by the schemas to keep, if set;
+                          a schema which exceeds it on its own is kept until the next one is added
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        # sorters and their approximate memory use, by schema key, from the least recently used
+        self._entries: 'collections.OrderedDict[str, Tuple[SchemaSorter, int]]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_sorter(self, schema_data: Mapping[str, JSONCompatible]) -> SchemaSorter:
+        """
+        Gets a sorter for the schema, reusing the one for the same schema content if it's cached.
+        """
+        schema_key = get_schema_key(schema_data)
+        with self._lock:
+            if schema_key in self._entries:
+                self._entries.move_to_end(schema_key)
+                self.hits += 1
+                return self._entries[schema_key][0]
+
+            self.misses += 1
+            sorter = SchemaSorter(copy.deepcopy(schema_data))
+            sorter._schema_key = schema_key
+            nbytes = len(json.dumps(schema_data)) * _BYTES_PER_SCHEMA_BYTE
+            self._entries[schema_key] = sorter, nbytes
+            self.nbytes += nbytes
+            self._evict(keep=1)
+            return sorter
+
+    def configure(self, *, max_entries: Optional[int], max_bytes: Optional[int]) -> None:
+        """
+        Changes the cache's limits (see `__init__`), evicting schemas beyond them.
+        """
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict(keep=0)
+
+    def clear(self) -> None:
+        """
+        Evicts all schemas.
+        """
+        with self._lock:
+            while self._entries:
+                self._evict_one()
+
+    def _evict(self, *, keep: int) -> None:
+        """
+        Evicts the least recently used schemas until the cache is within its limits, keeping the most recently used.
+        """
+        while len(self._entries) > keep and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            self._evict_one()
+
+    def _evict_one(self) -> None:
+        _, (sorter, nbytes) = self._entries.popitem(last=False)
+        self.nbytes -= nbytes
+        self.evictions += 1
+        _remove_from_catalog(sorter)
+
+
+_schema_cache = SchemaCache()
+
+
+def get_schema_cache() -> SchemaCache:
+    """
+    Gets the process-wide cache of schemas, which `process_json_doc` and the like get their sorters from.
+    """
+    return _schema_cache
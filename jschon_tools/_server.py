@@ -0,0 +1,150 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import IO
+from typing import Iterable
+from typing import Mapping
+from typing import Optional
+
+
+# requests and responses are line-delimited JSON-RPC 2.0;
+# a method's handler gets the request's params and returns the result (raising ValueError for application errors)
+Handler = Callable[[Mapping[str, Any]], Any]
+
+_PARSE_ERROR = -32700
+_INVALID_REQUEST = -32600
+_METHOD_NOT_FOUND = -32601
+_INVALID_PARAMS = -32602
+_INTERNAL_ERROR = -32603
+_APPLICATION_ERROR = -32000
+
+
+class RemoteError(Exception):
+    """
+    An error response from the server.
+    """
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def _handle_request_line(line: str, handlers: Mapping[str, Handler], lock: threading.Lock) -> Optional[str]:
+    """
+    @return: the response line, or None for notifications (requests without an "id")
+    """
+    request_id = None
+    is_notification = False
+    response: Dict[str, Any]
+    try:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            raise RemoteError(_PARSE_ERROR, f'Parse error: {e}') from e
+        if not isinstance(request, dict) or not isinstance(method := request.get('method'), str):
+            raise RemoteError(_INVALID_REQUEST, 'Invalid request')
+        request_id = request.get('id')
+        is_notification = 'id' not in request
+        if (handler := handlers.get(method)) is None:
+            raise RemoteError(_METHOD_NOT_FOUND, f'Method not found: {method}')
+        if not isinstance(params := request.get('params', {}), dict):
+            raise RemoteError(_INVALID_PARAMS, 'Invalid params: must be an object')
+        with lock:
+            try:
+                response = {'result': handler(params)}
+            except (KeyError, TypeError) as e:
+                raise RemoteError(_INVALID_PARAMS, f'Invalid params: {e}') from e
+            except (ValueError, OSError) as e:
+                raise RemoteError(_APPLICATION_ERROR, str(e) or type(e).__name__) from e
+            except Exception as e:
+                # e.g. a schema which jschon fails to construct; the request fails, but the server keeps serving
+                raise RemoteError(_INTERNAL_ERROR, f'Internal error: {e!r}') from e
+    except RemoteError as e:
+        response = {'error': {'code': e.code, 'message': str(e)}}
+
+    if is_notification:
+        return None
+    return json.dumps({'jsonrpc': '2.0', 'id': request_id, **response})
+
+
+def _serve_lines(
+    lines: Iterable[str], write: Callable[[str], None], handlers: Mapping[str, Handler], lock: threading.Lock
+) -> None:
+    for line in lines:
+        if line.strip() and (response_line := _handle_request_line(line, handlers, lock)) is not None:
+            write(response_line + '\n')
+
+
+def serve_stream(f_in: IO[str], f_out: IO[str], handlers: Mapping[str, Handler]) -> None:
+    """
+    Serves requests read from a stream (e.g. stdin), until it ends.
+    """
+
+    def _write(response_line: str) -> None:
+        f_out.write(response_line)
+        f_out.flush()
+
+    _serve_lines(f_in, _write, handlers, threading.Lock())
+
+
+def serve_unix_socket(path: str, handlers: Mapping[str, Handler]) -> None:
+    """
+    Serves requests on a Unix socket, until interrupted. Each connection may send any number of requests.
+
+    Connections are served concurrently, but requests are handled one at a time.
+    """
+    lock = threading.Lock()
+
+    class _RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            lines = (line_bytes.decode() for line_bytes in self.rfile)
+            _serve_lines(lines, self._write, handlers, lock)
+
+        def _write(self, response_line: str) -> None:
+            self.wfile.write(response_line.encode())
+
+    # a socket left behind by a server that didn't exit cleanly would fail the bind
+    if os.path.exists(path) and not _is_listening(path):
+        os.unlink(path)
+
+    with socketserver.ThreadingUnixStreamServer(path, _RequestHandler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def _is_listening(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def call(path: str, method: str, params: Mapping[str, Any]) -> Any:
+    """
+    Calls a method on the server listening on the Unix socket.
+
+    @raise OSError: if the server isn't running
+    @raise RemoteError: if the server responded with an error
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        request = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('r') as f:
+            response_line = f.readline()
+    if not response_line:
+        raise ConnectionResetError(f'Server at {path} closed the connection')
+    response = json.loads(response_line)
+    if (error := response.get('error')) is not None:
+        raise RemoteError(error['code'], error['message'])
+    return response['result']
@@ -0,0 +1,112 @@
+import contextlib
+import time
+from typing import Any
+from typing import Callable
+from typing import ContextManager
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+
+
+# in the order they occur
+_PHASES = ('load', 'compile', 'evaluate', 'sort_keys', 'traverse', 'dump')
+_COUNTER_NAMES = (
+    'documents',
+    'result_nodes',
+    'schema_nodes_keyed',
+    'doc_nodes_visited',
+    'sort_keys_cache_hits',
+    'sort_keys_cache_misses',
+    'keys_removed',
+)
+
+
+class ProcessingStats:
+    """
+    Timings and counters of processing documents, accumulated across all documents processed with it.
+
+    Phase times are in seconds, and exclusive: time spent in a phase nested within another (e.g. processing
+    a YAML document while the YAML stream is being dumped) is counted only towards the nested phase.
+    The phases are:
+    - "compile": constructing (or loading) the schema
+    - "evaluate": evaluating the document against the schema (only when validating)
+    - "sort_keys": mapping document nodes to the sort keys of the schema nodes they match
+    - "traverse": sorting (or checking) the document
+    - "load" / "dump": parsing and serializing files (only in the shell)
+
+    The counters are:
+    - documents: number of documents processed (or checked)
+    - result_nodes: number of jschon evaluation result nodes traversed (only when validating)
+    - schema_nodes_keyed: number of schema nodes whose sort keys were computed
+    - doc_nodes_visited: number of document nodes (objects, arrays and values) traversed
+    - sort_keys_cache_hits / sort_keys_cache_misses: lookups of schemas' sort keys (only when validating)
+    - keys_removed: number of additional properties removed
+    """
+
+    def __init__(self) -> None:
+        self.phase_times: Dict[str, float] = {}
+        self.documents = 0
+        self.result_nodes = 0
+        self.schema_nodes_keyed = 0
+        self.doc_nodes_visited = 0
+        self.sort_keys_cache_hits = 0
+        self.sort_keys_cache_misses = 0
+        self.keys_removed = 0
+        # for each phase being timed, the time spent in the phases nested within it
+        self._nested_times: List[float] = []
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.to_json()!r})'
+
+    @contextlib.contextmanager
+    def time_phase(self, phase: str) -> Iterator[None]:
+        self._nested_times.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested_time = self._nested_times.pop()
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + elapsed - nested_time
+            if self._nested_times:
+                self._nested_times[-1] += elapsed
+
+    def merge(self, other: 'ProcessingStats') -> None:
+        """
+        Adds another's timings and counters to these; its time is counted as nested within the phase being timed.
+        """
+        for phase, phase_time in other.phase_times.items():
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + phase_time
+            if self._nested_times:
+                self._nested_times[-1] += phase_time
+        for name in _COUNTER_NAMES:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def format(self) -> str:
+        """
+        Formats the timings and counters for display, one per line.
+        """
+        phases = sorted(self.phase_times, key=lambda phase: _PHASES.index(phase) if phase in _PHASES else len(_PHASES))
+        lines = [f'  {phase + " time:":<24}{self.phase_times[phase]:.3f}s' for phase in phases]
+        lines.extend(f'  {name + ":":<24}{getattr(self, name)}' for name in _COUNTER_NAMES)
+        return '\n'.join(lines)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {'phase_times': self.phase_times, **{name: getattr(self, name) for name in _COUNTER_NAMES}}
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> 'ProcessingStats':
+        stats = cls()
+        stats.phase_times = dict(data['phase_times'])
+        for name in _COUNTER_NAMES:
+            setattr(stats, name, data[name])
+        return stats
+
+
+StatsHook = Callable[[ProcessingStats], None]
+
+
+def time_phase(stats: Optional[ProcessingStats], phase: str) -> ContextManager[None]:
+    return stats.time_phase(phase) if stats is not None else contextlib.nullcontext()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import IO
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from jschon.json import JSONCompatible
+
+
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_ITEM_END = re.compile(r'[ \t\n\r,\]]')
+_decoder = json.JSONDecoder()
+
+
+def iter_json_lines(f: IO[str]) -> Iterator[JSONCompatible]:
+    """
+    Parses a JSON Lines stream, yielding one record at a time.
+    """
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_json_lines(f: IO[str], records: Iterable[JSONCompatible]) -> None:
+    for record in records:
+        f.write(json.dumps(record, separators=(',', ':')))
+        f.write('\n')
+
+
+class _ChunkedReader:
+    def __init__(self, f: IO[str]) -> None:
+        self._f = f
+        self.buf = ''
+        self.pos = 0
+
+    def read(self) -> bool:
+        """
+        Appends to the buffer (discarding what was already consumed).
+
+        @return: whether anything was read
+        """
+        # grow geometrically, so that values spanning many chunks are re-parsed only a logarithmic number of times
+        chunk = self._f.read(max(_CHUNK_SIZE, len(self.buf) - self.pos))
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        @return: the next non-whitespace character, or an empty string at the end of the stream
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.read():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f'Expected one of {chars!r} at offset {self.pos} of the read buffer, got {char!r}')
+        self.pos += 1
+        return char
+
+    def decode_item(self) -> JSONCompatible:
+        value: JSONCompatible
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.read():
+                    continue
+                raise
+            # a value not followed by a delimiter might be truncated (e.g. "1.5" of "1.5e3")
+            if _ITEM_END.match(self.buf, end) is None and self.read():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(f: IO[str]) -> Iterator[JSONCompatible]:
+    """
+    Incrementally parses a JSON document whose top-level value is an array, yielding one item at a time.
+    """
+    reader = _ChunkedReader(f)
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+    else:
+        while True:
+            yield reader.decode_item()
+            if reader.expect(',]') == ']':
+                break
+    if reader.peek():
+        raise ValueError('Unexpected data after the top-level array')
+
+
+def write_json_array(f: IO[str], items: Iterable[JSONCompatible], *, indent: Optional[int]) -> None:
+    """
+    Writes items as a top-level JSON array, formatted the same as `json.dump` would format the entire array.
+    """
+    if indent is None:
+        item_prefix, item_separator, end = '', ', ', ']'
+    else:
+        item_prefix, item_separator, end = '\n', ',\n', '\n]'
+
+    f.write('[')
+    separator = item_prefix
+    for item in items:
+        f.write(separator)
+        separator = item_separator
+        item_text = json.dumps(item, indent=indent)
+        if indent is not None:
+            item_text = '\n'.join(' ' * indent + line for line in item_text.split('\n'))
+        f.write(item_text)
+    f.write(end if separator is item_separator else ']')
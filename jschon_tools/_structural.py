@@ -0,0 +1,401 @@
+import re
+from typing import Any
+from typing import Callable
+from typing import cast
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+import jschon.exceptions
+import jschon.jsonschema
+import jschon.vocabulary.core
+from jschon.json import JSONCompatible
+
+from ._jschon_compat import get_document_root
+from ._jschon_compat import get_schema_for
+
+
+# A sort key is a schema node's position within a (sub)schema: the index of the keyword and, for a subschema
+# of the keyword (e.g. a property's), the index within the keyword. The indices are packed into a single int,
+# which orders like the tuple of indices would (a keyword, then its subschemas in order, then the next keyword).
+_SortKey = int
+_SORT_KEY_INDEX_BITS = 32
+_SORT_KEY_MAX_DEPTH = 2
+
+# greater than any schema node's sort key
+END_SORT_KEY = 1 << (_SORT_KEY_INDEX_BITS * _SORT_KEY_MAX_DEPTH)
+
+# resolves the location of an "if" subschema (as recorded by compile_schema) to the jschon schema, for evaluation
+IfSchemaResolver = Callable[[str], jschon.JSONSchema]
+
+
+class _CompiledNode:
+    """
+    A schema node, reduced to what determines the schema nodes that document nodes map to.
+
+    Subschemas are referenced by their index within the compiled schema's nodes.
+    """
+
+    __slots__ = (
+        'base_uri',
+        'keywords',
+        'properties',
+        'pattern_properties',
+        'additional_properties',
+        'prefix_items',
+        'items',
+        'in_place_subschemas',
+        'dependent_schemas',
+        'dynamic_ref_fragment',
+        'if_location',
+    )
+
+    def __init__(self, base_uri: Optional[str]) -> None:
+        self.base_uri = base_uri
+        # non-static keywords, in evaluation order, as (key, sort key, instance types)
+        self.keywords: List[Tuple[str, _SortKey, Tuple[str, ...]]] = []
+        self.properties: Dict[str, Tuple[_SortKey, int]] = {}
+        self.pattern_properties: List[Tuple[str, _SortKey, int]] = []
+        self.additional_properties: Optional[int] = None
+        self.prefix_items: List[Tuple[_SortKey, int]] = []
+        self.items: Optional[int] = None
+        # subschemas applied to the same document node (e.g. by "allOf" or "$ref"), by keyword
+        self.in_place_subschemas: Dict[str, List[int]] = {}
+        self.dependent_schemas: Dict[str, int] = {}
+        # set if "$dynamicRef" is resolved against the dynamic scope
+        self.dynamic_ref_fragment: Optional[str] = None
+        self.if_location: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'base_uri': self.base_uri,
+            'keywords': self.keywords,
+            'properties': self.properties,
+            'pattern_properties': self.pattern_properties,
+            'additional_properties': self.additional_properties,
+            'prefix_items': self.prefix_items,
+            'items': self.items,
+            'in_place_subschemas': self.in_place_subschemas,
+            'dependent_schemas': self.dependent_schemas,
+            'dynamic_ref_fragment': self.dynamic_ref_fragment,
+            'if_location': self.if_location,
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> '_CompiledNode':
+        node = cls(data['base_uri'])
+        node.keywords = [(key, sort_key, tuple(types)) for key, sort_key, types in data['keywords']]
+        node.properties = {name: (sort_key, node_id) for name, (sort_key, node_id) in data['properties'].items()}
+        node.pattern_properties = [
+            (regex, sort_key, node_id) for regex, sort_key, node_id in data['pattern_properties']
+        ]
+        node.additional_properties = data['additional_properties']
+        node.prefix_items = [(sort_key, node_id) for sort_key, node_id in data['prefix_items']]
+        node.items = data['items']
+        node.in_place_subschemas = data['in_place_subschemas']
+        node.dependent_schemas = data['dependent_schemas']
+        node.dynamic_ref_fragment = data['dynamic_ref_fragment']
+        node.if_location = data['if_location']
+        return node
+
+
+class CompiledSchema:
+    """
+    A schema compiled into the tables needed to walk documents structurally (see `get_sort_keys_for_json_doc`).
+
+    Unlike a jschon schema, a compiled schema is plain data, so it can be persisted (see `to_json` and `from_json`)
+    and loaded by another process without constructing the jschon schema.
+    """
+
+    def __init__(self, nodes: List[_CompiledNode], dynamic_anchors: Dict[str, Dict[str, int]]) -> None:
+        """
+        @param nodes: the schema nodes, the first of which is the root
+        @param dynamic_anchors: nodes with a "$dynamicAnchor", by the base URI and the anchor they're found by
+        """
+        self.nodes = nodes
+        self.dynamic_anchors = dynamic_anchors
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'nodes': [node.to_json() for node in self.nodes],
+            'dynamic_anchors': self.dynamic_anchors,
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> 'CompiledSchema':
+        return cls(
+            nodes=[_CompiledNode.from_json(node_data) for node_data in data['nodes']],
+            dynamic_anchors=data['dynamic_anchors'],
+        )
+
+
+def get_child_sort_key(sort_key: int, depth: int, idx: int) -> int:
+    """
+    Gets the sort key of a schema node's child.
+
+    @param sort_key: the schema node's sort key
+    @param depth: the schema node's depth within the (sub)schema
+    @param idx: the child's index within the schema node
+    """
+    if depth >= _SORT_KEY_MAX_DEPTH:
+        raise ValueError(f'Sort keys are limited to a depth of {_SORT_KEY_MAX_DEPTH}')
+    if not 0 <= idx < (1 << _SORT_KEY_INDEX_BITS) - 1:
+        raise ValueError(f'Sort keys are limited to {_SORT_KEY_INDEX_BITS}-bit indices')
+    # indices are offset by 1, so that a node comes before its first child
+    return sort_key | (idx + 1) << (_SORT_KEY_INDEX_BITS * (_SORT_KEY_MAX_DEPTH - 1 - depth))
+
+
+def _get_schema_location(schema: jschon.JSONSchema, root_schema: jschon.JSONSchema) -> str:
+    """
+    Gets a location by which the schema can be found again, which is stable across processes for the same root
+    schema (unlike the canonical URIs of schemas without an "$id", which are random).
+    """
+    root_path = root_schema.path
+    if get_document_root(schema) is get_document_root(root_schema) and schema.path[: len(root_path)] == root_path:
+        return f'#{schema.path[len(root_path) :]}'
+    return str(schema.canonical_uri)
+
+
+def resolve_schema_location(location: str, root_schema: jschon.JSONSchema) -> jschon.JSONSchema:
+    """
+    Resolves a location recorded by `compile_schema` back to the jschon schema.
+    """
+    if location.startswith('#'):
+        return cast(jschon.JSONSchema, jschon.JSONPointer(location[1:]).evaluate(root_schema))
+    return get_schema_for(root_schema, jschon.URI(location))
+
+
+def compile_schema(root_schema: jschon.JSONSchema) -> CompiledSchema:
+    """
+    Compiles the schema, and all schemas reachable from it, for walking documents structurally.
+    """
+    nodes: List[_CompiledNode] = []
+    node_ids: Dict[int, int] = {}
+    dynamic_fragments: Set[str] = set()
+
+    def _compile(schema: jschon.JSONSchema) -> int:
+        if (node_id := node_ids.get(id(schema))) is not None:
+            return node_id
+        node_id = len(nodes)
+        node_ids[id(schema)] = node_id
+        node = _CompiledNode(str(schema.base_uri) if schema.base_uri is not None else None)
+        nodes.append(node)
+        if schema.type == 'boolean':
+            return node_id
+
+        # sort keys are positions within the schema, as in _SchemaSortKeys
+        key_indices = {key: idx for idx, key in enumerate(cast(Mapping[str, jschon.JSON], schema.data))}
+        for key, keyword in schema.keywords.items():
+            if keyword.static:
+                continue
+            key_sort_key = get_child_sort_key(0, 0, key_indices[key])
+            node.keywords.append((key, key_sort_key, tuple(keyword.instance_types)))
+
+            if key == 'properties':
+                for idx, (name, subschema) in enumerate(
+                    cast(Mapping[str, jschon.JSONSchema], keyword.json.data).items()
+                ):
+                    node.properties[name] = get_child_sort_key(key_sort_key, 1, idx), _compile(subschema)
+            elif key == 'patternProperties':
+                for idx, (regex, subschema) in enumerate(
+                    cast(Mapping[str, jschon.JSONSchema], keyword.json.data).items()
+                ):
+                    node.pattern_properties.append(
+                        (regex, get_child_sort_key(key_sort_key, 1, idx), _compile(subschema))
+                    )
+            elif key == 'additionalProperties':
+                node.additional_properties = _compile(cast(jschon.JSONSchema, keyword.json))
+            elif key == 'prefixItems':
+                for idx, subschema in enumerate(cast(Sequence[jschon.JSONSchema], keyword.json.data)):
+                    node.prefix_items.append((get_child_sort_key(key_sort_key, 1, idx), _compile(subschema)))
+            elif key == 'items':
+                node.items = _compile(cast(jschon.JSONSchema, keyword.json))
+            elif key in ('allOf', 'anyOf', 'oneOf'):
+                node.in_place_subschemas[key] = [
+                    _compile(subschema) for subschema in cast(Sequence[jschon.JSONSchema], keyword.json.data)
+                ]
+            elif key == 'dependentSchemas':
+                for name, subschema in cast(Mapping[str, jschon.JSONSchema], keyword.json.data).items():
+                    node.dependent_schemas[name] = _compile(subschema)
+            elif key in ('if', 'then', 'else', 'not'):
+                subschema = cast(jschon.JSONSchema, keyword.json)
+                node.in_place_subschemas[key] = [_compile(subschema)]
+                if key == 'if':
+                    node.if_location = _get_schema_location(subschema, root_schema)
+            elif key == '$ref':
+                refschema = cast(jschon.vocabulary.core.RefKeyword, keyword).refschema
+                node.in_place_subschemas[key] = [_compile(cast(jschon.JSONSchema, refschema))]
+            elif key == '$dynamicRef':
+                dynamic_ref_keyword = cast(jschon.vocabulary.core.DynamicRefKeyword, keyword)
+                node.in_place_subschemas[key] = [_compile(cast(jschon.JSONSchema, dynamic_ref_keyword.refschema))]
+                if dynamic_ref_keyword.dynamic:
+                    node.dynamic_ref_fragment = dynamic_ref_keyword.fragment
+                    dynamic_fragments.add(dynamic_ref_keyword.fragment)
+
+        return node_id
+
+    _compile(root_schema)
+
+    # a dynamic reference may resolve to a schema (found by its "$dynamicAnchor") in any resource
+    # within the dynamic scope, so those are looked up in advance, for every resource compiled so far
+    dynamic_anchors: Dict[str, Dict[str, int]] = {}
+    looked_up: Set[Tuple[str, str]] = set()
+    while pending := {
+        (node.base_uri, fragment)
+        for node in nodes
+        if node.base_uri is not None
+        for fragment in dynamic_fragments
+        if (node.base_uri, fragment) not in looked_up
+    }:
+        for base_uri, fragment in sorted(pending):
+            looked_up.add((base_uri, fragment))
+            target_uri = jschon.URI(f'#{fragment}').resolve(jschon.URI(base_uri))
+            try:
+                found_schema = get_schema_for(root_schema, target_uri)
+            except jschon.exceptions.CatalogError:
+                continue
+            if (dynamic_anchor := found_schema.get('$dynamicAnchor')) and dynamic_anchor.data == fragment:
+                dynamic_anchors.setdefault(base_uri, {})[fragment] = _compile(found_schema)
+
+    return CompiledSchema(nodes, dynamic_anchors)
+
+
+def _get_json_type(value: JSONCompatible) -> str:
+    """
+    Gets the JSON type of a value, as named by jschon (and JSON Schema's "type" keyword).
+    """
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, Mapping):
+        return 'object'
+    return 'array'
+
+
+def get_sort_keys_for_json_doc(
+    *,
+    compiled_schema: CompiledSchema,
+    doc_data: JSONCompatible,
+    resolve_if_schema: IfSchemaResolver,
+) -> Mapping[jschon.JSONPointer, _SortKey]:
+    """
+    Like evaluating the schema and collecting the sort keys of the schema nodes that evaluated each document node,
+    but walks the document and the schema together instead, following only the keywords that determine which
+    schema node a document node maps to.
+
+    Assertions (e.g. "type", "pattern", "enum") are not evaluated, so the document is not validated.
+    The only subschemas evaluated are those of "if", since they determine whether "then" or "else" apply.
+    Keywords which depend on other keywords' annotations (e.g. "unevaluatedProperties") are not followed.
+
+    @param compiled_schema: the schema to walk
+    @param doc_data: the document to walk
+    @param resolve_if_schema: resolves "if" subschemas for evaluation
+    """
+    nodes = compiled_schema.nodes
+    doc_sort_keys: Dict[jschon.JSONPointer, _SortKey] = {jschon.JSONPointer(): 0}
+    dynamic_scope: List[_CompiledNode] = []
+
+    def _resolve_dynamic_ref(node: _CompiledNode, fragment: str) -> int:
+        # mirrors DynamicRefKeyword.evaluate, with the dynamic scope taking the place of the Result tree
+        refschema = node.in_place_subschemas['$dynamicRef'][0]
+        checked_uris = set()
+        for scope_node in reversed(dynamic_scope):
+            if (base_uri := scope_node.base_uri) is not None and base_uri not in checked_uris:
+                checked_uris.add(base_uri)
+                if (found_schema := compiled_schema.dynamic_anchors.get(base_uri, {}).get(fragment)) is not None:
+                    refschema = found_schema
+        return refschema
+
+    def _walk_schema(
+        node_id: int, doc_node: JSONCompatible, path: jschon.JSONPointer
+    ) -> Iterator[Tuple[int, JSONCompatible, jschon.JSONPointer]]:
+        """
+        Walks a schema node, yielding the subschemas (with the document nodes and paths) to walk in turn;
+        the caller walks each before resuming this walk.
+        """
+        node = nodes[node_id]
+        if not node.keywords:
+            return
+
+        doc_node_type = _get_json_type(doc_node)
+        if_valid = None
+        dynamic_scope.append(node)
+
+        for key, sort_key, instance_types in node.keywords:
+            if doc_node_type not in instance_types:
+                continue
+
+            if key in ('then', 'else'):
+                if node.if_location is None:
+                    continue
+                if if_valid is None:
+                    if_valid = resolve_if_schema(node.if_location).evaluate(jschon.JSON(doc_node)).valid
+                if if_valid != (key == 'then'):
+                    continue
+
+            # mirrors jschon's Result tree, where a document node maps to the first schema node that evaluated it
+            doc_sort_keys.setdefault(path, sort_key)
+
+            if key == 'properties':
+                for name, item in cast(Mapping[str, JSONCompatible], doc_node).items():
+                    if (entry := node.properties.get(name)) is not None:
+                        item_path = path / name
+                        doc_sort_keys.setdefault(item_path, entry[0])
+                        yield entry[1], item, item_path
+            elif key == 'patternProperties':
+                for name, item in cast(Mapping[str, JSONCompatible], doc_node).items():
+                    for regex, item_sort_key, subschema_id in node.pattern_properties:
+                        if re.search(regex, name) is not None:
+                            item_path = path / name
+                            doc_sort_keys.setdefault(item_path, item_sort_key)
+                            yield subschema_id, item, item_path
+            elif key == 'additionalProperties':
+                subschema_id = cast(int, node.additional_properties)
+                for name, item in cast(Mapping[str, JSONCompatible], doc_node).items():
+                    if name not in node.properties and not any(
+                        re.search(regex, name) for regex, _, _ in node.pattern_properties
+                    ):
+                        yield subschema_id, item, path / name
+            elif key == 'prefixItems':
+                for idx, item in enumerate(cast(Sequence[JSONCompatible], doc_node)[: len(node.prefix_items)]):
+                    item_path = path / str(idx)
+                    item_sort_key, subschema_id = node.prefix_items[idx]
+                    doc_sort_keys.setdefault(item_path, item_sort_key)
+                    yield subschema_id, item, item_path
+            elif key == 'items':
+                subschema_id = cast(int, node.items)
+                items = cast(Sequence[JSONCompatible], doc_node)
+                for idx in range(len(node.prefix_items), len(items)):
+                    yield subschema_id, items[idx], path / str(idx)
+            elif key == 'dependentSchemas':
+                for name, subschema_id in node.dependent_schemas.items():
+                    if name in cast(Mapping[str, JSONCompatible], doc_node):
+                        yield subschema_id, doc_node, path
+            elif key == '$dynamicRef' and node.dynamic_ref_fragment is not None:
+                yield _resolve_dynamic_ref(node, node.dynamic_ref_fragment), doc_node, path
+            elif (subschema_ids := node.in_place_subschemas.get(key)) is not None:
+                for subschema_id in subschema_ids:
+                    yield subschema_id, doc_node, path
+
+        dynamic_scope.pop()
+
+    # the walks in progress are kept on a stack (rather than recursing), so that deeply nested documents
+    # don't exceed the recursion limit
+    walks = [_walk_schema(0, doc_data, jschon.JSONPointer())]
+    while walks:
+        if (subschema_walk := next(walks[-1], None)) is not None:
+            walks.append(_walk_schema(*subschema_walk))
+        else:
+            walks.pop()
+
+    return doc_sort_keys
@@ -1,7 +1,13 @@
+from __future__ import annotations
+
 from typing import Any
 from typing import NamedTuple
+from typing import TYPE_CHECKING
+
 
-import ruyaml.representer
+if TYPE_CHECKING:
+    import ruyaml.main
+    import ruyaml.representer
 
 
 class YamlIndent(NamedTuple):
@@ -11,6 +17,9 @@ class YamlIndent(NamedTuple):
 
 
 def create_yaml_processor(*, indent: YamlIndent) -> ruyaml.main.YAML:
+    # imported on first use, so that processing only JSON documents doesn't pay for it
+    import ruyaml.main
+
     def _null_representer(self: ruyaml.representer.BaseRepresenter, data: None) -> Any:
         return self.represent_scalar('tag:yaml.org,2002:null', 'null')
 
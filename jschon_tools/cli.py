@@ -1,23 +1,93 @@
+from __future__ import annotations
+
 import argparse
-import json
+import filecmp
+import glob
+import io
+import os
+import shutil
+import signal
+import sys
+import tempfile
+from typing import Any
+from typing import Callable
+from typing import cast
+from typing import Dict
+from typing import IO
+from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
 from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import TypeVar
 
-import jschon
-
-from ._main import process_json_doc
+from ._cache import get_default_cache_dir
+from ._cache import get_schema_key
+from ._cache import RunCache
+from ._config import CONFIG_FILE_NAME
+from ._config import find_config
+from ._config import SchemaConfig
+from ._json_backend import get_json_backend
+from ._json_backend import JSON_BACKENDS
+from ._stats import ProcessingStats
+from ._stats import time_phase
+from ._stream import iter_json_array
+from ._stream import iter_json_lines
+from ._stream import write_json_array
+from ._stream import write_json_lines
 from ._yaml import create_yaml_processor
 from ._yaml import YamlIndent
 
 
+if TYPE_CHECKING:
+    import jschon
+    import jschon.json
+
+    from ._main import SchemaSorter
+
+
+_JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+_DOC_EXTENSIONS = ('.json', '.yaml', '.yml', *_JSON_LINES_EXTENSIONS)
+
+_T = TypeVar('_T')
+
+
+class _PathResult(NamedTuple):
+    # error message, if the document could not be processed
+    error: Optional[str]
+    # processing stats, if requested
+    stats: Optional[ProcessingStats]
+    # locations of removed properties, if reporting them
+    removed: Optional[List[str]]
+    # whether the file's content changed (or, with --dry-run, would have), if it was processed (rather than checked)
+    changed: Optional[bool]
+
+
 def _make_parser(*, prog: str, description: str) -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog=prog,
         description=description,
     )
-    parser.add_argument('path', help='path to the JSON / YAML document')
     parser.add_argument(
-        '--schema', required=True, metavar='/path/to/schema.json', help='path to the JSON Schema document'
+        'path',
+        nargs='*',
+        help='path to the JSON / YAML document; directories are searched recursively and glob patterns are expanded',
+    )
+    schema_group = parser.add_mutually_exclusive_group()
+    schema_group.add_argument(
+        '--schema',
+        metavar='/path/to/schema.json',
+        help='path to the JSON Schema document (required unless --serve, or configured)',
+    )
+    schema_group.add_argument(
+        '--config',
+        metavar='PATH',
+        help=f'configuration file associating documents with schemas by glob patterns, in which case the paths '
+        f'are optional (defaulting to all documents the patterns match); by default, {CONFIG_FILE_NAME} '
+        f'or pyproject.toml (with a [tool.jschon-sort] table) in the current directory or its closest parent',
     )
     parser.add_argument(
         '--dry-run',
@@ -25,7 +95,40 @@ def _make_parser(*, prog: str, description: str) -> argparse.ArgumentParser:
         help='if set, result is not persisted back to the original file',
         action='store_true',
     )
+    parser.add_argument(
+        '--check',
+        help='if set, documents are only checked (and not persisted); '
+        'the exit code is non-zero if any document would be changed',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--no-validate',
+        dest='validate',
+        help='if set, the document is not validated against the schema, and the schema nodes that properties map to '
+        'are found by walking the document and the schema together (faster)',
+        action='store_false',
+    )
+    stream_group = parser.add_mutually_exclusive_group()
+    stream_group.add_argument(
+        '--jsonl',
+        help='if set, documents are processed as JSON Lines, one record at a time '
+        '(implied for .jsonl and .ndjson files)',
+        action='store_true',
+    )
+    stream_group.add_argument(
+        '--stream-array',
+        help="if set, JSON documents must be top-level arrays, which are processed one item at a time "
+        "against the schema's \"prefixItems\" subschema at the item's index, if any, or else its \"items\" subschema",
+        action='store_true',
+    )
     parser.add_argument('--indent', type=int, default=4, help='indent size')
+    parser.add_argument(
+        '--json-backend',
+        choices=JSON_BACKENDS,
+        default='json',
+        help='library with which JSON documents are loaded and dumped; the output is the same with either, '
+        'but orjson (if installed) is faster (default: %(default)s)',
+    )
     parser.add_argument(
         '--yaml-indent',
         type=lambda s: YamlIndent(*map(int, s.split(','))),
@@ -33,6 +136,52 @@ def _make_parser(*, prog: str, description: str) -> argparse.ArgumentParser:
         default=YamlIndent(2, 4, 2),
         help='YAML indent size',
     )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar='N',
+        help='number of documents to process in parallel (default: number of CPUs)',
+    )
+    parser.add_argument(
+        '--split-documents',
+        help='if set, documents are processed one at a time, with the subtrees of each JSON document '
+        '(e.g. its top-level properties, or the items of its top-level arrays) processed in parallel (see --jobs) '
+        'against their subschemas, e.g. for a single large document',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=get_default_cache_dir(),
+        metavar='DIR',
+        help='directory in which to cache compiled schemas, and which files are already processed, '
+        'between runs (default: %(default)s)',
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='cache',
+        help='if set, nothing is cached between runs, so all files are processed even if unchanged',
+        action='store_false',
+    )
+    parser.add_argument(
+        '--serve',
+        help='if set, runs as a server which keeps schemas loaded (until their files change) between requests, '
+        'speaking line-delimited JSON-RPC on the --socket, or on stdin / stdout',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        help='Unix socket of a server (see --serve) to process documents on; '
+        'if the server is not running, documents are processed by this process',
+    )
+    parser.add_argument(
+        '--stats',
+        help='if set, prints the time spent in each processing phase, and processing counters, '
+        'aggregated across all processed files',
+        action='store_true',
+    )
     return parser
 
 
@@ -40,58 +189,570 @@ def _is_yaml_path(path: str) -> bool:
     return path.endswith('.yaml') or path.endswith('.yml')
 
 
-def _load_doc_and_schema(
-    args: argparse.Namespace,
-) -> Tuple[jschon.json.JSONCompatible, Mapping[str, jschon.json.JSONCompatible]]:
-    with open(args.path) as f:
-        if _is_yaml_path(args.path):
-            yaml = create_yaml_processor(indent=args.yaml_indent)
-            doc_data = yaml.load(f)
+def _is_json_lines_path(path: str) -> bool:
+    return path.endswith(_JSON_LINES_EXTENSIONS)
+
+
+def _expand_paths(patterns: Iterable[str]) -> List[str]:
+    """
+    Expands directories (recursively, to the JSON / YAML documents within) and glob patterns into document paths.
+    """
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                paths.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith(_DOC_EXTENSIONS))
+        elif not os.path.exists(pattern) and (matches := glob.glob(pattern, recursive=True)):
+            paths.extend(sorted(matches))
         else:
-            doc_data = json.load(f)
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def _iter_timed(items: Iterable[_T], stats: Optional[ProcessingStats], phase: str) -> Iterator[_T]:
+    """
+    Times producing each item (e.g. parsing each document of a stream) as the phase.
+    """
+    it = iter(items)
+    while True:
+        with time_phase(stats, phase):
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+
+def _load_json_doc(path: str, args: argparse.Namespace) -> jschon.json.JSONCompatible:
+    return get_json_backend(args.json_backend).load(path)
+
+
+def _load_schema(path: str, args: argparse.Namespace) -> Mapping[str, jschon.json.JSONCompatible]:
+    return cast(Mapping[str, 'jschon.json.JSONCompatible'], get_json_backend(args.json_backend).load(path))
+
+
+def _encode_text(text: str) -> bytes:
+    """
+    Encodes text as writing it to a file opened in text mode would (i.e. in the locale's encoding,
+    and with the platform's newlines).
+    """
+    buf = io.BytesIO()
+    with io.TextIOWrapper(buf) as f:
+        f.write(text)
+        f.flush()
+        return buf.getvalue()
+
 
-    with open(args.schema) as f:
-        schema_data = json.load(f)
+def _create_temp_file(path: str, write: Callable[[IO[Any]], object], *, mode: str, in_place: bool) -> str:
+    """
+    Writes a temporary file, next to the path (to replace it) if in_place is set.
 
-    return doc_data, schema_data
+    @return: the temporary file's path
+    """
+    with tempfile.NamedTemporaryFile(
+        mode,
+        dir=(os.path.dirname(path) or '.') if in_place else None,
+        prefix=f'.{os.path.basename(path)}.',
+        delete=False,
+    ) as tmp_file:
+        try:
+            write(tmp_file)
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+    return tmp_file.name
 
 
-def _maybe_persist(doc_data: jschon.json.JSONCompatible, args: argparse.Namespace) -> None:
-    if args.dry_run:
+def _replace_file(path: str, tmp_path: str) -> None:
+    # renaming is atomic, so the file is never left partially written (e.g. if the process is killed)
+    shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _maybe_persist_json_doc(doc_data: jschon.json.JSONCompatible, path: str, args: argparse.Namespace) -> bool:
+    """
+    Writes the document to the path, unless its content is unchanged (so that its modification time is kept,
+    and e.g. file watchers aren't triggered).
+
+    @return: whether the file's content changed (or, with --dry-run, would have)
+    """
+    data = _encode_text(get_json_backend(args.json_backend).dumps(doc_data, indent=args.indent))
+    if os.path.getsize(path) == len(data):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    if not args.dry_run:
+        # a symlinked document is written through the link, rather than the link being replaced
+        target_path = os.path.realpath(path)
+        _replace_file(target_path, _create_temp_file(target_path, lambda f: f.write(data), mode='wb', in_place=True))
+    return True
+
+
+def _persist_stream(path: str, write: Callable[[IO[str]], None], args: argparse.Namespace) -> bool:
+    """
+    Writes a document which is being read from the same path, by way of a temporary file,
+    which replaces the file unless its content is unchanged (see _maybe_persist_json_doc).
+
+    @return: whether the file's content changed (or, with --dry-run, would have)
+    """
+    # a symlinked document is written through the link, rather than the link being replaced
+    target_path = os.path.realpath(path)
+    # with --dry-run, the temporary file is only written to be compared
+    tmp_path = _create_temp_file(target_path, write, mode='w', in_place=not args.dry_run)
+    changed = not filecmp.cmp(tmp_path, target_path, shallow=False)
+    if args.dry_run or not changed:
+        os.unlink(tmp_path)
+    else:
+        _replace_file(target_path, tmp_path)
+    return changed
+
+
+def _create_sorter(schema_data: Mapping[str, jschon.json.JSONCompatible], args: argparse.Namespace) -> SchemaSorter:
+    # imported (along with jschon) only once there are documents to process, so that e.g. --help is fast
+    from ._main import SchemaSorter
+
+    return SchemaSorter(schema_data, cache_dir=args.cache_dir if args.cache else None)
+
+
+class _Worker:
+    """
+    Processes documents against a schema that is compiled once (per process, or per server).
+    """
+
+    def __init__(self, sorter: SchemaSorter, args: argparse.Namespace) -> None:
+        self.sorter = sorter
+        self.args = args
+
+    def process_path(self, path: str) -> _PathResult:
+        stats = ProcessingStats() if self.args.stats else None
+        removed: Optional[List[str]] = [] if self.args.report and not self.args.check else None
+        changed: Optional[bool] = None
+        try:
+            if self.args.check:
+                self._check_path(path, stats)
+            elif self.args.jsonl or _is_json_lines_path(path):
+                changed = self._process_json_lines(path, stats, removed)
+            elif _is_yaml_path(path):
+                changed = self._process_yaml(path, stats, removed)
+            elif self.args.stream_array:
+                changed = self._process_json_array(path, stats, removed)
+            else:
+                with time_phase(stats, 'load'):
+                    doc_data = _load_json_doc(path, self.args)
+                doc_data = self._process_doc(
+                    self.sorter,
+                    doc_data,
+                    stats,
+                    removed,
+                    lambda ptr: repr(str(ptr)),
+                    jobs=self.args.jobs if self.args.split_documents else 1,
+                )
+                with time_phase(stats, 'dump'):
+                    changed = _maybe_persist_json_doc(doc_data, path, self.args)
+        except Exception as e:
+            return _PathResult(str(e) or type(e).__name__, stats, None, None)
+        return _PathResult(None, stats, removed, changed)
+
+    def _check_path(self, path: str, stats: Optional[ProcessingStats]) -> None:
+        if self.args.jsonl or _is_json_lines_path(path) or _is_yaml_path(path) or self.args.stream_array:
+            self._check_stream(path, stats)
+        else:
+            with time_phase(stats, 'load'):
+                doc_data = _load_json_doc(path, self.args)
+            self._check_docs(self.sorter, [doc_data], lambda idx, ptr: repr(str(ptr)), stats)
+
+    def _check_stream(self, path: str, stats: Optional[ProcessingStats]) -> None:
+        with open(path) as f:
+            if self.args.jsonl or _is_json_lines_path(path):
+                records = _iter_timed(iter_json_lines(f), stats, 'load')
+                self._check_docs(self.sorter, records, lambda idx, ptr: f'{str(ptr)!r} of record {idx + 1}', stats)
+            elif _is_yaml_path(path):
+                yaml = create_yaml_processor(indent=self.args.yaml_indent)
+                docs = _iter_timed(yaml.load_all(f), stats, 'load')
+                self._check_docs(self.sorter, docs, lambda idx, ptr: f'{str(ptr)!r} of document {idx + 1}', stats)
+            else:
+                get_item_sorter = self._get_item_sorters()
+                for idx, item in enumerate(_iter_timed(iter_json_array(f), stats, 'load')):
+                    self._check_docs(get_item_sorter(idx), [item], lambda _, ptr: repr(f'/{idx}{ptr}'), stats)
+
+    def _check_docs(
+        self,
+        sorter: SchemaSorter,
+        docs: Iterable[jschon.json.JSONCompatible],
+        describe_location: Callable[[int, jschon.JSONPointer], str],
+        stats: Optional[ProcessingStats],
+    ) -> None:
+        for idx, doc_data in enumerate(docs):
+            unprocessed_path = sorter.check(
+                doc_data,
+                sort=self.args.sort,
+                remove_additional_props=self.args.remove_additional_props,
+                validate=self.args.validate,
+                stats=stats,
+            )
+            if unprocessed_path is not None:
+                location = describe_location(idx, unprocessed_path)
+                if self.args.sort:
+                    raise ValueError(f'object at {location} is not sorted')
+                else:
+                    raise ValueError(f'object at {location} has additional properties')
+
+    def _process_doc(
+        self,
+        sorter: SchemaSorter,
+        doc_data: jschon.json.JSONCompatible,
+        stats: Optional[ProcessingStats],
+        removed: Optional[List[str]],
+        describe_location: Callable[[jschon.JSONPointer], str],
+        *,
+        jobs: int = 1,
+    ) -> jschon.json.JSONCompatible:
+        doc_removed: List[jschon.JSONPointer] = []
+        processed_doc_data = sorter.process(
+            doc_data,
+            sort=self.args.sort,
+            remove_additional_props=self.args.remove_additional_props,
+            validate=self.args.validate,
+            in_place=True,
+            stats=stats,
+            jobs=jobs,
+            removed=doc_removed if removed is not None else None,
+        )
+        if removed is not None:
+            removed.extend(map(describe_location, doc_removed))
+        return processed_doc_data
+
+    # streams are loaded, processed and dumped one document at a time, so (being nested within it)
+    # loading and processing are excluded from the "dump" phase's time
+
+    def _process_yaml(self, path: str, stats: Optional[ProcessingStats], removed: Optional[List[str]]) -> bool:
+        # a YAML stream may consist of multiple documents, which are processed (and emitted) one at a time
+        yaml_in = create_yaml_processor(indent=self.args.yaml_indent)
+        yaml_out = create_yaml_processor(indent=self.args.yaml_indent)
+        with open(path) as f_in:
+            docs = (
+                self._process_doc(self.sorter, doc, stats, removed, lambda ptr: f'{str(ptr)!r} of document {idx + 1}')
+                for idx, doc in enumerate(_iter_timed(yaml_in.load_all(f_in), stats, 'load'))
+            )
+            with time_phase(stats, 'dump'):
+                return _persist_stream(path, lambda f_out: yaml_out.dump_all(docs, f_out), self.args)
+
+    def _process_json_lines(self, path: str, stats: Optional[ProcessingStats], removed: Optional[List[str]]) -> bool:
+        with open(path) as f_in:
+            records = (
+                self._process_doc(self.sorter, record, stats, removed, lambda ptr: f'{str(ptr)!r} of record {idx + 1}')
+                for idx, record in enumerate(_iter_timed(iter_json_lines(f_in), stats, 'load'))
+            )
+            with time_phase(stats, 'dump'):
+                return _persist_stream(path, lambda f_out: write_json_lines(f_out, records), self.args)
+
+    def _get_item_sorters(self) -> Callable[[int], SchemaSorter]:
+        """
+        Gets the sorters for the items of a top-level array, which (as with validation) are processed against
+        the schema's "prefixItems" subschema at their index, if any, or else its "items" subschema.
+
+        @return: function getting the sorter for the item at an index
+        """
+        root_schema = self.sorter.root_schema
+        prefix_items_count = (
+            len(root_schema.keywords['prefixItems'].json) if 'prefixItems' in root_schema.keywords else 0
+        )
+        prefix_items_sorters = [
+            self.sorter.get_subschema_sorter(f'/prefixItems/{idx}') for idx in range(prefix_items_count)
+        ]
+        items_sorter = self.sorter.get_subschema_sorter('/items')
+        return lambda idx: prefix_items_sorters[idx] if idx < prefix_items_count else items_sorter
+
+    def _process_json_array(self, path: str, stats: Optional[ProcessingStats], removed: Optional[List[str]]) -> bool:
+        get_item_sorter = self._get_item_sorters()
+        with open(path) as f_in:
+            items = (
+                self._process_doc(get_item_sorter(idx), item, stats, removed, lambda ptr: repr(f'/{idx}{ptr}'))
+                for idx, item in enumerate(_iter_timed(iter_json_array(f_in), stats, 'load'))
+            )
+            with time_phase(stats, 'dump'):
+                return _persist_stream(
+                    path, lambda f_out: write_json_array(f_out, items, indent=self.args.indent), self.args
+                )
+
+
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(schema_data: Mapping[str, jschon.json.JSONCompatible], args: argparse.Namespace) -> None:
+    global _worker
+    _worker = _Worker(_create_sorter(schema_data, args), args)
+
+
+def _process_path(path: str) -> _PathResult:
+    assert _worker is not None
+    return _worker.process_path(path)
+
+
+def _process_paths(
+    paths: List[str], schema_data: Mapping[str, jschon.json.JSONCompatible], args: argparse.Namespace
+) -> Iterator[Tuple[str, _PathResult]]:
+    if not paths:
+        return
+
+    # when splitting documents, their subtrees are processed in parallel instead
+    jobs = 1 if args.split_documents else min(args.jobs, len(paths))
+    if jobs <= 1:
+        worker = _Worker(_create_sorter(schema_data, args), args)
+        for path in paths:
+            yield path, worker.process_path(path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(schema_data, args)) as executor:
+        chunksize = max(1, len(paths) // (jobs * 4))
+        yield from zip(paths, executor.map(_process_path, paths, chunksize=chunksize))
+
+
+def _process_paths_on_server(paths: List[str], args: argparse.Namespace) -> List[Tuple[str, _PathResult]]:
+    """
+    @raise OSError: if the server is not running
+    """
+    from ._server import call
+
+    # the server may be running in another directory
+    server_args = {**vars(args), 'schema': os.path.abspath(args.schema)}
+    results = call(args.socket, 'process', {'args': server_args, 'paths': [os.path.abspath(p) for p in paths]})
+    return [
+        (path, _PathResult(error, ProcessingStats.from_json(stats_data) if stats_data is not None else None, *rest))
+        for path, (error, stats_data, *rest) in zip(paths, results)
+    ]
+
+
+class _Server:
+    """
+    Handles requests against schemas (by path) which are kept loaded and compiled until their files change.
+    """
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self._sorters: Dict[str, Tuple[Tuple[int, int], SchemaSorter]] = {}
+
+    def _get_sorter(self, schema_path: str) -> SchemaSorter:
+        stat = os.stat(schema_path)
+        fingerprint = stat.st_mtime_ns, stat.st_size
+        entry = self._sorters.get(schema_path)
+        if entry is None or entry[0] != fingerprint:
+            entry = fingerprint, _create_sorter(_load_schema(schema_path, self.args), self.args)
+            self._sorters[schema_path] = entry
+        return entry[1]
+
+    def process(self, params: Mapping[str, Any]) -> List[Tuple[Any, ...]]:
+        """
+        Processes files, as this CLI would (see _process_paths_on_server).
+
+        @return: for each path, its result (see _PathResult), with the processing stats as JSON
+        """
+        args = argparse.Namespace(**params['args'])
+        args.yaml_indent = YamlIndent(*args.yaml_indent)
+        worker = _Worker(self._get_sorter(args.schema), args)
+        results: List[Tuple[Any, ...]] = []
+        for path in params['paths']:
+            error, stats, *rest = worker.process_path(path)
+            results.append((error, stats.to_json() if stats is not None else None, *rest))
+        return results
+
+    def sort(self, params: Mapping[str, Any]) -> jschon.json.JSONCompatible:
+        sorter = self._get_sorter(params['schema'])
+        return sorter.sort(params['doc'], validate=params.get('validate', True), in_place=True)
+
+    def remove_additional_props(self, params: Mapping[str, Any]) -> jschon.json.JSONCompatible:
+        sorter = self._get_sorter(params['schema'])
+        return sorter.remove_additional_props(params['doc'], validate=params.get('validate', True), in_place=True)
+
+    def check(self, params: Mapping[str, Any]) -> Optional[str]:
+        """
+        @return: location of the first object that processing would change, or None
+        """
+        sorter = self._get_sorter(params['schema'])
+        unprocessed_path = sorter.check(
+            params['doc'],
+            sort=params.get('sort', True),
+            remove_additional_props=params.get('remove_additional_props', False),
+            validate=params.get('validate', True),
+        )
+        return str(unprocessed_path) if unprocessed_path is not None else None
+
+    def serve(self) -> None:
+        from ._server import serve_stream
+        from ._server import serve_unix_socket
+
+        handlers = {
+            'process': self.process,
+            'sort': self.sort,
+            'remove_additional_props': self.remove_additional_props,
+            'check': self.check,
+        }
+        if self.args.socket is None:
+            serve_stream(sys.stdin, sys.stdout, handlers)
+            return
+
+        # exits cleanly (removing the socket) when terminated
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            serve_unix_socket(self.args.socket, handlers)
+        except KeyboardInterrupt:
+            pass
+
+
+def _create_run_cache(schema_data: Mapping[str, jschon.json.JSONCompatible], args: argparse.Namespace) -> RunCache:
+    # everything that affects the canonical form of a file (or, when checking, what's checked)
+    settings = [
+        args.sort,
+        args.remove_additional_props,
+        args.validate,
+        args.check,
+        args.jsonl,
+        args.stream_array,
+        args.indent,
+        list(args.yaml_indent),
+    ]
+    return RunCache(args.cache_dir, get_schema_key(schema_data, *settings))
+
+
+class _RunSummary:
+    """
+    Counts of the files a run processed (across schemas), and their aggregated processing stats.
+    """
+
+    def __init__(self) -> None:
+        self.processed = 0
+        # unchanged since they were last processed
+        self.skipped = 0
+        self.failed = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.stats = ProcessingStats()
+
+
+def _process_schema_paths(schema_path: str, paths: List[str], args: argparse.Namespace, summary: _RunSummary) -> None:
+    """
+    Processes the documents of a schema, which is loaded (and compiled) once for all of them.
+    """
+    args = argparse.Namespace(**{**vars(args), 'schema': schema_path})
+    schema_data = _load_schema(schema_path, args)
+
+    run_cache = _create_run_cache(schema_data, args) if args.cache else None
+    if run_cache is not None:
+        changed_paths: List[str] = []
+        for path in paths:
+            if run_cache.is_unchanged(path):
+                summary.skipped += 1
+            else:
+                changed_paths.append(path)
+        paths = changed_paths
+    summary.processed += len(paths)
+
+    results: Iterable[Tuple[str, _PathResult]] = _process_paths(paths, schema_data, args)
+    if args.socket is not None and paths:
+        from ._server import RemoteError
+
+        try:
+            results = _process_paths_on_server(paths, args)
+        except OSError:
+            pass  # the server is not running, so documents are processed by this process
+        except RemoteError as e:
+            sys.exit(f'{args.socket}: {e}')
+
+    for path, (error, stats, removed, changed) in results:
+        if stats is not None:
+            summary.stats.merge(stats)
+        if removed:
+            print(f'{path}: {len(removed)} additional properties removed: {", ".join(removed)}')
+        if changed is not None:
+            if changed:
+                summary.changed += 1
+            else:
+                summary.unchanged += 1
+        if error is not None:
+            print(f'{path}: {error}', file=sys.stderr)
+            summary.failed += 1
+        elif run_cache is not None and (args.check or not args.dry_run):
+            run_cache.add(path)
+
+    if run_cache is not None:
+        run_cache.save()
+
+
+def _main(parser: argparse.ArgumentParser) -> None:
+    args = parser.parse_args()
+    if args.serve:
+        _Server(args).serve()
         return
 
-    if _is_yaml_path(args.path):
-        with open(args.path, 'w') as f:
-            yaml = create_yaml_processor(indent=args.yaml_indent)
-            yaml.dump(doc_data, f)
+    config: Optional[SchemaConfig] = None
+    if args.schema is None:
+        config_path = args.config if args.config is not None else find_config(os.curdir)
+        if config_path is None:
+            parser.error('the following arguments are required: --schema (unless configured, see --config)')
+        try:
+            config = SchemaConfig.load(config_path)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    elif not args.path:
+        parser.error('the following arguments are required: path')
+
+    try:
+        get_json_backend(args.json_backend)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if config is None:
+        schema_paths = {args.schema: _expand_paths(args.path)}
     else:
-        with open(args.path, 'w') as f:
-            json.dump(doc_data, f, indent=args.indent)
+        schema_paths, unmatched_paths = config.group_paths(_expand_paths(args.path) if args.path else None)
+        if unmatched_paths:
+            print(f'{len(unmatched_paths)} files skipped, as no schema is associated with them', file=sys.stderr)
 
+    summary = _RunSummary()
+    for schema_path, paths in schema_paths.items():
+        _process_schema_paths(schema_path, paths, args, summary)
 
-def sort_main() -> None:
-    jschon.create_catalog('2020-12')
+    if summary.changed + summary.unchanged > 1:
+        print(
+            f'{summary.changed} files {"would be changed" if args.dry_run else "changed"}, '
+            f'{summary.unchanged} unchanged',
+            file=sys.stderr,
+        )
+    if summary.skipped:
+        print(
+            f'{summary.skipped} of {summary.processed + summary.skipped} files skipped, '
+            f'as unchanged since they were last processed',
+            file=sys.stderr,
+        )
+    if args.stats:
+        print(f'{summary.processed} files processed:\n{summary.stats.format()}', file=sys.stderr)
+
+    if summary.failed:
+        sys.exit(1)
 
+
+def sort_main() -> None:
     parser = _make_parser(
         prog='jschon-sort',
         description="Sorts a JSON or YAML document to match a JSON Schema's order of properties",
     )
-    args = parser.parse_args()
-
-    doc_data, schema_data = _load_doc_and_schema(args)
-    doc_data = process_json_doc(doc_data=doc_data, schema_data=schema_data, sort=True)
-    _maybe_persist(doc_data, args)
+    parser.set_defaults(sort=True, remove_additional_props=False, report=False)
+    _main(parser)
 
 
 def remove_additional_props_main() -> None:
-    jschon.create_catalog('2020-12')
-
     parser = _make_parser(
         prog='jschon-remove-additional-props',
         description="Processes a JSON or YAML document to remove additional properties not defined in the schema",
     )
-    args = parser.parse_args()
-
-    doc_data, schema_data = _load_doc_and_schema(args)
-    doc_data = process_json_doc(doc_data=doc_data, schema_data=schema_data, remove_additional_props=True)
-    _maybe_persist(doc_data, args)
+    parser.add_argument(
+        '--report',
+        help='if set, prints the number and locations of the properties removed from each file',
+        action='store_true',
+    )
+    parser.set_defaults(sort=False, remove_additional_props=True)
+    _main(parser)
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest
 
 
@@ -6,3 +8,11 @@ def create_catalog():
     import jschon
 
     jschon.create_catalog('2020-12')
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # keeps the tests (and the CLI processes they spawn) from using the user's cache
+    cache_home = tmp_path_factory.mktemp('cache')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(cache_home))
+    return cache_home
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+from typing import List
+from typing import Mapping
+
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import aprocess_json_doc
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaSorter
+from jschon_tools._async import _process_in_worker
+
+
+SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "start": {"type": "number"},
+        "end": {"type": "number"},
+    },
+}
+
+DOCS: List[JSONCompatible] = [{"end": idx + 1, "extra": None, "start": idx} for idx in range(10)]
+SORTED_DOCS = [{"start": idx, "end": idx + 1, "extra": None} for idx in range(10)]
+
+
+async def _collect(docs: AsyncIterator[JSONCompatible]) -> List[JSONCompatible]:
+    return [doc_data async for doc_data in docs]
+
+
+def test_aprocess_json_doc() -> None:
+    # Arrange
+    stats = ProcessingStats()
+    hook_stats: List[ProcessingStats] = []
+
+    # Act
+    sorted_doc = asyncio.run(
+        aprocess_json_doc(doc_data=DOCS[0], schema_data=SCHEMA, sort=True, stats=stats, stats_hook=hook_stats.append)
+    )
+
+    # Assert
+    assert json.dumps(sorted_doc) == json.dumps(SORTED_DOCS[0])
+    assert stats.documents == 1
+    assert [s.documents for s in hook_stats] == [1]
+
+
+@pytest.mark.parametrize('executor_type', [None, ThreadPoolExecutor, ProcessPoolExecutor])
+@pytest.mark.parametrize('validate', [True, False])
+def test_process_many(validate: bool, executor_type: type) -> None:
+    # Arrange
+    hook_stats: List[ProcessingStats] = []
+    sorter = SchemaSorter(SCHEMA, stats_hook=hook_stats.append)
+    stats = ProcessingStats()
+    executor = executor_type(max_workers=2) if executor_type is not None else None
+
+    # Act
+    sorted_docs = asyncio.run(
+        _collect(sorter.process_many(DOCS, concurrency=3, sort=True, validate=validate, stats=stats, executor=executor))
+    )
+    unordered_docs = asyncio.run(
+        _collect(SchemaSorter(SCHEMA).process_many(DOCS, concurrency=3, ordered=False, sort=True, executor=executor))
+    )
+    if executor is not None:
+        executor.shutdown()
+
+    # Assert
+    assert json.dumps(sorted_docs) == json.dumps(SORTED_DOCS)
+    assert sorted(json.dumps(doc) for doc in unordered_docs) == sorted(json.dumps(doc) for doc in SORTED_DOCS)
+    assert stats.documents == len(DOCS)
+    assert len(hook_stats) == len(DOCS)
+
+
+def test_process_many__backpressure() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+    read_counts: List[int] = []
+    yielded_read_counts: List[int] = []
+
+    async def _receive_docs() -> AsyncIterator[JSONCompatible]:
+        for idx, doc_data in enumerate(DOCS):
+            read_counts.append(idx + 1)
+            yield doc_data
+
+    async def _process() -> List[JSONCompatible]:
+        sorted_docs = []
+        async for doc_data in sorter.process_many(_receive_docs(), concurrency=2, sort=True):
+            yielded_read_counts.append(read_counts[-1])
+            sorted_docs.append(doc_data)
+        return sorted_docs
+
+    # Act
+    sorted_docs = asyncio.run(_process())
+
+    # Assert
+    assert json.dumps(sorted_docs) == json.dumps(SORTED_DOCS)
+    # no more than 2 documents are read ahead of those yielded
+    for yielded_count, read_count in enumerate(yielded_read_counts, start=1):
+        assert read_count <= yielded_count + 1
+
+
+def test_process_many__failed() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+    docs = [*DOCS[:3], {"start": "0"}, *DOCS[3:]]
+
+    # Act & Assert
+    with pytest.raises(ValueError, match='Document failed schema validation'):
+        asyncio.run(_collect(sorter.process_many(docs, concurrency=4, sort=True)))
+    with pytest.raises(ValueError, match='concurrency must be at least 1'):
+        asyncio.run(_collect(sorter.process_many(DOCS, concurrency=0)))
+
+
+def test_process_many__stopped() -> None:
+    # Arrange
+    hook_stats: List[ProcessingStats] = []
+    release = threading.Event()
+
+    def _stats_hook(doc_stats: ProcessingStats) -> None:
+        hook_stats.append(doc_stats)
+        if len(hook_stats) > 1:
+            release.wait(timeout=10)  # keeps the second document from completing
+
+    sorter = SchemaSorter(SCHEMA, stats_hook=_stats_hook)
+
+    async def _process_first(executor: ThreadPoolExecutor) -> JSONCompatible:
+        docs = sorter.process_many(DOCS, concurrency=4, sort=True, executor=executor)
+        async for doc_data in docs:
+            await docs.aclose()  # type: ignore[attr-defined]
+            return doc_data
+        raise AssertionError  # pragma: no cover
+
+    # Act
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        try:
+            sorted_doc = asyncio.run(_process_first(executor))
+        finally:
+            release.set()
+
+    # Assert
+    assert json.dumps(sorted_doc) == json.dumps(SORTED_DOCS[0])
+    assert len(hook_stats) <= 2  # the documents after the second were cancelled before being processed
+
+
+def test_aprocess__process_executor_jschon_schema() -> None:
+    # Arrange
+    sorter = SchemaSorter({**SCHEMA, "$defs": {"range": SCHEMA}}).get_subschema_sorter('/$defs/range')
+
+    # Act & Assert
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(ValueError, match='Processing in a process executor requires the schema data'):
+            asyncio.run(sorter.aprocess(DOCS[0], sort=True, executor=executor))
+
+
+def test_aprocess__worker() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act
+    results = [
+        _process_in_worker(
+            sorter._get_schema_key(),
+            SCHEMA,
+            None,
+            {"end": 20, "start": 10},
+            sort=True,
+            remove_additional_props=False,
+            validate=True,
+            collect_stats=collect_stats,
+        )
+        for collect_stats in (True, False)
+    ]
+
+    # Assert
+    for (processed_doc, doc_stats), collect_stats in zip(results, (True, False)):
+        assert json.dumps(processed_doc) == json.dumps({"start": 10, "end": 20})
+        assert (doc_stats is not None) == collect_stats
@@ -0,0 +1,44 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+
+BENCHMARK_PATH = Path(__file__).parent.parent / 'benchmarks' / 'processing.py'
+
+
+def _run_benchmark(*args: str) -> 'subprocess.CompletedProcess[str]':
+    return subprocess.run(
+        [sys.executable, str(BENCHMARK_PATH), '--size', '20', '--repeat', '1', *args], capture_output=True, text=True
+    )
+
+
+def test_benchmark__processing(tmp_path: Path) -> None:
+    # Arrange
+    baseline_path = tmp_path / 'baseline.json'
+    _run_benchmark('--save', str(baseline_path)).check_returncode()
+    baseline = json.loads(baseline_path.read_text())
+
+    # Act
+    proc = _run_benchmark('--compare', str(baseline_path), '--threshold', '100000')
+    baseline['results']['wide']['evaluate']['time'] = 1e-12
+    baseline_path.write_text(json.dumps(baseline))
+    regressed_proc = _run_benchmark('--compare', str(baseline_path), '--threshold', '100000', '--scenario', 'wide')
+
+    # Assert
+    assert proc.returncode == 0, proc.stderr
+    phases: List[str] = list(baseline['results']['yaml'])
+    assert phases == [
+        'parse',
+        'compile',
+        'compile (structural)',
+        'evaluate',
+        'sort keys',
+        'sort keys (structural)',
+        'traverse',
+        'serialize',
+    ]
+    assert list(baseline['results']) == ['nested', 'wide', 'array', 'refs', 'composition', 'yaml']
+    assert regressed_proc.returncode == 1
+    assert regressed_proc.stderr == 'Slower than the baseline by more than 100000%: wide: evaluate\n'
@@ -0,0 +1,246 @@
+import json
+import os
+from pathlib import Path
+from typing import List
+from typing import Mapping
+from unittest import mock
+
+import jschon
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import SchemaSorter
+from jschon_tools._cache import CompiledSchemaCache
+from jschon_tools._cache import get_schema_key
+from jschon_tools._cache import RunCache
+from jschon_tools._structural import compile_schema
+
+
+SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "range": {"$ref": "#/$defs/range"},
+        "tags": {"type": "array", "items": {"$ref": "#/$defs/tag"}},
+    },
+    "$defs": {
+        "range": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+        },
+        "tag": {
+            "type": "object",
+            "properties": {
+                "value": {"type": "string"},
+                "name": {"type": "string"},
+            },
+        },
+    },
+}
+
+DOC = {"tags": [{"name": "a", "value": "b"}], "range": {"end": 20, "start": 10}}
+
+
+def test_schema_sorter__cache_dir(tmp_path: Path) -> None:
+    # Arrange
+    cold_sorter = SchemaSorter(SCHEMA, cache_dir=str(tmp_path))
+    expected = cold_sorter.sort(DOC, validate=False)
+
+    # Act
+    with mock.patch.object(jschon, 'JSONSchema', wraps=jschon.JSONSchema) as json_schema_mock:
+        warm_sorter = SchemaSorter(SCHEMA, cache_dir=str(tmp_path))
+        actual = warm_sorter.sort(DOC, validate=False)
+
+    # Assert
+    assert json.dumps(expected) == '{"range": {"start": 10, "end": 20}, "tags": [{"value": "b", "name": "a"}]}'
+    assert json.dumps(actual) == json.dumps(expected)
+    assert json_schema_mock.call_count == 0, "schema is not constructed on a cache hit"
+    assert len(list(tmp_path.glob('*.json'))) == 1
+
+
+def test_schema_sorter__cache_dir__if_then_else(tmp_path: Path) -> None:
+    # Arrange
+    schema: Mapping[str, JSONCompatible] = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "properties": {"kind": True, "range": {"$ref": "https://example.com/range"}},
+        "$defs": {
+            "range": {
+                "$id": "https://example.com/range",
+                "if": {"required": ["kind"]},
+                "then": {"properties": {"end": True, "start": True}},
+                "else": {"properties": {"start": True, "end": True}},
+            },
+        },
+    }
+    docs: List[JSONCompatible] = [
+        {"range": {"kind": "span", "start": 10, "end": 20}},
+        {"range": {"end": 20, "start": 10}},
+        {"range": "n/a", "kind": None},
+    ]
+    SchemaSorter(schema, cache_dir=str(tmp_path)).sort(docs[0], validate=False)
+
+    # Act
+    warm_sorter = SchemaSorter(schema, cache_dir=str(tmp_path))
+    actual = [warm_sorter.sort(doc, validate=False) for doc in docs]
+
+    # Assert
+    assert json.dumps(actual[0]) == '{"range": {"end": 20, "start": 10, "kind": "span"}}'
+    assert json.dumps(actual[1]) == '{"range": {"start": 10, "end": 20}}'
+    assert json.dumps(actual[2]) == '{"kind": null, "range": "n/a"}'
+    assert actual == [SchemaSorter(schema).sort(doc) for doc in docs]
+
+
+def test_schema_sorter__cache_dir__corrupted(tmp_path: Path) -> None:
+    # Arrange
+    SchemaSorter(SCHEMA, cache_dir=str(tmp_path)).sort(DOC, validate=False)
+    (entry_path,) = tmp_path.glob('*.json')
+    entry_path.write_text('{"nodes": [{}]}')
+
+    # Act
+    actual = SchemaSorter(SCHEMA, cache_dir=str(tmp_path)).sort(DOC, validate=False)
+
+    # Assert
+    assert json.dumps(actual) == '{"range": {"start": 10, "end": 20}, "tags": [{"value": "b", "name": "a"}]}'
+    assert json.loads(entry_path.read_text())['nodes'][0] != {}, "entry is replaced"
+
+
+@pytest.mark.parametrize('truncated_size', [0, 10], ids=('empty', 'partial'))
+def test_schema_sorter__cache_dir__truncated(tmp_path: Path, truncated_size: int) -> None:
+    # Arrange
+    SchemaSorter(SCHEMA, cache_dir=str(tmp_path)).sort(DOC, validate=False)
+    (entry_path,) = tmp_path.glob('*.json')
+    entry_path.write_text(entry_path.read_text()[:truncated_size])
+
+    # Act
+    actual = SchemaSorter(SCHEMA, cache_dir=str(tmp_path)).sort(DOC, validate=False)
+
+    # Assert
+    assert json.dumps(actual) == '{"range": {"start": 10, "end": 20}, "tags": [{"value": "b", "name": "a"}]}'
+    assert CompiledSchemaCache(str(tmp_path)).load(entry_path.stem) is not None, "entry is replaced"
+
+
+def test_schema_sorter__cache_dir__synced(tmp_path: Path) -> None:
+    # Arrange
+    manager = mock.Mock()
+
+    # Act
+    with mock.patch('os.fsync', wraps=os.fsync) as fsync_mock, mock.patch(
+        'os.replace', wraps=os.replace
+    ) as replace_mock:
+        manager.attach_mock(fsync_mock, 'fsync')
+        manager.attach_mock(replace_mock, 'replace')
+        SchemaSorter(SCHEMA, cache_dir=str(tmp_path)).sort(DOC, validate=False)
+
+    # Assert
+    assert [name for name, _, _ in manager.mock_calls] == ['fsync', 'replace'], "the entry is synced before replacing"
+    assert len(list(tmp_path.glob('*.json'))) == 1
+
+
+def test_schema_sorter__cache_dir__unwritable(tmp_path: Path) -> None:
+    # Arrange
+    cache_dir = tmp_path / 'cache'
+    cache_dir.write_text('not a directory')
+
+    # Act
+    actual = SchemaSorter(SCHEMA, cache_dir=str(cache_dir)).sort(DOC, validate=False)
+
+    # Assert
+    assert json.dumps(actual) == '{"range": {"start": 10, "end": 20}, "tags": [{"value": "b", "name": "a"}]}'
+
+
+def test_compiled_schema_cache__eviction(tmp_path: Path) -> None:
+    # Arrange
+    compiled_schema = compile_schema(jschon.JSONSchema(SCHEMA))
+    entry_size = len(json.dumps(compiled_schema.to_json(), separators=(',', ':')))
+    cache = CompiledSchemaCache(str(tmp_path), max_size=entry_size * 2)
+    cache.store('a', compiled_schema)
+    cache.store('b', compiled_schema)
+    (tmp_path / 'unrelated').write_text('x' * entry_size * 2)
+    os.utime(tmp_path / 'a.json', (0, 0))
+    os.utime(tmp_path / 'b.json', (0, 1))
+    assert cache.load('a') is not None  # marks "a" as recently used
+
+    # Act
+    cache.store('c', compiled_schema)
+
+    # Assert
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.json', 'c.json', 'unrelated']
+
+
+def test_compiled_schema_cache__store_failed(tmp_path: Path) -> None:
+    # Arrange
+    compiled_schema = compile_schema(jschon.JSONSchema(SCHEMA))
+    cache = CompiledSchemaCache(str(tmp_path))
+
+    # Act
+    with mock.patch('os.replace', side_effect=PermissionError):
+        cache.store('a', compiled_schema)
+
+    # Assert
+    assert list(tmp_path.iterdir()) == [], "temporary file is removed"
+
+
+def test_get_schema_key() -> None:
+    # Arrange
+    reordered_schema = {
+        **SCHEMA,
+        "properties": {
+            "tags": {"type": "array", "items": {"$ref": "#/$defs/tag"}},
+            "range": {"$ref": "#/$defs/range"},
+        },
+    }
+
+    # Act & Assert
+    assert get_schema_key(SCHEMA) == get_schema_key(dict(SCHEMA))
+    assert get_schema_key(SCHEMA) != get_schema_key(reordered_schema)
+
+
+def test_run_cache(tmp_path: Path) -> None:
+    # Arrange
+    cache_dir = str(tmp_path / 'cache')
+    doc_path = tmp_path / 'doc.json'
+    doc_path.write_text('{}')
+    missing_path = tmp_path / 'missing.json'
+    run_cache = RunCache(cache_dir, 'key')
+    run_cache.add(str(doc_path))
+    run_cache.add(str(missing_path))
+    run_cache.save()
+
+    # Act
+    next_run_cache = RunCache(cache_dir, 'key')
+    other_run_cache = RunCache(cache_dir, 'other-key')
+
+    # Assert
+    assert next_run_cache.is_unchanged(str(doc_path))
+    assert not next_run_cache.is_unchanged(str(missing_path))
+    assert not other_run_cache.is_unchanged(str(doc_path))
+    doc_path.write_text('{"a": 1}')
+    assert not next_run_cache.is_unchanged(str(doc_path))
+
+
+def test_run_cache__save(tmp_path: Path) -> None:
+    # Arrange
+    cache_dir = str(tmp_path / 'cache')
+    doc_paths = [tmp_path / f'doc{idx}.json' for idx in range(3)]
+    for doc_path in doc_paths:
+        doc_path.write_text('{}')
+    run_cache = RunCache(cache_dir, 'key')
+    run_cache.add(str(doc_paths[0]))
+    run_cache.add(str(doc_paths[1]))
+    run_cache.save()
+    doc_paths[1].unlink()
+
+    # Act
+    # runs that read the entry before either saved
+    run_caches = [RunCache(cache_dir, 'key'), RunCache(cache_dir, 'key')]
+    run_caches[0].add(str(doc_paths[2]))
+    run_caches[1].add(str(doc_paths[0]))
+    for concurrent_run_cache in run_caches:
+        concurrent_run_cache.save()
+
+    # Assert
+    with open(os.path.join(cache_dir, 'run-key.json')) as f:
+        assert sorted(json.load(f)) == [os.path.realpath(doc_paths[0]), os.path.realpath(doc_paths[2])]
@@ -1,12 +1,20 @@
 import json
+import os
 import subprocess
+import sys
 from pathlib import Path
 from textwrap import dedent
 from typing import List
 from typing import Literal
+from typing import Mapping
 from typing import Union
 
 import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools.cli import _init_worker
+from jschon_tools.cli import _make_parser
+from jschon_tools.cli import _process_path
 
 
 @pytest.mark.parametrize('dry_run', (False, True), ids=('wet_run', 'dry_run'))
@@ -197,3 +205,787 @@ def test_remove_additional_props_cli(
             )
         else:
             raise NotImplementedError(file_format)  # pragma: no cover
+
+
+@pytest.mark.parametrize('jobs', ('1', '2'))
+def test_sort_cli__multiple_paths(tmp_path: Path, jobs: str) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+
+    (tmp_path / "docs" / "nested").mkdir(parents=True)
+    json_paths = [tmp_path / "a.json", tmp_path / "b.json"]
+    yaml_paths = [tmp_path / "docs" / "c.yaml", tmp_path / "docs" / "nested" / "d.yml"]
+    for p in json_paths:
+        p.write_text('{"end": 20, "start": 10}')
+    for p in yaml_paths:
+        p.write_text('end: 20\nstart: 10\n')
+    (tmp_path / "docs" / "notes.txt").write_text('not a document')
+
+    # Act
+    subprocess.check_output(
+        ['jschon-sort', '--schema', schema_path, '--jobs', jobs, tmp_path / "*.json", tmp_path / "docs"]
+    )
+
+    # Assert
+    for p in json_paths:
+        assert json.loads(p.read_text()) == {"start": 10, "end": 20}
+        assert p.read_text().index('start') < p.read_text().index('end')
+    for p in yaml_paths:
+        assert p.read_text() == 'start: 10\nend: 20\n'
+    assert (tmp_path / "docs" / "notes.txt").read_text() == 'not a document'
+
+
+def test_sort_cli__worker(tmp_path: Path) -> None:
+    # Arrange
+    schema: Mapping[str, JSONCompatible] = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    doc_path = tmp_path / "doc.json"
+    doc_path.write_text('{"end": 20, "start": 10}')
+    parser = _make_parser(prog='jschon-sort', description='')
+    parser.set_defaults(sort=True, remove_additional_props=False, report=False)
+    args = parser.parse_args(['--schema', 'schema.json', '--no-cache', str(doc_path)])
+
+    # Act
+    # the worker processes' functions (which coverage isn't measured in) are called in this process
+    _init_worker(schema, args)
+    results = [_process_path(str(doc_path)), _process_path(str(tmp_path / "missing.json"))]
+
+    # Assert
+    assert [(result.error is None, result.changed) for result in results] == [(True, True), (False, None)]
+    assert json.loads(doc_path.read_text()) == {"start": 10, "end": 20}
+
+
+def test_sort_cli__partial_failure(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    invalid_path = tmp_path / "invalid.json"
+    invalid_path.write_text('{"end": "20", "start": 10}')
+    valid_path = tmp_path / "valid.json"
+    valid_path.write_text('{"end": 20, "start": 10}')
+    missing_path = tmp_path / "missing.json"
+
+    # Act
+    proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--jobs', '2', invalid_path, missing_path, valid_path],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert proc.returncode == 1
+    assert f'{invalid_path}: Document failed schema validation' in proc.stderr
+    assert f'{missing_path}: ' in proc.stderr
+    assert invalid_path.read_text() == '{"end": "20", "start": 10}'
+    assert json.loads(valid_path.read_text()) == {"start": 10, "end": 20}
+    assert valid_path.read_text().index('start') < valid_path.read_text().index('end')
+
+
+@pytest.mark.parametrize('jobs', ('1', '2'))
+def test_sort_cli__stats(tmp_path: Path, jobs: str) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    json_path = tmp_path / "doc.json"
+    json_path.write_text('{"end": 20, "start": 10}')
+    jsonl_path = tmp_path / "doc.jsonl"
+    jsonl_path.write_text('{"end": 20, "start": 10}\n{"start": 30, "end": 40}\n')
+    yaml_path = tmp_path / "doc.yaml"
+    yaml_path.write_text('end: 20\nstart: 10\n---\nend: "20"\n')
+
+    # Act
+    proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--stats', '--jobs', jobs, json_path, jsonl_path, yaml_path],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert proc.returncode == 1
+    assert proc.stderr.splitlines()[:3] == [
+        f'{yaml_path}: Document failed schema validation',
+        '2 files changed, 0 unchanged',
+        '3 files processed:',
+    ]
+    assert [line.split(':')[0].strip() for line in proc.stderr.splitlines()[3:]] == [
+        'load time',
+        'compile time',
+        'evaluate time',
+        'sort_keys time',
+        'traverse time',
+        'dump time',
+        'documents',
+        'result_nodes',
+        'schema_nodes_keyed',
+        'doc_nodes_visited',
+        'sort_keys_cache_hits',
+        'sort_keys_cache_misses',
+        'keys_removed',
+    ]
+    assert '  documents:              4\n' in proc.stderr, "documents of failed files are counted until failure"
+
+
+def test_sort_cli__no_validate(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_path = tmp_path / "doc.yaml"
+    doc_path.write_text('end: "20"\nstart: 10\n')
+
+    # Act
+    subprocess.check_output(['jschon-sort', '--schema', schema_path, '--no-validate', doc_path])
+
+    # Assert
+    assert doc_path.read_text() == 'start: 10\nend: "20"\n'
+
+
+def test_sort_cli__json_backend(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_path = tmp_path / "doc.json"
+    doc_path.write_text('{"values": [10], "name": "caf\u00e9", "end": 2e20, "start": 10}')
+    check_doc_path = tmp_path / "check.json"
+    check_doc_path.write_text('{"end": 20, "start": 10}')
+
+    # Act
+    subprocess.check_output(['jschon-sort', '--schema', schema_path, '--json-backend', 'orjson', doc_path])
+    check_proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--json-backend', 'orjson', '--check', check_doc_path],
+        capture_output=True,
+        text=True,
+    )
+    not_installed_proc = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'import sys; from jschon_tools.cli import sort_main; sys.modules["orjson"] = None; sort_main()',
+            '--schema',
+            schema_path,
+            '--json-backend',
+            'orjson',
+            doc_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert doc_path.read_text() == (
+        '{\n    "start": 10,\n    "end": 2e+20,\n    "name": "caf\\u00e9",\n    "values": [\n        10\n    ]\n}'
+    )
+    assert check_proc.stderr == f"{check_doc_path}: object at '' is not sorted\n"
+    assert not_installed_proc.returncode == 2
+    assert 'orjson is not installed' in not_installed_proc.stderr
+
+
+@pytest.mark.parametrize('cache', (True, False), ids=('cache', 'no_cache'))
+def test_sort_cli__cache_dir(tmp_path: Path, cache: bool) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_path = tmp_path / "doc.json"
+    cache_dir = tmp_path / "cache"
+    args: List[Union[str, Path]] = ['jschon-sort', '--schema', schema_path, '--no-validate', '--cache-dir', cache_dir]
+    if not cache:
+        args.append('--no-cache')
+
+    # Act
+    for _ in range(2):
+        doc_path.write_text('{"end": 20, "start": 10}')
+        subprocess.check_output([*args, doc_path])
+
+    # Assert
+    assert doc_path.read_text() == '{\n    "start": 10,\n    "end": 20\n}'
+    compiled_schema_paths = [p for p in cache_dir.glob('*.json') if not p.name.startswith('run-')]
+    assert len(compiled_schema_paths) == (1 if cache else 0)
+
+
+def test_sort_cli__run_cache(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_paths = [tmp_path / f"doc{i}.json" for i in range(3)]
+    for p in doc_paths:
+        p.write_text('{"end": 20, "start": 10}')
+    invalid_path = tmp_path / "invalid.json"
+    invalid_path.write_text('{"end": "20", "start": 10}')
+    args: List[Union[str, Path]] = ['jschon-sort', '--schema', schema_path, '--jobs', '1', *doc_paths, invalid_path]
+
+    def _run(*extra_args: str) -> str:
+        return subprocess.run([*args, *extra_args], capture_output=True, text=True).stderr
+
+    # Act & Assert
+    assert 'skipped' not in _run('--dry-run')
+    assert 'skipped' not in _run(), "dry runs are not recorded"
+    assert _run().endswith('3 of 4 files skipped, as unchanged since they were last processed\n')
+    assert 'skipped' not in _run('--dry-run', '--indent', '2'), "settings are part of the key"
+    assert 'skipped' not in _run('--check'), "checks are recorded separately"
+    assert 'skipped' in _run('--check')
+
+    doc_paths[0].write_text('{"end": 200, "start": 100}')
+    assert _run().endswith('2 of 4 files skipped, as unchanged since they were last processed\n')
+    assert json.loads(doc_paths[0].read_text()) == {"start": 100, "end": 200}
+    assert 'skipped' not in _run('--no-cache')
+
+
+@pytest.mark.parametrize('dry_run', (False, True), ids=('wet_run', 'dry_run'))
+def test_sort_cli__jsonl(tmp_path: Path, dry_run: bool) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_text = '{"end": 20, "start": 10}\n\n{"end": 40, "start": 30}\n'
+    jsonl_path = tmp_path / "doc.jsonl"
+    jsonl_path.write_text(doc_text)
+    txt_path = tmp_path / "doc.txt"
+    txt_path.write_text(doc_text)
+    txt_path.chmod(0o640)
+
+    # Act
+    args: List[Union[str, Path]] = ['jschon-sort', '--schema', schema_path, '--jsonl', jsonl_path, txt_path]
+    if dry_run:
+        args += ['--dry-run']
+    subprocess.check_output(args)
+
+    # Assert
+    if dry_run:
+        assert jsonl_path.read_text() == doc_text
+        assert txt_path.read_text() == doc_text
+    else:
+        assert jsonl_path.read_text() == '{"start":10,"end":20}\n{"start":30,"end":40}\n'
+        assert txt_path.read_text() == '{"start":10,"end":20}\n{"start":30,"end":40}\n'
+        assert txt_path.stat().st_mode & 0o777 == 0o640
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['doc.jsonl', 'doc.txt', 'schema.json']
+
+
+def test_sort_cli__stream_array(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_path = tmp_path / "doc.json"
+    doc_path.write_text('[{"end": 20, "start": 10}, {"end": 40, "start": 30}]')
+    invalid_doc_path = tmp_path / "invalid.json"
+    invalid_doc_path.write_text('[{"end": 20, "start": 10}, {"end": "40", "start": 30}]')
+
+    # Act
+    proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--stream-array', doc_path, invalid_doc_path],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert proc.returncode == 1
+    assert f'{invalid_doc_path}: Document failed schema validation' in proc.stderr
+    assert invalid_doc_path.read_text() == '[{"end": 20, "start": 10}, {"end": "40", "start": 30}]'
+    assert doc_path.read_text() == json.dumps([{"start": 10, "end": 20}, {"start": 30, "end": 40}], indent=4)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['doc.json', 'invalid.json', 'schema.json']
+
+
+def test_sort_cli__stream_array__prefix_items(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "array",
+        "prefixItems": [{"properties": {"to": {}, "from": {}}}],
+        "items": {"properties": {"from": {}, "to": {}}},
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_path = tmp_path / "doc.json"
+    doc_path.write_text('[{"from": 1, "to": 2}, {"to": 4, "from": 3}]')
+    unsorted_doc_path = tmp_path / "unsorted.json"
+    unsorted_doc_path.write_text('[{"to": 2, "from": 1}, {"to": 4, "from": 3}]')
+
+    # Act
+    subprocess.check_call(['jschon-sort', '--schema', schema_path, '--stream-array', doc_path])
+    subprocess.check_call(['jschon-sort', '--schema', schema_path, '--check', '--stream-array', doc_path])
+    proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--check', '--stream-array', unsorted_doc_path],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert doc_path.read_text() == json.dumps([{"to": 2, "from": 1}, {"from": 3, "to": 4}], indent=4)
+    assert proc.returncode == 1
+    assert proc.stderr == f"{unsorted_doc_path}: object at '/1' is not sorted\n"
+
+
+def test_sort_cli__split_documents(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "ranges": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "start": {"type": "number"},
+                        "end": {"type": "number"},
+                    },
+                },
+            },
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_path = tmp_path / "doc.json"
+    doc_path.write_text('{"ranges": [{"end": 20, "start": 10}, {"end": 40, "start": 30}]}')
+    invalid_doc_path = tmp_path / "invalid.json"
+    invalid_doc_path.write_text('{"ranges": [{"end": 20, "start": 10}, {"end": "40", "start": 30}]}')
+
+    # Act
+    proc = subprocess.run(
+        [
+            'jschon-sort',
+            '--schema',
+            schema_path,
+            '--split-documents',
+            '--jobs',
+            '2',
+            '--stats',
+            doc_path,
+            invalid_doc_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert proc.returncode == 1
+    assert f'{invalid_doc_path}: Document failed schema validation' in proc.stderr
+    assert 'documents:              1\n' in proc.stderr
+    assert doc_path.read_text() == json.dumps(
+        {"ranges": [{"start": 10, "end": 20}, {"start": 30, "end": 40}]}, indent=4
+    )
+
+
+def test_sort_cli__yaml_multiple_documents(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    doc_path = tmp_path / "doc.yaml"
+    doc_path.write_text(
+        dedent(
+            """\
+            # first
+            end: 20  # end comment
+            start: 10
+            ---
+            # second
+            end: 40
+            start: 30  # start comment
+            """
+        )
+    )
+
+    # Act
+    subprocess.check_output(['jschon-sort', '--schema', schema_path, doc_path])
+
+    # Assert
+    assert doc_path.read_text() == dedent(
+        """\
+        # first
+        start: 10
+        end: 20  # end comment
+        ---
+        # second
+        start: 30  # start comment
+        end: 40
+        """
+    )
+
+
+def test_sort_cli__check(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": ["object", "array"],
+        "properties": {
+            "range": {
+                "type": "object",
+                "properties": {
+                    "start": {"type": "number"},
+                    "end": {"type": "number"},
+                },
+            },
+        },
+        "items": {"$ref": "#/properties/range"},
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    docs = {
+        "sorted.json": '{"range": {"start": 10, "end": 20}}',
+        "unsorted.json": '{"range": {"end": 20, "start": 10}}',
+        "unsorted.yaml": 'range:\n  start: 10\n  end: 20\n---\nrange:\n  end: 20\n  start: 10\n',
+        "unsorted.jsonl": '{"range": {"start": 10, "end": 20}}\n{"range": {"end": 20, "start": 10}}\n',
+    }
+    for name, doc_text in docs.items():
+        (tmp_path / name).write_text(doc_text)
+    array_path = tmp_path / "array" / "unsorted.json"
+    array_path.parent.mkdir()
+    array_path.write_text('[{"start": 10, "end": 20}, {"end": 20, "start": 10}]')
+
+    # Act
+    proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--check', *(tmp_path / name for name in docs)],
+        capture_output=True,
+        text=True,
+    )
+    array_proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--check', '--stream-array', array_path],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert proc.returncode == 1
+    assert proc.stderr.splitlines() == [
+        f"{tmp_path / 'unsorted.json'}: object at '/range' is not sorted",
+        f"{tmp_path / 'unsorted.yaml'}: object at '/range' of document 2 is not sorted",
+        f"{tmp_path / 'unsorted.jsonl'}: object at '/range' of record 2 is not sorted",
+    ]
+    assert array_proc.returncode == 1
+    assert array_proc.stderr == f"{array_path}: object at '/1' is not sorted\n"
+    for name, doc_text in docs.items():
+        assert (tmp_path / name).read_text() == doc_text
+
+
+def test_remove_additional_props_cli__check(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    clean_path = tmp_path / "clean.json"
+    clean_path.write_text('{"end": 20, "start": 10}')
+    unclean_path = tmp_path / "unclean.json"
+    unclean_path.write_text('{"end": 20, "start": 10, "foo": 1}')
+
+    # Act
+    proc = subprocess.run(
+        ['jschon-remove-additional-props', '--schema', schema_path, '--check', clean_path, unclean_path],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert proc.returncode == 1
+    assert proc.stderr == f"{unclean_path}: object at '' has additional properties\n"
+    assert unclean_path.read_text() == '{"end": 20, "start": 10, "foo": 1}'
+
+
+def test_remove_additional_props_cli__report(tmp_path: Path) -> None:
+    # Arrange
+    items_schema = {
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema = {"$schema": "https://json-schema.org/draft/2020-12/schema", "type": "array", "items": items_schema}
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    items_schema_path = tmp_path / "items_schema.json"
+    items_schema_path.write_text(
+        json.dumps({"$schema": "https://json-schema.org/draft/2020-12/schema", **items_schema})
+    )
+    json_path = tmp_path / "doc.json"
+    json_path.write_text('[{"start": 10, "foo": {"bar": 1}}, {"end": 20, "baz": null}]')
+    yaml_path = tmp_path / "doc.yaml"
+    yaml_path.write_text('- start: 10\n---\n- end: 20\n  foo: 1\n')
+    clean_path = tmp_path / "clean.json"
+    clean_path.write_text('[{"start": 10}]')
+    stream_path = tmp_path / "stream.json"
+    stream_path.write_text('[{"start": 10}, {"end": 20, "foo": 1}]')
+    jsonl_path = tmp_path / "doc.jsonl"
+    jsonl_path.write_text('{"start": 10}\n{"end": 20, "foo": 1}\n')
+
+    args: List[Union[str, Path]] = ['jschon-remove-additional-props', '--report', '--no-cache', '--jobs', '1']
+
+    # Act
+    output = subprocess.check_output([*args, '--schema', schema_path, json_path, yaml_path, clean_path], text=True)
+    stream_output = subprocess.check_output([*args, '--schema', schema_path, '--stream-array', stream_path], text=True)
+    jsonl_output = subprocess.check_output([*args, '--schema', items_schema_path, jsonl_path], text=True)
+
+    # Assert
+    assert output == (
+        f"{json_path}: 2 additional properties removed: '/0/foo', '/1/baz'\n"
+        f"{yaml_path}: 1 additional properties removed: '/0/foo' of document 2\n"
+    )
+    assert json_path.read_text() == '[\n    {\n        "start": 10\n    },\n    {\n        "end": 20\n    }\n]'
+    assert stream_output == f"{stream_path}: 1 additional properties removed: '/1/foo'\n"
+    assert jsonl_output == f"{jsonl_path}: 1 additional properties removed: '/foo' of record 2\n"
+
+
+@pytest.mark.parametrize('dry_run', (False, True), ids=('wet_run', 'dry_run'))
+def test_sort_cli__unchanged_files(tmp_path: Path, dry_run: bool) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    sorted_path = tmp_path / "sorted.json"
+    sorted_path.write_text('{\n    "start": 10,\n    "end": 20\n}')
+    unsorted_path = tmp_path / "unsorted.json"
+    unsorted_path.write_text('{\n    "end": 20,\n    "start": 10\n}')  # of the same size as once sorted
+    unsorted_path.chmod(0o600)
+    sorted_jsonl_path = tmp_path / "sorted.jsonl"
+    sorted_jsonl_path.write_text('{"start":10,"end":20}\n')
+    unsorted_jsonl_path = tmp_path / "unsorted.jsonl"
+    unsorted_jsonl_path.write_text('{"end":20,"start":10}\n')
+    doc_paths = [sorted_path, unsorted_path, sorted_jsonl_path, unsorted_jsonl_path]
+    for p in doc_paths:
+        os.utime(p, ns=(0, 0))
+    inodes = [p.stat().st_ino for p in doc_paths]
+    args: List[Union[str, Path]] = ['jschon-sort', '--schema', schema_path, '--no-cache', '--jobs', '1', *doc_paths]
+    if dry_run:
+        args.append('--dry-run')
+
+    # Act
+    proc = subprocess.run(args, capture_output=True, text=True)
+
+    # Assert
+    assert proc.returncode == 0
+    if dry_run:
+        assert proc.stderr == '2 files would be changed, 2 unchanged\n'
+        assert [p.stat().st_mtime_ns for p in doc_paths] == [0, 0, 0, 0]
+        assert sorted(tmp_path.iterdir()) == sorted([schema_path, *doc_paths]), "temporary files are removed"
+    else:
+        assert proc.stderr == '2 files changed, 2 unchanged\n'
+        assert [p.stat().st_mtime_ns == 0 for p in doc_paths] == [True, False, True, False]
+        # changed files are replaced (by renaming a temporary file) rather than rewritten
+        assert [p.stat().st_ino == inode for p, inode in zip(doc_paths, inodes)] == [True, False, True, False]
+        assert unsorted_path.read_text() == sorted_path.read_text()
+        assert unsorted_path.stat().st_mode & 0o777 == 0o600
+        assert unsorted_jsonl_path.read_text() == sorted_jsonl_path.read_text()
+
+
+def test_sort_cli__symlinks(tmp_path: Path) -> None:
+    # Arrange
+    schema = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(schema))
+    (tmp_path / "targets").mkdir()
+    (tmp_path / "links").mkdir()
+    target_paths = [tmp_path / "targets" / name for name in ("doc.json", "docs.jsonl", "docs.yaml")]
+    target_paths[0].write_text('{\n    "end": 20,\n    "start": 10\n}')
+    target_paths[1].write_text('{"end": 20, "start": 10}\n')
+    target_paths[2].write_text('end: 20\nstart: 10\n---\nend: 40\nstart: 30\n')
+    link_paths = [tmp_path / "links" / p.name for p in target_paths]
+    for link_path, target_path in zip(link_paths, target_paths):
+        link_path.symlink_to(os.path.relpath(target_path, link_path.parent))
+
+    # Act
+    subprocess.check_call(['jschon-sort', '--schema', schema_path, '--no-cache', '--jobs', '1', *link_paths])
+
+    # Assert
+    # the documents are written through the links, which are kept
+    assert all(p.is_symlink() for p in link_paths)
+    assert [p.read_text() for p in target_paths] == [
+        '{\n    "start": 10,\n    "end": 20\n}',
+        '{"start":10,"end":20}\n',
+        'start: 10\nend: 20\n---\nstart: 30\nend: 40\n',
+    ]
+    assert sorted(p.name for p in (tmp_path / "targets").iterdir()) == ["doc.json", "docs.jsonl", "docs.yaml"]
+    assert sorted(p.name for p in (tmp_path / "links").iterdir()) == ["doc.json", "docs.jsonl", "docs.yaml"]
+
+
+def test_sort_cli__config(tmp_path: Path) -> None:
+    # Arrange
+    SCHEMA_URI = "https://json-schema.org/draft/2020-12/schema"
+    (tmp_path / "schemas").mkdir()
+    (tmp_path / "schemas" / "range.json").write_text(
+        json.dumps(
+            {
+                "$schema": SCHEMA_URI,
+                "type": "object",
+                "properties": {"start": {"type": "number"}, "end": {"type": "number"}},
+            }
+        )
+    )
+    (tmp_path / "schemas" / "person.json").write_text(
+        json.dumps(
+            {
+                "$schema": SCHEMA_URI,
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "age": {"type": "number"}},
+            }
+        )
+    )
+    (tmp_path / ".jschon-sort.toml").write_text(
+        dedent(
+            '''\
+            [schemas]
+            "ranges/**/*.json" = "schemas/range.json"
+            "people/*.yaml" = "schemas/person.json"
+            '''
+        )
+    )
+    (tmp_path / "ranges" / "nested").mkdir(parents=True)
+    range_paths = [tmp_path / "ranges" / "a.json", tmp_path / "ranges" / "nested" / "b.json"]
+    for p in range_paths:
+        p.write_text('{"end": 20, "start": 10}')
+    (tmp_path / "people").mkdir()
+    person_path = tmp_path / "people" / "c.yaml"
+    person_path.write_text('age: 42\nname: Alice\n')
+    other_path = tmp_path / "other.json"
+    other_path.write_text('{"end": 20, "start": 10}')
+    base_args = ['jschon-sort', '--no-cache', '--stats']
+
+    # Act
+    proc = subprocess.run(base_args, capture_output=True, text=True, cwd=tmp_path / "ranges")
+
+    # Assert
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stderr.splitlines()[:2] == ['3 files changed, 0 unchanged', '3 files processed:']
+    for p in range_paths:
+        assert p.read_text().index('start') < p.read_text().index('end')
+    assert person_path.read_text() == 'name: Alice\nage: 42\n'
+    assert other_path.read_text() == '{"end": 20, "start": 10}'
+
+    # Act
+    proc = subprocess.run([*base_args, 'ranges', 'other.json'], capture_output=True, text=True, cwd=tmp_path)
+
+    # Assert
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stderr.splitlines()[:3] == [
+        '1 files skipped, as no schema is associated with them',
+        '0 files changed, 2 unchanged',
+        '2 files processed:',
+    ]
+
+
+def test_sort_cli__config_errors(tmp_path: Path) -> None:
+    # Arrange
+    config_path = tmp_path / "config.toml"
+    config_path.write_text('schemas = "schema.json"\n')
+    invocations: List[List[Union[str, Path]]] = [
+        ['jschon-sort'],
+        ['jschon-sort', '--config', config_path],
+        ['jschon-sort', '--config', tmp_path / "missing.toml"],
+        ['jschon-sort', '--config', config_path, '--schema', 'schema.json', 'doc.json'],
+    ]
+
+    # Act
+    procs = [subprocess.run(args, capture_output=True, text=True, cwd=tmp_path) for args in invocations]
+
+    # Assert
+    assert [proc.returncode for proc in procs] == [2, 2, 2, 2]
+    assert 'the following arguments are required: --schema (unless configured, see --config)' in procs[0].stderr
+    assert '"schemas" must map glob patterns to schema paths' in procs[1].stderr
+    assert 'missing.toml' in procs[2].stderr
+    assert 'argument --schema: not allowed with argument --config' in procs[3].stderr
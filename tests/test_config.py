@@ -0,0 +1,121 @@
+import os
+from pathlib import Path
+from textwrap import dedent
+from unittest import mock
+
+import pytest
+
+from jschon_tools._config import find_config
+from jschon_tools._config import SchemaConfig
+
+
+def test_find_config(tmp_path: Path) -> None:
+    # Arrange
+    nested_dir = tmp_path / "project" / "nested"
+    nested_dir.mkdir(parents=True)
+    (tmp_path / "pyproject.toml").write_text('[tool.jschon-sort.schemas]\n"*.json" = "schema.json"\n')
+    (tmp_path / "project" / "pyproject.toml").write_text('[tool.black]\nline-length = 120\n')
+
+    # Act & Assert
+    assert find_config(str(nested_dir)) == str(tmp_path / "pyproject.toml")
+
+    # Arrange
+    (tmp_path / "project" / ".jschon-sort.toml").write_text('[schemas]\n"*.json" = "schema.json"\n')
+
+    # Act & Assert
+    assert find_config(str(nested_dir)) == str(tmp_path / "project" / ".jschon-sort.toml")
+
+
+@pytest.mark.parametrize(
+    'config',
+    [
+        'schemas = "schema.json"',
+        '[schemas]',
+        '[schemas]\n"*.json" = 1',
+        'invalid',
+    ],
+)
+def test_schema_config_load__invalid(tmp_path: Path, config: str) -> None:
+    # Arrange
+    config_path = tmp_path / ".jschon-sort.toml"
+    config_path.write_text(config)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match=str(config_path)):
+        SchemaConfig.load(str(config_path))
+
+
+def test_schema_config_load__pyproject_without_table(tmp_path: Path) -> None:
+    # Arrange
+    config_path = tmp_path / "pyproject.toml"
+    config_path.write_text('[tool.black]\nline-length = 120\n')
+
+    # Act & Assert
+    with pytest.raises(ValueError, match='"schemas" must map glob patterns to schema paths'):
+        SchemaConfig.load(str(config_path))
+
+
+def test_schema_config_group_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Arrange
+    for path in ("schemas/a.json", "schemas/b.json", "docs/x.json", "docs/nested/y.json", "docs/z.yaml", "other.json"):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text('{}')
+    (tmp_path / "pyproject.toml").write_text(
+        dedent(
+            '''\
+            [tool.jschon-sort.schemas]
+            "docs/x.json" = "schemas/a.json"
+            "**/*.json" = "schemas/b.json"
+            "missing/*.json" = "schemas/a.json"
+            "*.txt" = "schemas/c.json"
+            '''
+        )
+    )
+    config = SchemaConfig.load(str(tmp_path / "pyproject.toml"))
+    monkeypatch.chdir(tmp_path / "docs")
+
+    # Act
+    discovered = config.group_paths()
+    given = config.group_paths(['x.json', 'z.yaml', '../other.json'])
+
+    # Assert
+    # the first matching pattern wins, and the schemas themselves aren't matched
+    assert discovered == (
+        {
+            os.path.join('..', 'schemas', 'a.json'): [os.path.join('..', 'docs', 'x.json')],
+            os.path.join('..', 'schemas', 'b.json'): [
+                os.path.join('..', 'docs', 'nested', 'y.json'),
+                os.path.join('..', 'other.json'),
+            ],
+        },
+        [],
+    )
+    assert given == (
+        {
+            os.path.join('..', 'schemas', 'a.json'): ['x.json'],
+            os.path.join('..', 'schemas', 'b.json'): ['../other.json'],
+        },
+        ['z.yaml'],
+    )
+
+
+@pytest.mark.parametrize('pattern', ['**/*.json', 'docs/*.json', 'docs/**', '*/n?sted/[xy].json', '.hidden/*.json'])
+def test_schema_config_group_paths__given_paths_matched(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, pattern: str
+) -> None:
+    # Arrange
+    paths = ["docs/x.json", "docs/nested/y.json", "docs/.z.json", "docs/.hidden/z.json", ".hidden/z.json", "a.json"]
+    for path in paths:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text('{}')
+    config = SchemaConfig(str(tmp_path), [(pattern, "schema.json")])
+    monkeypatch.chdir(tmp_path)
+    discovered, _ = config.group_paths()
+
+    # Act
+    with mock.patch('glob.glob', side_effect=AssertionError('globbed')):
+        given, unmatched = config.group_paths([*(os.path.normpath(path) for path in sorted(paths)), 'missing.json'])
+
+    # Assert
+    assert given == discovered, "given paths are matched as globbing would find them"
+    assert 'missing.json' in unmatched
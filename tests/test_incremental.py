@@ -0,0 +1,236 @@
+import copy
+import io
+import json
+from typing import Any
+from typing import List
+from typing import Mapping
+
+import jschon
+import pytest
+import ruyaml
+from jschon.json import JSONCompatible
+
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaSorter
+
+
+SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "required": ["name"],
+    "properties": {
+        "name": {"type": "string"},
+        "ranges": {"type": "array", "items": {"$ref": "#/$defs/range"}},
+        "pair": {"type": "array", "prefixItems": [{"$ref": "#/$defs/range"}], "items": False},
+        "meta": {"allOf": [{"type": "object", "properties": {"x": True, "y": True}}]},
+    },
+    "$defs": {
+        "range": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+        },
+    },
+}
+
+DOC: Mapping[str, JSONCompatible] = {
+    "name": "name",
+    "ranges": [{"start": 10, "end": 20}, {"start": 30, "end": 40}, {"start": 50, "end": 60}],
+    "pair": [{"start": 1, "end": 2}],
+    "meta": {"x": 1, "y": 2},
+}
+
+PATCH: List[Mapping[str, JSONCompatible]] = [
+    {"op": "test", "path": "/name", "value": "name"},
+    {"op": "replace", "path": "/ranges/2", "value": {"end": 6, "start": 5}},
+    {"op": "add", "path": "/ranges/0", "value": {"end": 2, "extra": None, "start": 1}},
+    {"op": "remove", "path": "/ranges/1"},
+    {"op": "move", "from": "/ranges/0", "path": "/ranges/-"},
+    {"op": "copy", "from": "/pair/0", "path": "/ranges/0"},
+    {"op": "add", "path": "/meta/z", "value": {"b": 1, "a": 2}},
+    {"op": "add", "path": "/meta/y", "value": 3},
+    {"op": "add", "path": "/pair/0/end", "value": 3},
+    {"op": "add", "path": "/pair/0/extra", "value": 4},
+    {"op": "add", "path": "/ranges", "value": []},
+    {"op": "add", "path": "/ranges/0", "value": {"end": 2, "start": 1}},
+    {"op": "add", "path": "/ranges/1", "value": {"end": 4, "start": 3}},
+    {"op": "remove", "path": "/ranges/0"},
+]
+
+
+@pytest.mark.parametrize('in_place', [False, True])
+@pytest.mark.parametrize('validate', [True, False])
+def test_process_patch(validate: bool, in_place: bool) -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    for sort, remove_additional_props in [(True, False), (False, True), (True, True)]:
+        for patch_len in range(1, len(PATCH) + 1):
+            doc = copy.deepcopy(DOC)
+            patch = PATCH[:patch_len]
+            expected_doc = sorter.process(
+                jschon.JSONPatch(*patch).evaluate(copy.deepcopy(DOC)),
+                sort=sort,
+                remove_additional_props=remove_additional_props,
+                validate=validate,
+            )
+
+            # Act
+            processed_doc = sorter.process_patch(
+                doc,
+                patch,
+                sort=sort,
+                remove_additional_props=remove_additional_props,
+                validate=validate,
+                in_place=in_place,
+            )
+
+            # Assert
+            assert json.dumps(processed_doc) == json.dumps(expected_doc), patch[-1]
+            if in_place:
+                assert processed_doc is doc
+            else:
+                assert json.dumps(doc) == json.dumps(DOC)
+
+
+def test_process_patch__shares_unchanged() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+    doc: Any = copy.deepcopy(DOC)
+
+    # Act
+    processed_doc: Any = sorter.process_patch(doc, [{"op": "replace", "path": "/ranges/1/end", "value": 41}], sort=True)
+
+    # Assert
+    assert json.dumps(processed_doc["ranges"]) == json.dumps(
+        [{"start": 10, "end": 20}, {"start": 30, "end": 41}, {"start": 50, "end": 60}]
+    )
+    # only the objects and arrays along the changed location are copied
+    assert processed_doc["ranges"] is not doc["ranges"]
+    assert processed_doc["ranges"][0] is doc["ranges"][0]
+    assert processed_doc["pair"] is doc["pair"]
+    assert json.dumps(doc) == json.dumps(DOC)
+
+
+@pytest.mark.parametrize('validate', [True, False])
+def test_process_patch__proportional_to_change(validate: bool) -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+    doc = {"name": "name", "ranges": [{"start": idx, "end": idx + 1} for idx in range(1000)]}
+    stats = ProcessingStats()
+
+    # Act
+    processed_doc: Any = sorter.process_patch(
+        doc,
+        [{"op": "add", "path": "/ranges/500", "value": {"end": 2, "start": 1}}],
+        sort=True,
+        validate=validate,
+        in_place=True,
+        stats=stats,
+    )
+
+    # Assert
+    assert json.dumps(processed_doc["ranges"][500]) == json.dumps({"start": 1, "end": 2})
+    assert stats.documents == 1
+    # the added object and its values, and the array's length
+    assert stats.doc_nodes_visited == 4
+    assert stats.result_nodes == (8 if validate else 0)
+
+
+def test_process_patch__yaml() -> None:
+    # Arrange
+    yaml = ruyaml.YAML()
+    doc = yaml.load('name: name  # the name\nranges:\n- start: 10\n  end: 20  # first\n- start: 30\n  end: 40\n')
+
+    # Act
+    processed_doc = SchemaSorter(SCHEMA).process_patch(
+        doc, [{"op": "replace", "path": "/ranges/1", "value": {"end": 4, "start": 3}}], sort=True, in_place=True
+    )
+
+    # Assert
+    f = io.StringIO()
+    yaml.dump(processed_doc, f)
+    assert f.getvalue() == 'name: name  # the name\nranges:\n- start: 10\n  end: 20  # first\n- start: 3\n  end: 4\n'
+
+
+def test_process_patch__invalid() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    invalid_patches: List[List[Mapping[str, JSONCompatible]]] = [
+        [{"op": "remove", "path": "/nonexistent"}],
+        [{"op": "test", "path": "/name", "value": "other"}],
+        [{"op": "replace", "path": "/ranges/3", "value": {}}],
+        [{"op": "add", "path": "/ranges/0"}],
+        [{"op": "rename", "path": "/name"}],
+        [{"op": "add", "path": "name", "value": 1}],
+        [{"op": "add", "path": "/nonexistent/name", "value": 1}],
+        [{"op": "add", "path": "/name/0", "value": 1}],
+    ]
+    invalid_doc_patches: List[List[Mapping[str, JSONCompatible]]] = [
+        [{"op": "remove", "path": "/name"}],
+        [{"op": "replace", "path": "/ranges/0/end", "value": "20"}],
+        [{"op": "add", "path": "/pair/-", "value": {}}],
+        [{"op": "replace", "path": "", "value": []}],
+        [{"op": "remove", "path": ""}],
+    ]
+
+    # Act & Assert
+    for patch in invalid_patches:
+        with pytest.raises(ValueError, match='Failed to apply JSON Patch'):
+            sorter.process_patch(copy.deepcopy(DOC), patch, sort=True)
+    for patch in invalid_doc_patches:
+        with pytest.raises(ValueError, match='Document failed schema validation'):
+            sorter.process_patch(copy.deepcopy(DOC), patch, sort=True)
+
+
+def test_process_patch__free_form_object() -> None:
+    # Arrange
+    sorter = SchemaSorter(
+        {
+            "$schema": "https://json-schema.org/draft/2020-12/schema",
+            "type": "object",
+            "properties": {"free": {"type": "object"}},
+        }
+    )
+
+    # Act
+    processed_doc = sorter.process_patch({"free": {"k": 1}}, [{"op": "remove", "path": "/free/k"}], sort=True)
+
+    # Assert
+    assert json.dumps(processed_doc) == json.dumps({"free": {}})
+
+
+def test_process_changed() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+    doc: Any = copy.deepcopy(DOC)
+    doc["ranges"][1] = {"end": 4, "extra": None, "start": 3}
+    doc["meta"]["z"] = {"b": 1, "a": 2}
+    del doc["pair"]
+    doc["pair"] = [{"end": 2, "start": 1}]
+
+    # Act
+    processed_doc = sorter.process_changed(
+        doc, ["/ranges/1", jschon.JSONPointer("/meta/z"), "/pair", "/nonexistent/0"], sort=True
+    )
+
+    # Assert
+    assert json.dumps(processed_doc) == json.dumps(
+        {
+            "name": "name",
+            "ranges": [{"start": 10, "end": 20}, {"start": 3, "end": 4, "extra": None}, {"start": 50, "end": 60}],
+            # the root is the parent of a changed value, so it's re-sorted
+            "pair": [{"start": 1, "end": 2}],
+            # "meta" is processed whole, since its properties aren't mapped to subschemas statically
+            "meta": {"x": 1, "y": 2, "z": {"a": 2, "b": 1}},
+        }
+    )
+    # the whole document changed
+    assert json.dumps(sorter.process_changed({"pair": [], "name": "name"}, [''], sort=True)) == json.dumps(
+        {"name": "name", "pair": []}
+    )
+    with pytest.raises(ValueError, match="Invalid JSON pointer 'ranges'"):
+        sorter.process_changed(doc, ['ranges'], sort=True)
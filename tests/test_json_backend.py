@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from jschon_tools._json_backend import get_json_backend
+
+
+@pytest.mark.parametrize('indent', (0, 2, 4))
+@pytest.mark.parametrize(
+    'doc_text',
+    [
+        '{"range": {"start": 10, "end": 20, "zero": null, "empty": {}, "items": [true, false, []]}}',
+        '"value"',
+        '[0.1, -0.0, 1.5, 123456789.25, 0.0001]',
+        '[1e16, 1e-7, 0.00001, 2.5e-300, 1.7976931348623157e308]',
+        '[18446744073709551615, -9223372036854775808, 18446744073709551616, -9223372036854775809]',
+        '[NaN, Infinity, -Infinity, 1e400]',
+        '{"caf\\u00e9": "na\\u00efve \\ud83d\\ude00 \\u2028 \\u007f \\u001f \\b\\f\\n\\r\\t \\"\\\\ </"}',
+        '{"versions": ["1e5", "0.00001", "a1e5\\n"]}',
+    ],
+)
+def test_json_backend__orjson(tmp_path: Path, doc_text: str, indent: int) -> None:
+    # Arrange
+    doc_path = tmp_path / 'doc.json'
+    doc_path.write_text(doc_text)
+    backend = get_json_backend('json')
+    orjson_backend = get_json_backend('orjson')
+
+    # Act
+    doc_data = backend.load(str(doc_path))
+    orjson_doc_data = orjson_backend.load(str(doc_path))
+    dumped = backend.dumps(doc_data, indent=indent)
+    orjson_dumped = orjson_backend.dumps(orjson_doc_data, indent=indent)
+
+    # Assert
+    assert repr(orjson_doc_data) == repr(doc_data)
+    assert orjson_dumped == dumped
+
+
+def test_json_backend__orjson__invalid(tmp_path: Path) -> None:
+    # Arrange
+    doc_path = tmp_path / 'doc.json'
+    doc_path.write_text('{"range": ')
+
+    # Act & Assert
+    with pytest.raises(ValueError, match='Expecting value: line 1 column 11'):
+        get_json_backend('orjson').load(str(doc_path))
+
+
+def test_json_backend__orjson__not_installed() -> None:
+    with mock.patch.dict(sys.modules, {'orjson': None}):
+        with pytest.raises(ValueError, match='orjson is not installed'):
+            get_json_backend('orjson')
@@ -0,0 +1,173 @@
+import copy
+import json
+from typing import Any
+from typing import Mapping
+
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import process_json_doc
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaSorter
+from jschon_tools._parallel import _init_worker
+from jschon_tools._parallel import _process_subtree
+from jschon_tools._parallel import split_doc
+
+
+SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "required": ["ranges"],
+    "properties": {
+        "name": {"type": "string"},
+        "ranges": {"type": "array", "items": {"$ref": "#/$defs/range"}},
+        "pair": {"type": "array", "prefixItems": [{"$ref": "#/$defs/range"}], "items": False},
+        "any": True,
+    },
+    "additionalProperties": False,
+    "$defs": {
+        "range": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+        },
+    },
+}
+
+DOC: Mapping[str, JSONCompatible] = {
+    "pair": [{"end": 2, "start": 1}],
+    "ranges": [{"end": 20, "extra": None, "start": 10}, {"end": 40, "start": 30}, {}],
+    "name": "name",
+    "any": [{"b": 1, "a": 2}],
+}
+
+
+@pytest.mark.parametrize('in_place', [False, True])
+@pytest.mark.parametrize('validate', [True, False])
+def test_parallel(validate: bool, in_place: bool) -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    for sort, remove_additional_props in [(True, False), (False, True), (True, True)]:
+        doc = copy.deepcopy(DOC)
+        stats = ProcessingStats()
+
+        # Act
+        processed_doc = sorter.process(
+            doc,
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=in_place,
+            stats=stats,
+            jobs=2,
+        )
+
+        # Assert
+        assert json.dumps(processed_doc) == json.dumps(
+            sorter.process(DOC, sort=sort, remove_additional_props=remove_additional_props, validate=validate)
+        )
+        assert (processed_doc is doc) == in_place
+        assert stats.documents == 1
+        assert stats.keys_removed == (3 if remove_additional_props else 0)
+    assert process_json_doc(doc_data=DOC, schema_data=SCHEMA, sort=True, validate=validate, jobs=2) == sorter.sort(
+        DOC, validate=validate
+    )
+
+
+def test_parallel__split_doc() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act
+    doc_split = split_doc(sorter.root_schema, DOC)
+    shallow_doc_split = split_doc(sorter.root_schema, DOC, max_depth=1)
+
+    # Assert
+    assert doc_split is not None
+    assert [relpath for relpath, _ in doc_split[1]] == [
+        '/properties/pair/prefixItems/0',
+        '/properties/ranges/items',
+        '/properties/ranges/items',
+        '/properties/ranges/items',
+        '/properties/name',
+        '/properties/any',
+    ]
+    assert shallow_doc_split is not None
+    assert [relpath for relpath, _ in shallow_doc_split[1]] == [
+        '/properties/pair',
+        '/properties/ranges',
+        '/properties/name',
+        '/properties/any',
+    ]
+
+
+@pytest.mark.parametrize(
+    'schema, doc',
+    [
+        pytest.param({**SCHEMA, "allOf": [{"required": ["name"]}]}, DOC, id='in_place_applicator'),
+        pytest.param({**SCHEMA, "additionalProperties": True}, {**DOC, "extra": None}, id='additional_property'),
+        pytest.param({**SCHEMA, "additionalProperties": {}}, DOC, id='additional_properties_schema'),
+        pytest.param({**SCHEMA, "type": "array"}, [], id='empty'),
+        pytest.param({**SCHEMA, "type": "array"}, [DOC], id='no_items'),
+    ],
+)
+def test_parallel__not_split(schema: Mapping[str, JSONCompatible], doc: JSONCompatible) -> None:
+    # Arrange
+    sorter = SchemaSorter(schema)
+
+    # Act
+    processed_doc = sorter.process(doc, sort=True, validate=False, jobs=2)
+
+    # Assert
+    assert split_doc(sorter.root_schema, doc) is None
+    assert json.dumps(processed_doc) == json.dumps(sorter.process(doc, sort=True, validate=False))
+
+
+@pytest.mark.parametrize(
+    'doc',
+    [
+        pytest.param({"name": "name"}, id='skeleton'),
+        pytest.param({**DOC, "name": 1}, id='subtree'),
+        pytest.param({**DOC, "pair": [{}, {}]}, id='subtree_false'),
+    ],
+)
+def test_parallel__failed(doc: JSONCompatible) -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match='Document failed schema validation'):
+        sorter.process(doc, sort=True, jobs=2)
+
+
+def test_parallel__jschon_schema() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA).get_subschema_sorter('/$defs/range')
+
+    # Act & Assert
+    with pytest.raises(ValueError, match='Processing in parallel requires the schema data'):
+        sorter.process({"end": 20, "start": 10}, sort=True, jobs=2)
+
+
+def test_parallel__worker() -> None:
+    # Arrange
+    options: Mapping[str, Any] = {'sort': True, 'remove_additional_props': False, 'validate': True}
+
+    for collect_stats in (True, False):
+        _init_worker(SCHEMA, None, {**options, 'stats': collect_stats})
+
+        # Act
+        results = [_process_subtree(('/$defs/range', {"end": 20, "start": 10})) for _ in range(2)]
+
+        # Assert
+        for processed_value, stats in results:
+            assert json.dumps(processed_value) == json.dumps({"start": 10, "end": 20})
+            if collect_stats:
+                assert stats is not None
+                assert stats.documents == 0  # the subtrees are parts of a single document
+                assert stats.doc_nodes_visited == 3
+            else:
+                assert stats is None
@@ -1,9 +1,14 @@
 import json
+from typing import List
 from typing import Mapping
 
+import jschon
+import pytest
 from jschon.json import JSONCompatible
 
 from jschon_tools import process_json_doc
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaSorter
 
 
 SCHEMA: Mapping[str, JSONCompatible] = {
@@ -41,3 +46,71 @@ def test_remove_additional_properties_from_json_doc() -> None:
     assert actual is not doc
     assert json.dumps(doc) == doc_str, "ensure doc is not modified in place"
     assert json.dumps(actual) == '{"test": [{"AAA": 1, "BBB": 2, "known": 3}]}'
+
+
+def test_remove_additional_properties_from_json_doc__in_place() -> None:
+    # Arrange
+    doc = json.loads('{"test": [{"AAA": 1, "BBB": 2, "known": 3, "unknown": 4}, {"known": 5}]}')
+    items = doc['test']
+
+    # Act
+    actual = process_json_doc(doc_data=doc, schema_data=SCHEMA, remove_additional_props=True, in_place=True)
+
+    # Assert
+    assert actual is doc
+    assert actual['test'] is items
+    assert json.dumps(doc) == '{"test": [{"AAA": 1, "BBB": 2, "known": 3}, {"known": 5}]}'
+
+
+def test_check_additional_properties() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act & Assert
+    assert sorter.check(json.loads('{"test": [{"known": 3, "AAA": 1}]}'), remove_additional_props=True) is None
+    assert sorter.check(
+        json.loads('{"test": [{"known": 3}, {"AAA": 1, "unknown": 4}]}'), remove_additional_props=True
+    ) == jschon.JSONPointer('/test/1')
+    assert sorter.check(json.loads('{"test": [], "unknown": 4}'), remove_additional_props=True) == jschon.JSONPointer()
+
+
+@pytest.mark.parametrize('validate', (True, False), ids=('validate', 'no_validate'))
+def test_remove_additional_properties__removed(validate: bool) -> None:
+    # Arrange
+    doc_str = (
+        '{"test": [{"unknown": {"nested": [1, 2]}, "known": 3}, {"BBB": 2, "unknown": 4, "AAA": 1}], "extra": [{}]}'
+    )
+    sorter = SchemaSorter(SCHEMA)
+    removed: List[jschon.JSONPointer] = []
+    sorted_removed: List[jschon.JSONPointer] = []
+    stats = ProcessingStats()
+
+    # Act
+    actual = sorter.remove_additional_props(json.loads(doc_str), validate=validate, removed=removed, stats=stats)
+    sorted_actual = sorter.process(
+        json.loads(doc_str), sort=True, remove_additional_props=True, validate=validate, removed=sorted_removed
+    )
+
+    # Assert
+    assert json.dumps(actual) == '{"test": [{"known": 3}, {"BBB": 2, "AAA": 1}]}'
+    assert json.dumps(sorted_actual) == '{"test": [{"known": 3}, {"BBB": 2, "AAA": 1}]}'
+    assert [str(ptr) for ptr in removed] == ['/extra', '/test/0/unknown', '/test/1/unknown']
+    assert sorted(str(ptr) for ptr in sorted_removed) == ['/extra', '/test/0/unknown', '/test/1/unknown']
+    assert stats.keys_removed == 3
+    assert stats.doc_nodes_visited == 7, "the values of removed properties aren't visited"
+    assert stats.schema_nodes_keyed == (0 if validate else 7)
+    assert sorter.remove_additional_props(None, validate=False) is None
+
+
+def test_remove_additional_properties__removed__jobs() -> None:
+    # Arrange
+    removed: List[jschon.JSONPointer] = []
+
+    # Act
+    actual = SchemaSorter(SCHEMA).process(
+        json.loads('{"test": [{"known": 3, "unknown": 4}]}'), remove_additional_props=True, jobs=2, removed=removed
+    )
+
+    # Assert
+    assert json.dumps(actual) == '{"test": [{"known": 3}]}'
+    assert [str(ptr) for ptr in removed] == ['/test/0/unknown'], "the document is processed whole"
@@ -0,0 +1,154 @@
+import json
+from typing import List
+from typing import Mapping
+
+import jschon
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import get_schema_cache
+from jschon_tools import process_json_doc
+from jschon_tools import process_json_stream
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaCache
+from jschon_tools import SchemaSorter
+from jschon_tools._jschon_compat import get_document_root
+
+
+def _make_schema(idx: int) -> Mapping[str, JSONCompatible]:
+    return {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "$id": f"https://example.com/cached/{idx}",
+        "type": "object",
+        "properties": {
+            "start": {"type": "number"},
+            "end": {"type": "number"},
+        },
+    }
+
+
+def _is_in_catalog(sorter: SchemaSorter) -> bool:
+    return any(
+        get_document_root(schema) is sorter._root_schema
+        for cached_schemas in jschon.Catalog.get_catalog()._schema_cache.values()
+        for schema in cached_schemas.values()
+    )
+
+
+def test_schema_cache__hits() -> None:
+    # Arrange
+    cache = SchemaCache()
+
+    # Act
+    sorter = cache.get_sorter(_make_schema(0))
+    same_sorter = cache.get_sorter(json.loads(json.dumps(_make_schema(0))))
+    other_sorter = cache.get_sorter(_make_schema(1))
+
+    # Assert
+    assert same_sorter is sorter
+    assert other_sorter is not sorter
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (1, 2, 0, 2)
+
+
+def test_schema_cache__modified_schema() -> None:
+    # Arrange
+    cache = SchemaCache()
+    schema = dict(_make_schema(0))
+    sorter = cache.get_sorter(schema)
+
+    # Act
+    schema["properties"] = {"end": {"type": "number"}, "start": {"type": "number"}}
+    modified_sorter = cache.get_sorter(schema)
+
+    # Assert
+    assert modified_sorter is not sorter
+    assert sorter._schema_data == _make_schema(0), "a cached sorter keeps its own copy of the schema"
+    assert json.dumps(sorter.sort({"end": 20, "start": 10})) == '{"start": 10, "end": 20}'
+    assert json.dumps(modified_sorter.sort({"start": 10, "end": 20})) == '{"end": 20, "start": 10}'
+    assert cache.get_sorter(_make_schema(0)) is sorter
+
+
+@pytest.mark.parametrize('max_entries, max_bytes', [(2, None), (None, 1)], ids=('max_entries', 'max_bytes'))
+def test_schema_cache__eviction(max_entries: int, max_bytes: int) -> None:
+    # Arrange
+    cache = SchemaCache(max_entries=max_entries, max_bytes=max_bytes)
+    cache.get_sorter(_make_schema(1))
+    first_sorter = cache.get_sorter(_make_schema(0))
+    first_sorter.sort({"end": 20, "start": 10})
+    assert _is_in_catalog(first_sorter)
+
+    # Act
+    cache.get_sorter(_make_schema(1))  # the first schema becomes the least recently used
+    cache.get_sorter(_make_schema(2))
+
+    # Assert
+    assert cache.evictions == (1 if max_entries else 3)
+    assert len(cache) == (2 if max_entries else 1)
+    assert not _is_in_catalog(first_sorter)
+
+
+def test_schema_cache__configure() -> None:
+    # Arrange
+    cache = SchemaCache(max_entries=None)
+    sorters = [cache.get_sorter(_make_schema(idx)) for idx in range(3)]
+    cache.get_sorter(_make_schema(0))
+
+    # Act
+    cache.configure(max_entries=1, max_bytes=None)
+
+    # Assert
+    assert len(cache) == 1
+    assert cache.get_sorter(_make_schema(0)) is sorters[0]
+    assert cache.evictions == 2
+
+    # Act
+    cache.clear()
+
+    # Assert
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+def test_schema_cache__replaced_id() -> None:
+    # Arrange
+    cache = SchemaCache(max_entries=2)
+    schema = _make_schema(0)
+    replacing_schema = {**schema, "properties": {"end": {"type": "number"}, "start": {"type": "number"}}}
+    sorter = cache.get_sorter(schema)
+    sorter.sort({})
+    replacing_sorter = cache.get_sorter(replacing_schema)
+    replacing_sorter.sort({})  # replaces the first schema's URI in the catalog
+
+    # Act
+    cache.get_sorter(_make_schema(1))
+
+    # Assert
+    assert not _is_in_catalog(sorter)
+    assert _is_in_catalog(replacing_sorter)
+    assert json.dumps(replacing_sorter.sort({"start": 10, "end": 20})) == '{"end": 20, "start": 10}'
+
+
+def test_process_json_doc__cached() -> None:
+    # Arrange
+    schema = _make_schema(100)
+    hook_stats: List[ProcessingStats] = []
+    stats = ProcessingStats()
+    cache = get_schema_cache()
+    hits = cache.hits
+
+    # Act
+    sorted_docs = [
+        process_json_doc(
+            doc_data={"end": 20, "start": 10}, schema_data=schema, sort=True, stats_hook=hook_stats.append
+        ),
+        *process_json_stream(
+            docs=[{"end": 20, "start": 10}], schema_data=schema, sort=True, stats=stats, stats_hook=hook_stats.append
+        ),
+    ]
+
+    # Assert
+    assert json.dumps(sorted_docs) == '[{"start": 10, "end": 20}, {"start": 10, "end": 20}]'
+    assert cache.hits == hits + 1
+    assert [s.documents for s in hook_stats] == [1, 1]
+    assert stats.documents == 1
+    assert cache.get_sorter(schema)._stats_hook is None
@@ -0,0 +1,46 @@
+import jschon
+import pytest
+
+from jschon_tools._main import _SchemaSortKeys
+from jschon_tools._structural import END_SORT_KEY
+from jschon_tools._structural import get_child_sort_key
+
+
+def test_schema_sort_keys() -> None:
+    # Arrange
+    schema = jschon.JSONSchema(
+        {
+            "$schema": "https://json-schema.org/draft/2020-12/schema",
+            "type": "object",
+            "properties": {
+                "color": {"enum": [f"color{i}" for i in range(1000)]},
+                "range": {"type": "array", "prefixItems": [{"type": "number"}, {"type": "number"}]},
+            },
+            "examples": [{"color": f"color{i}"} for i in range(1000)],
+        }
+    )
+
+    # Act
+    sort_keys = _SchemaSortKeys(schema)
+
+    # Assert
+    assert sort_keys[jschon.JSONPointer()] == 0
+    assert sort_keys[jschon.JSONPointer('/properties/range')] == get_child_sort_key(get_child_sort_key(0, 0, 2), 1, 1)
+    assert (
+        sort_keys[jschon.JSONPointer()]
+        < sort_keys[jschon.JSONPointer('/type')]
+        < sort_keys[jschon.JSONPointer('/properties')]
+        < sort_keys[jschon.JSONPointer('/properties/color')]
+        < sort_keys[jschon.JSONPointer('/properties/range')]
+        < sort_keys[jschon.JSONPointer('/examples')]
+        < END_SORT_KEY
+    ), "sort keys order like the positions of the nodes"
+    assert len(sort_keys._entries) == 6, "only requested nodes and their ancestors are visited"
+
+
+def test_get_child_sort_key__limits() -> None:
+    with pytest.raises(ValueError, match='depth'):
+        get_child_sort_key(get_child_sort_key(get_child_sort_key(0, 0, 1), 1, 1), 2, 1)
+    with pytest.raises(ValueError, match='indices'):
+        get_child_sort_key(0, 0, 1 << 32)
+    assert get_child_sort_key(get_child_sort_key(0, 0, (1 << 32) - 2), 1, (1 << 32) - 2) < END_SORT_KEY
@@ -0,0 +1,115 @@
+import json
+from typing import List
+from typing import Mapping
+from unittest import mock
+
+import jschon
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import process_json_doc
+from jschon_tools import process_json_stream
+from jschon_tools import SchemaSorter
+
+
+SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "range": {"$ref": "#/$defs/range"},
+    },
+    "$defs": {
+        "range": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+        },
+    },
+}
+
+
+def test_schema_sorter__reused() -> None:
+    # Arrange
+    docs: List[JSONCompatible] = [
+        {"range": {"end": 20, "start": 10}},
+        {"range": {"end": 40, "start": 30, "extra": None}},
+        {"range": {"start": 50}},
+    ]
+
+    # Act
+    with mock.patch.object(jschon, 'JSONSchema', wraps=jschon.JSONSchema) as json_schema_mock:
+        sorter = SchemaSorter(SCHEMA)
+        sorted_docs = [sorter.sort(doc) for doc in docs]
+        cleaned_docs = [sorter.remove_additional_props(doc) for doc in docs]
+
+    # Assert
+    assert json_schema_mock.call_count == 1
+    assert json.dumps(sorted_docs) == json.dumps(
+        [
+            {"range": {"start": 10, "end": 20}},
+            {"range": {"start": 30, "end": 40, "extra": None}},
+            {"range": {"start": 50}},
+        ]
+    )
+    assert json.dumps(cleaned_docs) == json.dumps(
+        [
+            {"range": {"end": 20, "start": 10}},
+            {"range": {"end": 40, "start": 30}},
+            {"range": {"start": 50}},
+        ]
+    )
+    for doc in docs:
+        assert process_json_doc(doc_data=doc, schema_data=SCHEMA, sort=True) == sorter.sort(doc)
+
+
+def test_schema_sorter__failed() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match='Document failed schema validation'):
+        sorter.sort({"range": {"start": "10"}})
+    assert sorter.sort({"range": {"end": 1, "start": 0}}) == {"range": {"start": 0, "end": 1}}
+
+
+def test_schema_sorter__draft_fallback() -> None:
+    # Arrange
+    sorter = SchemaSorter({**SCHEMA, "$schema": "https://json-schema.org/draft-07/schema"})
+
+    # Act
+    actual = sorter.sort({"range": {"end": 20, "start": 10}})
+
+    # Assert
+    assert json.dumps(actual) == '{"range": {"start": 10, "end": 20}}'
+
+
+def test_process_json_stream() -> None:
+    # Arrange
+    docs = [{"range": {"end": 20, "start": 10}}, {"range": {"end": 40, "start": 30}}]
+
+    # Act
+    actual = process_json_stream(docs=iter(docs), schema_data=SCHEMA, sort=True)
+    actual_by_sorter = SchemaSorter(SCHEMA).process_stream(iter(docs), sort=True)
+
+    # Assert
+    for processed_docs in (actual, actual_by_sorter):
+        assert next(processed_docs) == {"range": {"start": 10, "end": 20}}
+        assert next(processed_docs) == {"range": {"start": 30, "end": 40}}
+        assert next(processed_docs, None) is None
+
+
+def test_schema_sorter__subschema() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act
+    range_sorter = sorter.get_subschema_sorter('/$defs/range')
+
+    # Assert
+    assert json.dumps(range_sorter.sort({"end": 20, "start": 10})) == '{"start": 10, "end": 20}'
+    with pytest.raises(ValueError, match="Schema has no subschema at '/items'"):
+        sorter.get_subschema_sorter('/items')
+    with pytest.raises(ValueError, match="Schema has no subschema at '/type'"):
+        sorter.get_subschema_sorter('/type')
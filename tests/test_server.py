@@ -0,0 +1,280 @@
+import io
+import json
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from textwrap import dedent
+from typing import Any
+from typing import Iterator
+from typing import List
+
+import pytest
+
+from jschon_tools._server import call
+from jschon_tools._server import RemoteError
+from jschon_tools._server import serve_stream
+from jschon_tools._server import serve_unix_socket
+
+
+SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "start": {"type": "number"},
+        "end": {"type": "number"},
+    },
+}
+
+
+@pytest.fixture
+def schema_path(tmp_path: Path) -> Path:
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(SCHEMA))
+    return schema_path
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path, schema_path: Path) -> Iterator[Path]:
+    socket_path = tmp_path / "server.sock"
+    server = subprocess.Popen(['jschon-sort', '--serve', '--socket', socket_path])
+    try:
+        for _ in range(100):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                try:
+                    sock.connect(str(socket_path))
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        yield socket_path
+    finally:
+        server.terminate()
+        server.wait()
+    assert not socket_path.exists(), "socket is removed upon termination"
+
+
+def _serve(requests: List[Any]) -> List[Any]:
+    f_in = io.StringIO(''.join((r if isinstance(r, str) else json.dumps(r)) + '\n' for r in requests))
+    f_out = io.StringIO()
+    serve_stream(
+        f_in,
+        f_out,
+        {'echo': lambda params: params['value'], 'fail': lambda params: int('x'), 'crash': lambda params: 1 / 0},
+    )
+    return [json.loads(line) for line in f_out.getvalue().splitlines()]
+
+
+def test_serve_stream() -> None:
+    # Act
+    responses = _serve(
+        [
+            {"jsonrpc": "2.0", "id": 1, "method": "echo", "params": {"value": [1, 2]}},
+            {"jsonrpc": "2.0", "method": "echo", "params": {"value": "notification"}},
+            '',
+            '{"jsonrpc": ',
+            [],
+            {"jsonrpc": "2.0", "id": 2, "method": "missing"},
+            {"jsonrpc": "2.0", "id": 3, "method": "echo", "params": []},
+            {"jsonrpc": "2.0", "id": 4, "method": "echo", "params": {}},
+            {"jsonrpc": "2.0", "id": 5, "method": "fail"},
+            {"jsonrpc": "2.0", "id": 6, "method": "crash"},
+            {"jsonrpc": "2.0", "id": 7, "method": "echo", "params": {"value": "still serving"}},
+        ]
+    )
+
+    # Assert
+    assert [(r['id'], r.get('result'), r.get('error', {}).get('code')) for r in responses] == [
+        (1, [1, 2], None),
+        (None, None, -32700),
+        (None, None, -32600),
+        (2, None, -32601),
+        (3, None, -32602),
+        (4, None, -32602),
+        (5, None, -32000),
+        (6, None, -32603),
+        (7, "still serving", None),
+    ]
+
+
+def test_serve__stdio(tmp_path: Path, schema_path: Path) -> None:
+    # Arrange
+    def _request(request_id: int, method: str, **params: Any) -> str:
+        return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}) + '\n'
+
+    doc = {"end": 20, "start": 10, "extra": None}
+    (tmp_path / "invalid_schema.json").write_text(json.dumps({"type": "object"}))
+
+    # Act
+    server = subprocess.Popen(
+        ['jschon-sort', '--serve'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=tmp_path
+    )
+    assert server.stdin is not None and server.stdout is not None
+    server.stdin.write(_request(1, 'sort', schema='schema.json', doc=doc))
+    server.stdin.write(_request(2, 'check', schema='schema.json', doc=doc))
+    server.stdin.write(_request(3, 'check', schema='schema.json', doc=doc, sort=False, remove_additional_props=True))
+    server.stdin.write(_request(4, 'remove_additional_props', schema='schema.json', doc=doc, validate=False))
+    server.stdin.write(_request(5, 'sort', schema='schema.json', doc={"start": "10"}))
+    server.stdin.write(_request(6, 'sort', schema='missing.json', doc={}))
+    server.stdin.write(_request(7, 'sort', schema='invalid_schema.json', doc={}))
+    server.stdin.write(_request(8, 'sort', schema='schema.json', doc=doc))
+    server.stdin.flush()
+    responses = [json.loads(server.stdout.readline()) for _ in range(8)]
+
+    # the schema is reloaded once its file changes
+    schema_path.write_text(json.dumps({**SCHEMA, "properties": {"end": True, "start": True}}))
+    server.stdin.write(_request(9, 'sort', schema='schema.json', doc=doc))
+    server.stdin.close()
+    responses.append(json.loads(server.stdout.readline()))
+    server.wait()
+
+    # Assert
+    assert [json.dumps(r.get('result', r.get('error'))) for r in responses] == [
+        '{"start": 10, "end": 20, "extra": null}',
+        '""',
+        '""',
+        '{"end": 20, "start": 10}',
+        '{"code": -32000, "message": "Document failed schema validation"}',
+        json.dumps({"code": -32000, "message": "[Errno 2] No such file or directory: 'missing.json'"}),
+        json.dumps(
+            {
+                "code": -32603,
+                "message": 'Internal error: JSONSchemaError("The schema\'s metaschema URI has not been set")',
+            }
+        ),
+        '{"start": 10, "end": 20, "extra": null}',
+        '{"end": 20, "start": 10, "extra": null}',
+    ]
+
+
+def test_serve__socket(tmp_path: Path, schema_path: Path, socket_path: Path) -> None:
+    # Arrange
+    doc_path = tmp_path / "doc.json"
+    doc_path.write_text('{"end": 20, "start": 10}')
+    # processed in a different directory than the server's, without importing jschon
+    client_code = dedent(
+        f'''
+        import os
+        import sys
+        from jschon_tools.cli import sort_main
+        os.chdir({str(tmp_path)!r})
+        sys.argv = ['jschon-sort', '--schema', 'schema.json', '--socket', {str(socket_path)!r}, '--stats', 'doc.json']
+        sort_main()
+        assert 'jschon' not in sys.modules
+        '''
+    )
+
+    # Act
+    client_proc = subprocess.run(
+        [sys.executable, '-c', client_code], cwd=tmp_path.parent, capture_output=True, text=True
+    )
+    result = call(str(socket_path), 'sort', {'schema': str(schema_path), 'doc': {"end": 40, "start": 30}})
+
+    # Assert
+    assert client_proc.returncode == 0, client_proc.stderr
+    assert '1 files processed:\n' in client_proc.stderr
+    assert '  documents:              1\n' in client_proc.stderr, "stats are reported by the server"
+    assert doc_path.read_text() == '{\n    "start": 10,\n    "end": 20\n}'
+    assert result == {"start": 30, "end": 40}
+    with pytest.raises(RemoteError, match='Method not found'):
+        call(str(socket_path), 'missing', {})
+    with pytest.raises(OSError, match='Address already in use'):
+        serve_unix_socket(str(socket_path), {})
+
+
+def test_serve__socket__interrupted(tmp_path: Path) -> None:
+    # Arrange
+    socket_path = tmp_path / "server.sock"
+    server = subprocess.Popen(['jschon-sort', '--serve', '--socket', socket_path])
+    while not socket_path.exists():
+        time.sleep(0.01)
+
+    # Act
+    server.send_signal(signal.SIGINT)
+
+    # Assert
+    assert server.wait() == 0
+    assert not socket_path.exists()
+
+
+def test_call__connection_closed(tmp_path: Path) -> None:
+    # Arrange
+    socket_path = tmp_path / "server.sock"
+    listening_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listening_sock.bind(str(socket_path))
+    listening_sock.listen()
+
+    def _accept_and_close() -> None:
+        with listening_sock:
+            conn, _ = listening_sock.accept()
+            with conn, conn.makefile('r') as f:
+                f.readline()
+
+    threading.Thread(target=_accept_and_close, daemon=True).start()
+
+    # Act & Assert
+    with pytest.raises(ConnectionResetError, match='closed the connection'):
+        call(str(socket_path), 'sort', {})
+
+
+def test_serve__socket__errors(tmp_path: Path, schema_path: Path, socket_path: Path) -> None:
+    # Arrange
+    invalid_path = tmp_path / "invalid.json"
+    invalid_path.write_text('{"end": "20", "start": 10}')
+    # a server which doesn't handle processing files
+    other_socket_path = tmp_path / "other.sock"
+    threading.Thread(target=serve_unix_socket, args=(str(other_socket_path), {}), daemon=True).start()
+    while not other_socket_path.exists():
+        time.sleep(0.01)
+
+    # Act
+    proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--socket', socket_path, invalid_path], capture_output=True, text=True
+    )
+    other_proc = subprocess.run(
+        ['jschon-sort', '--schema', schema_path, '--socket', other_socket_path, invalid_path],
+        capture_output=True,
+        text=True,
+    )
+
+    # Assert
+    assert proc.returncode == 1
+    assert proc.stderr == f'{invalid_path}: Document failed schema validation\n'
+    assert other_proc.returncode == 1
+    assert other_proc.stderr == f'{other_socket_path}: Method not found: process\n'
+
+
+def test_serve__socket__not_running(tmp_path: Path, schema_path: Path) -> None:
+    # Arrange
+    doc_path = tmp_path / "doc.json"
+    doc_path.write_text('{"end": 20, "start": 10}')
+    stale_socket_path = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(stale_socket_path))
+
+    # Act
+    for socket_path in (tmp_path / "missing.sock", stale_socket_path):
+        subprocess.check_call(['jschon-sort', '--schema', schema_path, '--socket', socket_path, doc_path])
+
+    # Assert
+    assert doc_path.read_text() == '{\n    "start": 10,\n    "end": 20\n}'
+
+    # a server can be started in place of the stale socket
+    threading.Thread(target=serve_unix_socket, args=(str(stale_socket_path), {}), daemon=True).start()
+    with pytest.raises(RemoteError, match='Method not found'):
+        for _ in range(100):
+            try:
+                call(str(stale_socket_path), 'process', {})
+            except ConnectionRefusedError:
+                time.sleep(0.01)
+
+
+def test_cli__missing_arguments(schema_path: Path) -> None:
+    # Act
+    proc = subprocess.run(['jschon-sort', '--schema', schema_path], capture_output=True, text=True)
+
+    # Assert
+    assert proc.returncode == 2
+    assert 'the following arguments are required: path' in proc.stderr
@@ -1,10 +1,17 @@
 import json
 from typing import Mapping
+from typing import Optional
 
+import jschon
 import pytest
 from jschon.json import JSONCompatible
 
+from jschon_tools import is_sorted
 from jschon_tools import process_json_doc
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaSorter
+from jschon_tools._main import _get_property_order
+from jschon_tools._main import _PROPERTY_ORDERS_CACHE_SIZE
 
 
 SCHEMA: Mapping[str, JSONCompatible] = {
@@ -46,6 +53,7 @@ def test_sort_doc_by_schema__failed():
     assert json.dumps(doc) == doc_str, "ensure doc is not modified in place"
 
 
+@pytest.mark.parametrize('validate', (True, False), ids=('validate', 'no_validate'))
 @pytest.mark.parametrize(
     'schema_version',
     [
@@ -53,13 +61,15 @@ def test_sort_doc_by_schema__failed():
         'https://json-schema.org/draft-07/schema',
     ],
 )
-def test_sort_doc_by_schema(schema_version: str) -> None:
+def test_sort_doc_by_schema(schema_version: str, validate: bool) -> None:
     # Arrange
     doc_str = '{"ranges": [{"end": 20, "start": 10, "AAA": 42, "BBB": 42}]}'
     doc = json.loads(doc_str)
 
     # Act
-    actual = process_json_doc(doc_data=doc, schema_data={**SCHEMA, '$schema': schema_version}, sort=True)
+    actual = process_json_doc(
+        doc_data=doc, schema_data={**SCHEMA, '$schema': schema_version}, sort=True, validate=validate
+    )
 
     # Assert
     assert actual is not doc
@@ -67,7 +77,8 @@ def test_sort_doc_by_schema(schema_version: str) -> None:
     assert json.dumps(actual) == '{"ranges": [{"BBB": 42, "AAA": 42, "start": 10, "end": 20}]}'
 
 
-def test_sort_doc_by_schema__local_ref() -> None:
+@pytest.mark.parametrize('validate', (True, False), ids=('validate', 'no_validate'))
+def test_sort_doc_by_schema__local_ref(validate: bool) -> None:
     # Arrange
     doc_str = '{"foo": {"end": 20, "start": 10}}'
     doc = json.loads(doc_str)
@@ -92,14 +103,15 @@ def test_sort_doc_by_schema__local_ref() -> None:
     }
 
     # Act
-    actual = process_json_doc(doc_data=doc, schema_data=schema, sort=True)
+    actual = process_json_doc(doc_data=doc, schema_data=schema, sort=True, validate=validate)
 
     # Assert
     assert actual is not doc
     assert json.dumps(actual) == '{"foo": {"start": 10, "end": 20}}'
 
 
-def test_sort_doc_by_schema__oneof() -> None:
+@pytest.mark.parametrize('validate', (True, False), ids=('validate', 'no_validate'))
+def test_sort_doc_by_schema__oneof(validate: bool) -> None:
     # Arrange
     doc_str = '{"abc": {"end": 20, "start": 10}, "xyz": {"to": 40, "from": 30}}'
     doc = json.loads(doc_str)
@@ -131,8 +143,221 @@ def test_sort_doc_by_schema__oneof() -> None:
     }
 
     # Act
-    actual = process_json_doc(doc_data=doc, schema_data=schema, sort=True)
+    actual = process_json_doc(doc_data=doc, schema_data=schema, sort=True, validate=validate)
 
     # Assert
     assert actual is not doc
     assert json.dumps(actual) == '{"abc": {"start": 10, "end": 20}, "xyz": {"from": 30, "to": 40}}'
+
+
+@pytest.mark.parametrize('validate', (True, False), ids=('validate', 'no_validate'))
+def test_sort_doc_by_schema__same_keys(validate: bool) -> None:
+    # Arrange
+    doc = json.loads(
+        '[{"b": 1, "a": 2, "kind": "x"}, {"b": 3, "a": 4, "kind": "y"}, {"b": 5, "a": 6, "kind": "x", "c": 7}]'
+    )
+    schema: Mapping[str, JSONCompatible] = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "array",
+        "items": {
+            "if": {"properties": {"kind": {"const": "x"}}},
+            "then": {"properties": {"a": {}, "b": {}}},
+            "else": {"properties": {"b": {}, "a": {}}},
+        },
+    }
+    stats = ProcessingStats()
+
+    # Act
+    actual = process_json_doc(
+        doc_data=doc, schema_data=schema, sort=True, remove_additional_props=True, validate=validate, stats=stats
+    )
+
+    # Assert
+    assert json.dumps(actual) == (
+        '[{"a": 2, "kind": "x", "b": 1}, {"b": 3, "kind": "y", "a": 4}, {"a": 6, "kind": "x", "b": 5}]'
+    ), "objects with the same keys are ordered by the schema nodes they match"
+    assert stats.keys_removed == 1
+
+
+def test_sort_doc_by_schema__distinct_keys() -> None:
+    # Arrange
+    doc = [{f"key{idx}": idx, "start": 10, "end": 20} for idx in range(_PROPERTY_ORDERS_CACHE_SIZE + 1)]
+    schema: Mapping[str, JSONCompatible] = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "array",
+        "items": {"properties": {"end": {}, "start": {}}},
+    }
+
+    # Act
+    actual = process_json_doc(doc_data=doc, schema_data=schema, sort=True)
+
+    # Assert
+    assert json.dumps(actual) == json.dumps(
+        [{"end": 20, "start": 10, f"key{idx}": idx} for idx in range(_PROPERTY_ORDERS_CACHE_SIZE + 1)]
+    )
+    assert _get_property_order.cache_info().currsize == _PROPERTY_ORDERS_CACHE_SIZE, "the memoized orders are bounded"
+
+
+def test_sort_doc_by_schema__no_validate__invalid() -> None:
+    # Arrange
+    doc_str = '{"ranges": [{"end": "20", "start": 10, "foo": "bar"}]}'
+    doc = json.loads(doc_str)
+
+    # Act
+    actual = process_json_doc(doc_data=doc, schema_data=SCHEMA, sort=True, validate=False)
+
+    # Assert
+    assert json.dumps(doc) == doc_str, "ensure doc is not modified in place"
+    assert json.dumps(actual) == '{"ranges": [{"start": 10, "end": "20", "foo": "bar"}]}'
+
+
+COMPOSITE_SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "$id": "https://example.com/composite",
+    "$dynamicAnchor": "node",
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "point": {"$ref": "#/$defs/point"},
+        "origin": {"$dynamicRef": "#point"},  # not dynamic, since the anchor isn't a "$dynamicAnchor"
+        "children": {"type": "array", "items": {"$dynamicRef": "#node"}},
+        "pair": {
+            "type": "array",
+            "prefixItems": [{"$ref": "#/$defs/point"}, {"type": "string"}],
+            "items": {"$ref": "#/$defs/range"},
+        },
+    },
+    "allOf": [
+        {"properties": {"kind": {"type": "string"}}},
+    ],
+    "anyOf": [
+        {"properties": {"color": {"type": "string"}}},
+        {"properties": {"size": {"type": "number"}}},
+    ],
+    "if": {"properties": {"kind": {"const": "range"}}, "required": ["kind"]},
+    "then": {"properties": {"start": {"type": "number"}, "end": {"type": "number"}}},
+    "else": {"properties": {"end": {"type": "number"}, "start": {"type": "number"}}},
+    "dependentSchemas": {
+        "size": {"properties": {"unit": {"type": "string"}}},
+    },
+    "patternProperties": {
+        "^x-": {"type": "string"},
+    },
+    "additionalProperties": {"type": ["null", "boolean", "number", "string", "object"]},
+    "$defs": {
+        "point": {
+            "$anchor": "point",
+            "type": "object",
+            "properties": {
+                "x": {"type": "number"},
+                "y": {"type": "number"},
+            },
+            "additionalProperties": False,
+        },
+        "range": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+            # ignored without "if"
+            "then": {"required": ["start"]},
+        },
+    },
+}
+
+
+@pytest.mark.parametrize(
+    'doc_str',
+    [
+        '{"end": 2, "start": 1, "kind": "range", "name": "a"}',
+        '{"end": 2, "start": 1, "kind": "other", "name": "a"}',
+        '{"unit": "cm", "size": 3, "color": "red", "x-b": "b", "x-a": "a", "extra": 1, "point": {"y": 2, "x": 1}}',
+        '{"name": "a", "flag": true, "nothing": null, "origin": {"y": 2, "x": 1}}',
+        '{"children": [{"children": [{"point": {"y": 1, "x": 0}, "name": "c"}], "name": "b"}], "name": "a"}',
+        '{"pair": [{"y": 1, "x": 0}, "s", {"end": 2, "start": 1}, {"end": 4, "start": 3}], "name": "a"}',
+    ],
+)
+def test_sort_doc_by_schema__no_validate__same_order(doc_str: str) -> None:
+    # Arrange
+    doc = json.loads(doc_str)
+
+    # Act
+    expected = process_json_doc(doc_data=doc, schema_data=COMPOSITE_SCHEMA, sort=True)
+    actual = process_json_doc(doc_data=doc, schema_data=COMPOSITE_SCHEMA, sort=True, validate=False)
+
+    # Assert
+    assert json.dumps(actual) == json.dumps(expected)
+    assert json.dumps(actual) != doc_str
+
+
+def test_sort_doc_by_schema__no_validate__dynamic_scope() -> None:
+    # Arrange
+    doc_str = '{"leaf": {"name": "c"}, "tree": {"children": [{"children": [], "name": "b"}], "name": "a"}}'
+    doc = json.loads(doc_str)
+    schema: Mapping[str, JSONCompatible] = {
+        "$schema": "https://json-schema.org/draft/2020-12/schema",
+        "type": "object",
+        "properties": {
+            "tree": {"$ref": "https://example.com/composite"},
+            "leaf": {
+                "$id": "https://example.com/leaf",
+                # found by the dynamic reference's fragment, but isn't a "$dynamicAnchor", so it's not a target
+                "$anchor": "node",
+                "properties": {"name": True},
+            },
+        },
+    }
+    process_json_doc(doc_data={}, schema_data=COMPOSITE_SCHEMA)  # registers the referenced schema
+
+    # Act
+    expected = process_json_doc(doc_data=doc, schema_data=schema, sort=True)
+    actual = process_json_doc(doc_data=doc, schema_data=schema, sort=True, validate=False)
+
+    # Assert
+    assert json.dumps(actual) == json.dumps(expected)
+    assert json.dumps(actual) == (
+        '{"tree": {"name": "a", "children": [{"name": "b", "children": []}]}, "leaf": {"name": "c"}}'
+    )
+
+
+def test_sort_doc_by_schema__in_place() -> None:
+    # Arrange
+    doc = json.loads('{"ranges": [{"end": 20, "start": 10, "AAA": 42, "BBB": 42}, {"BBB": 1, "start": 2, "end": 3}]}')
+    ranges = doc['ranges']
+    first_range = ranges[0]
+
+    # Act
+    actual = process_json_doc(doc_data=doc, schema_data=SCHEMA, sort=True, in_place=True)
+
+    # Assert
+    assert actual is doc
+    assert actual['ranges'] is ranges
+    assert actual['ranges'][0] is first_range
+    assert json.dumps(doc) == (
+        '{"ranges": [{"BBB": 42, "AAA": 42, "start": 10, "end": 20}, {"BBB": 1, "start": 2, "end": 3}]}'
+    )
+
+
+@pytest.mark.parametrize('validate', (True, False), ids=('validate', 'no_validate'))
+@pytest.mark.parametrize(
+    'doc_str, expected',
+    [
+        ('{"ranges": [{"BBB": 42, "AAA": 42, "start": 10, "end": 20}]}', None),
+        ('{"ranges": [{"start": 10, "end": 20}, {"AAA": 42, "BBB": 42, "start": 10, "end": 20}]}', '/ranges/1'),
+        ('{"ranges": [{"start": 10, "end": 20}, {"end": 20, "start": 10}, {"end": 20, "start": 10}]}', '/ranges/1'),
+    ],
+)
+def test_check_sorted(validate: bool, doc_str: str, expected: Optional[str]) -> None:
+    # Arrange
+    doc = json.loads(doc_str)
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act
+    actual = sorter.check(doc, sort=True, validate=validate)
+
+    # Assert
+    assert json.dumps(doc) == doc_str, "ensure doc is not modified in place"
+    assert actual == (jschon.JSONPointer(expected) if expected is not None else None)
+    assert sorter.is_sorted(doc, validate=validate) is (expected is None)
+    assert is_sorted(doc_data=doc, schema_data=SCHEMA, validate=validate) is (expected is None)
@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from textwrap import dedent
+from typing import List
+
+import pytest
+
+import jschon_tools
+
+
+# slow to import, and not needed unless documents are processed (see benchmarks/startup.py)
+HEAVY_MODULES = ('jschon', 'ruyaml', 'concurrent.futures.process', 'importlib.metadata')
+
+
+def _get_imported_heavy_modules(code: str) -> List[str]:
+    code += dedent(
+        f'''
+        import sys
+        print([m for m in {HEAVY_MODULES!r} if m in sys.modules])
+        '''
+    )
+    output = subprocess.check_output([sys.executable, '-c', code], text=True)
+    imported_modules: List[str] = json.loads(output.splitlines()[-1].replace("'", '"'))
+    return imported_modules
+
+
+def test_startup__import() -> None:
+    assert _get_imported_heavy_modules('import jschon_tools.cli') == []
+
+
+def test_startup__help() -> None:
+    code = dedent(
+        '''
+        import sys
+        from jschon_tools.cli import sort_main
+        sys.argv = ['jschon-sort', '--help']
+        try:
+            sort_main()
+        except SystemExit:
+            pass
+        '''
+    )
+    assert _get_imported_heavy_modules(code) == []
+
+
+def test_startup__lazy_api() -> None:
+    from jschon_tools import _main
+
+    assert jschon_tools.SchemaSorter is _main.SchemaSorter
+    with pytest.raises(AttributeError):
+        jschon_tools.missing
+
+
+def test_startup__json_documents(tmp_path: Path) -> None:
+    # Arrange
+    schema_path = tmp_path / 'schema.json'
+    schema_path.write_text('{"$schema": "https://json-schema.org/draft/2020-12/schema", "properties": {"a": true}}')
+    doc_path = tmp_path / 'doc.json'
+    doc_path.write_text('{"b": 1, "a": 2}')
+    code = dedent(
+        f'''
+        import sys
+        from jschon_tools.cli import sort_main
+        sys.argv = ['jschon-sort', '--schema', {str(schema_path)!r}, '--no-cache', {str(doc_path)!r}]
+        sort_main()
+        '''
+    )
+
+    # Act
+    imported_heavy_modules = _get_imported_heavy_modules(code)
+
+    # Assert
+    assert imported_heavy_modules == ['jschon'], "jschon is imported (and its catalog created) on demand"
+    assert json.loads(doc_path.read_text()) == {"a": 2, "b": 1}
+
+
+def test_startup__unchanged_documents(tmp_path: Path) -> None:
+    # Arrange
+    schema_path = tmp_path / 'schema.json'
+    schema_path.write_text('{"$schema": "https://json-schema.org/draft/2020-12/schema", "properties": {"a": true}}')
+    doc_path = tmp_path / 'doc.json'
+    doc_path.write_text('{"b": 1, "a": 2}')
+    subprocess.check_output(['jschon-sort', '--schema', schema_path, doc_path])
+    code = dedent(
+        f'''
+        import sys
+        from jschon_tools.cli import sort_main
+        sys.argv = ['jschon-sort', '--schema', {str(schema_path)!r}, {str(doc_path)!r}]
+        sort_main()
+        '''
+    )
+
+    # Act
+    imported_heavy_modules = _get_imported_heavy_modules(code)
+
+    # Assert
+    assert 'jschon' not in imported_heavy_modules, "nothing to process"
@@ -0,0 +1,152 @@
+import json
+from typing import List
+from typing import Mapping
+from unittest import mock
+
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import is_sorted
+from jschon_tools import process_json_doc
+from jschon_tools import process_json_stream
+from jschon_tools import ProcessingStats
+from jschon_tools import SchemaSorter
+
+
+SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "range": {"$ref": "#/$defs/range"},
+    },
+    "$defs": {
+        "range": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+        },
+    },
+}
+
+
+def test_schema_sorter__stats() -> None:
+    # Arrange
+    doc_stats: List[ProcessingStats] = []
+    sorter = SchemaSorter(SCHEMA, stats_hook=doc_stats.append)
+    stats = ProcessingStats()
+
+    # Act
+    sorter.remove_additional_props({"range": {"end": 20, "start": 10, "extra": None}}, stats=stats)
+    sorter.sort({"range": {"end": 40, "start": 30}}, stats=stats)
+    sorter.sort({"range": {}})
+
+    # Assert
+    assert sorted(stats.phase_times) == ['compile', 'evaluate', 'sort_keys', 'traverse']
+    assert stats.to_json() == {
+        'phase_times': stats.phase_times,
+        'documents': 2,
+        'result_nodes': 22,
+        'schema_nodes_keyed': 15,
+        'doc_nodes_visited': 8,  # the removed property's value isn't visited
+        'sort_keys_cache_hits': 6,
+        'sort_keys_cache_misses': 5,
+        'keys_removed': 1,
+    }
+    assert [s.documents for s in doc_stats] == [1, 1, 1], "hook is called for each document, with its own stats"
+    # schema nodes are keyed once, and not when only removing additional properties
+    assert [s.schema_nodes_keyed for s in doc_stats] == [0, 15, 0]
+    assert doc_stats[0].phase_times['compile'] > doc_stats[1].phase_times['compile']
+
+
+def test_schema_sorter__stats__no_validate() -> None:
+    # Arrange
+    sorter = SchemaSorter(SCHEMA)
+    stats = ProcessingStats()
+
+    # Act
+    sorter.sort({"range": {"end": 20, "start": 10}}, validate=False, stats=stats)
+    unprocessed_path = sorter.check({"range": {"end": 40, "start": 30}}, sort=True, validate=False, stats=stats)
+
+    # Assert
+    assert str(unprocessed_path) == '/range'
+    assert sorted(stats.phase_times) == ['compile', 'sort_keys', 'traverse']
+    assert stats.documents == 2
+    assert stats.result_nodes == 0
+    assert stats.schema_nodes_keyed == 5
+    assert stats.doc_nodes_visited == 6, "checking stops at the first unsorted object"
+
+
+def test_process_json_doc__stats() -> None:
+    # Arrange
+    stats = ProcessingStats()
+    hook = mock.Mock()
+    docs = [{"range": {"end": 20, "start": 10}}, {"range": {"start": 30, "end": 40}}]
+
+    # Act
+    process_json_doc(schema_data=SCHEMA, doc_data=docs[0], sort=True, stats=stats, stats_hook=hook)
+    list(process_json_stream(schema_data=SCHEMA, docs=docs, sort=True, stats=stats, stats_hook=hook))
+    assert is_sorted(schema_data=SCHEMA, doc_data=docs[1], stats=stats, stats_hook=hook)
+
+    # Assert
+    assert stats.documents == 4
+    assert hook.call_count == 4
+
+
+def test_processing_stats__time_phase() -> None:
+    # Arrange
+    stats = ProcessingStats()
+    nested_stats = ProcessingStats()
+    nested_stats.phase_times = {'traverse': 2.0}
+    nested_stats.doc_nodes_visited = 3
+
+    # Act
+    with mock.patch('time.perf_counter', side_effect=[0.0, 1.0, 2.0, 10.0]):
+        with stats.time_phase('dump'):
+            with stats.time_phase('load'):
+                pass
+            stats.merge(nested_stats)
+    stats.merge(nested_stats)
+
+    # Assert
+    assert stats.phase_times == {'load': 1.0, 'dump': 7.0, 'traverse': 4.0}, "nested phases are excluded"
+    assert stats.doc_nodes_visited == 6
+
+
+def test_processing_stats__failed() -> None:
+    # Arrange
+    stats = ProcessingStats()
+
+    # Act
+    with pytest.raises(ValueError):
+        with mock.patch('time.perf_counter', side_effect=[0.0, 1.0]):
+            with stats.time_phase('load'):
+                raise ValueError
+
+    # Assert
+    assert stats.phase_times == {'load': 1.0}
+
+
+def test_processing_stats__json() -> None:
+    # Arrange
+    stats = ProcessingStats()
+    stats.phase_times = {'dump': 1.5, 'load': 0.25}
+    stats.keys_removed = 2
+
+    # Act
+    restored_stats = ProcessingStats.from_json(json.loads(json.dumps(stats.to_json())))
+
+    # Assert
+    assert repr(restored_stats) == repr(stats)
+    assert restored_stats.format().splitlines() == [
+        '  load time:              0.250s',
+        '  dump time:              1.500s',
+        '  documents:              0',
+        '  result_nodes:           0',
+        '  schema_nodes_keyed:     0',
+        '  doc_nodes_visited:      0',
+        '  sort_keys_cache_hits:   0',
+        '  sort_keys_cache_misses: 0',
+        '  keys_removed:           2',
+    ]
@@ -0,0 +1,77 @@
+import io
+import json
+from typing import List
+from typing import Optional
+
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import _stream
+from jschon_tools._stream import iter_json_array
+from jschon_tools._stream import iter_json_lines
+from jschon_tools._stream import write_json_array
+from jschon_tools._stream import write_json_lines
+
+
+@pytest.mark.parametrize('chunk_size', (1, 3, 64 * 1024))
+@pytest.mark.parametrize(
+    'doc_str',
+    [
+        '[]',
+        ' [ ] ',
+        '[1]',
+        '[12345, 678]',
+        '[{"a": [1, 2, {"b": "c,]"}]}, "x", null, true, 1.5e3]\n',
+        '[\n    {\n        "a": 1\n    },\n    [\n        2\n    ]\n]',
+    ],
+)
+def test_iter_json_array(monkeypatch: pytest.MonkeyPatch, chunk_size: int, doc_str: str) -> None:
+    # Arrange
+    monkeypatch.setattr(_stream, '_CHUNK_SIZE', chunk_size)
+
+    # Act
+    actual = list(iter_json_array(io.StringIO(doc_str)))
+
+    # Assert
+    assert actual == json.loads(doc_str)
+
+
+@pytest.mark.parametrize(
+    'doc_str, match',
+    [
+        ('{"a": 1}', "Expected one of '\\['"),
+        ('[1 2]', "Expected one of ',\\]'"),
+        ('[1, 2', "Expected one of ',\\]'"),
+        ('[1, }]', 'Expecting value'),
+        ('[1] 2', 'Unexpected data after the top-level array'),
+    ],
+)
+def test_iter_json_array__invalid(doc_str: str, match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        list(iter_json_array(io.StringIO(doc_str)))
+
+
+@pytest.mark.parametrize('indent', (None, 0, 2, 4))
+@pytest.mark.parametrize('items', ([], [1], [{"a": [1, {"b": None}]}, [], {}, "x"]))
+def test_write_json_array(indent: Optional[int], items: List[JSONCompatible]) -> None:
+    # Arrange
+    f = io.StringIO()
+
+    # Act
+    write_json_array(f, iter(items), indent=indent)
+
+    # Assert
+    assert f.getvalue() == json.dumps(items, indent=indent)
+
+
+def test_json_lines() -> None:
+    # Arrange
+    f_in = io.StringIO('{"a": 1}\n\n[2, 3]\n"x"')
+    f_out = io.StringIO()
+
+    # Act
+    write_json_lines(f_out, iter_json_lines(f_in))
+
+    # Assert
+    # records are written compactly, as is conventional for JSON Lines
+    assert f_out.getvalue() == '{"a":1}\n[2,3]\n"x"\n'
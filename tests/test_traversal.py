@@ -0,0 +1,199 @@
+import copy
+import json
+import random
+import sys
+from typing import Any
+from typing import Dict
+from typing import Mapping
+from typing import Optional
+
+import jschon
+import pytest
+from jschon.json import JSONCompatible
+
+from jschon_tools import SchemaSorter
+from jschon_tools._main import _SchemaSortKeys
+from jschon_tools._structural import END_SORT_KEY
+
+
+SCHEMA: Mapping[str, JSONCompatible] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "child": {"$ref": "#"},
+        "children": {"type": "array", "items": {"$ref": "#"}},
+        "range": {
+            "type": "object",
+            "properties": {
+                "start": {"type": "number"},
+                "end": {"type": "number"},
+            },
+        },
+    },
+    "patternProperties": {
+        "^x-": {"type": "array", "prefixItems": [{"$ref": "#"}]},
+    },
+}
+
+
+def _random_doc(rng: random.Random, depth: int) -> Dict[str, JSONCompatible]:
+    doc: Dict[str, JSONCompatible] = {}
+    keys = ['name', 'child', 'children', 'range', 'x-extra', 'unknown', 'other']
+    rng.shuffle(keys)
+    for key in keys[: rng.randint(0, len(keys))]:
+        if key == 'name':
+            doc[key] = 'name'
+        elif key in ('child', 'x-extra') and depth > 0:
+            child = _random_doc(rng, depth - 1)
+            doc[key] = child if key == 'child' else [child, {"b": 1, "a": 2}]
+        elif key == 'children' and depth > 0:
+            doc[key] = [_random_doc(rng, depth - 1) for _ in range(rng.randint(0, 3))]
+        elif key == 'range':
+            doc[key] = {"end": 2, "unknown": [{"b": 1, "a": 2}], "start": 1}
+        elif key in ('unknown', 'other'):
+            doc[key] = {"b": [1, {"d": 1, "c": 2}], "a": None}
+    return doc
+
+
+def _reference_process(
+    node: JSONCompatible,
+    path: jschon.JSONPointer,
+    doc_sort_keys: Mapping[jschon.JSONPointer, int],
+    *,
+    sort: bool,
+    remove_additional_props: bool,
+) -> JSONCompatible:
+    # a straightforward recursive implementation, to compare the iterative traversal against
+    if isinstance(node, dict):
+        properties = [
+            (
+                k,
+                _reference_process(
+                    v, path / k, doc_sort_keys, sort=sort, remove_additional_props=remove_additional_props
+                ),
+            )
+            for k, v in node.items()
+            if not remove_additional_props or path / k in doc_sort_keys
+        ]
+        if sort:
+            properties.sort(key=lambda pair: (doc_sort_keys.get(path / pair[0], END_SORT_KEY), pair[0]))
+        return dict(properties)
+    if isinstance(node, list):
+        return [
+            _reference_process(
+                v, path / str(idx), doc_sort_keys, sort=sort, remove_additional_props=remove_additional_props
+            )
+            for idx, v in enumerate(node)
+        ]
+    return node
+
+
+def _reference_check(
+    node: JSONCompatible, path: jschon.JSONPointer, processed_node: JSONCompatible
+) -> Optional[jschon.JSONPointer]:
+    if isinstance(node, dict):
+        assert isinstance(processed_node, dict)
+        if list(node) != list(processed_node):
+            return path
+        children = [(v, path / k, processed_node[k]) for k, v in node.items()]
+    elif isinstance(node, list):
+        assert isinstance(processed_node, list)
+        children = [(v, path / str(idx), processed_v) for idx, (v, processed_v) in enumerate(zip(node, processed_node))]
+    else:
+        return None
+    for v, v_path, processed_v in children:
+        if (unprocessed_path := _reference_check(v, v_path, processed_v)) is not None:
+            return unprocessed_path
+    return None
+
+
+def _reference_sort_keys(root_result: jschon.jsonschema.Result) -> Dict[jschon.JSONPointer, int]:
+    doc_sort_keys: Dict[jschon.JSONPointer, int] = {}
+
+    def _traverse_result(result: jschon.jsonschema.Result) -> None:
+        doc_sort_keys.setdefault(result.instance.path, _SchemaSortKeys(result.schema)[result.relpath])
+        for child in result.children.values():
+            _traverse_result(child)
+
+    _traverse_result(root_result)
+    return doc_sort_keys
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_sort_keys__randomized(seed: int) -> None:
+    # Arrange
+    doc = _random_doc(random.Random(seed), depth=4)
+    sorter = SchemaSorter(SCHEMA)
+
+    # Act
+    doc_sort_keys = sorter._get_doc_sort_keys(doc, validate=True, stats=None)
+    structural_doc_sort_keys = sorter._get_doc_sort_keys(doc, validate=False, stats=None)
+
+    # Assert
+    assert doc_sort_keys == _reference_sort_keys(sorter.root_schema.evaluate(jschon.JSON(doc)))
+    assert structural_doc_sort_keys == doc_sort_keys
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('validate', [True, False])
+def test_traversal__randomized(seed: int, validate: bool) -> None:
+    # Arrange
+    doc = _random_doc(random.Random(seed), depth=4)
+    sorter = SchemaSorter(SCHEMA)
+    doc_sort_keys = sorter._get_doc_sort_keys(doc, validate=validate, stats=None)
+
+    for sort, remove_additional_props in [(True, False), (False, True), (True, True)]:
+        # Act
+        processed_doc = sorter.process(
+            doc, sort=sort, remove_additional_props=remove_additional_props, validate=validate
+        )
+        processed_in_place_doc = sorter.process(
+            copy.deepcopy(doc),
+            sort=sort,
+            remove_additional_props=remove_additional_props,
+            validate=validate,
+            in_place=True,
+        )
+        unprocessed_path = sorter.check(
+            doc, sort=sort, remove_additional_props=remove_additional_props, validate=validate
+        )
+
+        # Assert
+        expected_doc = _reference_process(
+            doc, jschon.JSONPointer(), doc_sort_keys, sort=sort, remove_additional_props=remove_additional_props
+        )
+        assert json.dumps(processed_doc) == json.dumps(expected_doc)
+        assert json.dumps(processed_in_place_doc) == json.dumps(expected_doc)
+        assert unprocessed_path == _reference_check(doc, jschon.JSONPointer(), expected_doc)
+
+
+def test_traversal__deeply_nested() -> None:
+    # Arrange
+    depth = sys.getrecursionlimit() * 2
+    sorter = SchemaSorter(SCHEMA)
+    doc: Dict[str, JSONCompatible] = {}
+    node = doc
+    for _ in range(depth):
+        child: Dict[str, JSONCompatible] = {}
+        node.update({"children": [child], "unknown": None, "name": "name"})
+        node = child
+
+    # Act
+    sorted_doc = sorter.sort(doc, validate=False)
+    processed_doc = sorter.process(doc, sort=True, remove_additional_props=True, validate=False, in_place=True)
+
+    # Assert
+    assert sorter.check(sorted_doc, sort=True, validate=False) is None
+    assert sorter.check(doc, remove_additional_props=True, validate=False) is None
+    assert processed_doc is doc
+    sorted_node: Any = sorted_doc
+    for _ in range(depth):
+        assert list(sorted_node) == ['name', 'children', 'unknown']
+        sorted_node = sorted_node['children'][0]
+
+
+def test_traversal__scalar() -> None:
+    sorter = SchemaSorter({"$schema": "https://json-schema.org/draft/2020-12/schema", "type": "string"})
+    assert sorter.sort("value") == "value"
+    assert sorter.check("value", sort=True) is None